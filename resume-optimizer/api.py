@@ -0,0 +1,225 @@
+"""
+HTTP API for the resume optimizer.
+
+Exposes job analysis, resume rewriting and HTML/PDF rendering for other
+services. The chains are the process-wide instances from src/chains.py, and
+PDFs are rendered in a pool of worker processes that each keep a long-lived
+PdfRenderer, so requests never pay for client or font setup.
+
+Run from the repository root:
+    uvicorn api:app --app-dir resume-optimizer --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import quote
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel
+
+from src.bulk_render import render_pdf_bytes
+from src.chains import get_analyzer_chain, get_rewriter_chain
+from src.file_manager import (
+    find_job_analysis,
+    save_job_analysis_result,
+    save_resume_optimization_result,
+)
+from src.parsers import JobDescriptionKeywords, OptimizedResumeContent
+from src.pipeline import RESUME_PATH, extract_rewrite_keywords
+from src.response_cache import is_cache_enabled
+from src.resume_generator import ResumeGenerator
+from src.retention import start_background_pruning
+
+# Worker processes for PDF rendering (defaults to the number of cores)
+RENDER_WORKERS_ENV_VAR = "RESUME_OPTIMIZER_API_RENDER_WORKERS"
+PDF_CHUNK_SIZE = 64 * 1024
+
+# Shared by every request handled in this process
+_resume_generator = ResumeGenerator()
+_render_pool = None
+_resume_text = None
+
+
+class AnalyzeRequest(BaseModel):
+    job_description: str
+    save: bool = True
+    # Return a saved analysis of the same posting; defaults to whether the
+    # response cache is enabled
+    reuse: Optional[bool] = None
+
+
+class AnalyzeResponse(BaseModel):
+    analysis_result: JobDescriptionKeywords
+    keywords: List[str]
+    saved_path: Optional[str] = None
+    reused: bool = False
+    warnings: List[str] = []
+
+
+class RewriteRequest(BaseModel):
+    keywords: List[str]
+    resume_text: Optional[str] = None
+    source_type: str = "api"
+    save: bool = True
+
+
+class RewriteResponse(BaseModel):
+    optimization_result: OptimizedResumeContent
+    saved_path: Optional[str] = None
+    warnings: List[str] = []
+
+
+class RenderRequest(BaseModel):
+    optimization_result: OptimizedResumeContent
+    filename: Optional[str] = None
+
+
+def _content_disposition(filename: str) -> str:
+    """
+    Attachment header for a client-supplied filename.
+
+    Only the basename is kept, control characters and quotes are dropped, and
+    the name is sent both as an ASCII fallback and RFC 6266 filename* (UTF-8).
+    """
+    name = os.path.basename(filename.replace("\\", "/"))
+    name = "".join(ch for ch in name if ch.isprintable() and ch != '"').strip(" .")
+    if not name.lower().endswith(".pdf"):
+        name = f"{name or 'resume'}.pdf"
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", name)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+
+def _load_resume_text() -> str:
+    global _resume_text
+    if _resume_text is None:
+        with open(RESUME_PATH, "r", encoding="utf-8") as file:
+            _resume_text = file.read()
+    return _resume_text
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _render_pool
+    workers = int(os.getenv(RENDER_WORKERS_ENV_VAR, 0)) or os.cpu_count() or 1
+    # "spawn" avoids forking the server's event loop and threads into the workers;
+    # each worker creates its generator and PdfRenderer on its first render
+    _render_pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    # Build the shared chains up front so the first requests don't pay for it
+    get_analyzer_chain()
+    get_rewriter_chain()
+    start_background_pruning()
+    try:
+        yield
+    finally:
+        _render_pool.shutdown(wait=True)
+        _render_pool = None
+
+
+app = FastAPI(title="Resume Optimizer API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(request: AnalyzeRequest):
+    """Extract keywords and requirements from a job description"""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=422, detail="job_description is empty")
+    reuse = is_cache_enabled() if request.reuse is None else request.reuse
+    existing = await asyncio.to_thread(find_job_analysis, request.job_description) \
+        if reuse else None
+    if existing:
+        return {
+            "analysis_result": existing["analysis_result"],
+            "keywords": extract_rewrite_keywords(existing["analysis_result"]),
+            "saved_path": existing["file_path"],
+            "reused": True,
+        }
+
+    try:
+        analysis_result = await get_analyzer_chain().ainvoke(
+            {"job_description": request.job_description})
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Analyzer failed: {e}")
+
+    saved_path, warnings = None, []
+    if request.save:
+        # The analysis is already paid for; a failed save shouldn't discard it
+        try:
+            saved_path = await asyncio.to_thread(
+                save_job_analysis_result, request.job_description, analysis_result, dedupe=reuse)
+        except Exception as e:
+            warnings.append(f"Analysis completed but couldn't save file: {e}")
+    return {
+        "analysis_result": analysis_result,
+        "keywords": extract_rewrite_keywords(analysis_result),
+        "saved_path": saved_path,
+        "reused": False,
+        "warnings": warnings,
+    }
+
+
+@app.post("/rewrite", response_model=RewriteResponse)
+async def rewrite(request: RewriteRequest):
+    """Rewrite the resume (the bundled one unless resume_text is given) around keywords"""
+    if not request.keywords:
+        raise HTTPException(status_code=422, detail="keywords is empty")
+    resume_text = request.resume_text or await asyncio.to_thread(_load_resume_text)
+    try:
+        optimization_result = await get_rewriter_chain().ainvoke({
+            "keywords_to_integrate": request.keywords,
+            "original_resume_text": resume_text,
+        })
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Rewriter failed: {e}")
+
+    saved_path, warnings = None, []
+    if request.save:
+        try:
+            saved_path = await asyncio.to_thread(
+                save_resume_optimization_result, request.keywords, resume_text,
+                optimization_result, request.source_type)
+        except Exception as e:
+            warnings.append(f"Optimization completed but couldn't save file: {e}")
+    return {"optimization_result": optimization_result, "saved_path": saved_path,
+            "warnings": warnings}
+
+
+@app.post("/render/html", response_class=HTMLResponse)
+async def render_html(request: RenderRequest):
+    """Render an optimization result into the resume HTML template"""
+    resume_html = await asyncio.to_thread(
+        _resume_generator.generate_updated_resume,
+        request.optimization_result.model_dump())
+    return HTMLResponse(resume_html)
+
+
+@app.post("/render/pdf")
+async def render_pdf(request: RenderRequest):
+    """Render an optimization result to PDF and stream it back"""
+    loop = asyncio.get_running_loop()
+    try:
+        pdf_bytes = await loop.run_in_executor(
+            _render_pool, render_pdf_bytes, request.optimization_result.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF rendering failed: {e}")
+
+    def chunks():
+        for start in range(0, len(pdf_bytes), PDF_CHUNK_SIZE):
+            yield pdf_bytes[start:start + PDF_CHUNK_SIZE]
+
+    filename = request.filename or f"resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return StreamingResponse(
+        chunks(), media_type="application/pdf",
+        headers={"Content-Disposition": _content_disposition(filename),
+                 "Content-Length": str(len(pdf_bytes))})
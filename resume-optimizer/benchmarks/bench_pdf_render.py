@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-PDF render time with and without the shared PdfRenderer.
+
+Usage (from the repository root):
+    python resume-optimizer/benchmarks/bench_pdf_render.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weasyprint import HTML, CSS  # noqa: E402
+from weasyprint.text.fonts import FontConfiguration  # noqa: E402
+
+from src.resume_generator import PDF_CSS, PdfRenderer, ResumeGenerator  # noqa: E402
+from test_resume_generator import test_optimization_result  # noqa: E402
+
+
+def render_uncached(resume_html, output_path):
+    """The previous create_pdf path: new fonts and freshly parsed CSS per call"""
+    font_config = FontConfiguration()
+    HTML(string=resume_html).write_pdf(
+        output_path, stylesheets=[CSS(string=PDF_CSS)], font_config=font_config)
+
+
+def time_renders(render, resume_html, output_dir, runs):
+    timings = []
+    for i in range(runs):
+        output_path = os.path.join(output_dir, f"bench_{i}.pdf")
+        start = time.perf_counter()
+        render(resume_html, output_path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<24} mean {statistics.mean(timings) * 1000:8.1f} ms   "
+          f"median {statistics.median(timings) * 1000:8.1f} ms   "
+          f"first {timings[0] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20,
+                        help="PDFs to render per variant")
+    args = parser.parse_args()
+
+    resume_html = ResumeGenerator().generate_updated_resume(
+        test_optimization_result)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        uncached = time_renders(
+            render_uncached, resume_html, output_dir, args.runs)
+        renderer = PdfRenderer()
+        cached = time_renders(renderer.render, resume_html,
+                              output_dir, args.runs)
+
+    print(f"Per-PDF render time over {args.runs} runs")
+    report("Before (per-call setup)", uncached)
+    report("After (PdfRenderer)", cached)
+    print(f"Speedup (mean): {statistics.mean(uncached) / statistics.mean(cached):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
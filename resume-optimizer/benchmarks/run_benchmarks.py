@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the resume optimizer hot paths.
+
+Covers HTML generation, PDF rendering, diffing, static info extraction, saving
+and listing outputs at several directory sizes, full pipeline runs and
+full-prompt vs section-parallel rewrites against the offline fake model.
+Results are written as JSON and can be compared with a stored baseline; the
+script exits non-zero when a benchmark regresses by more than the tolerance.
+
+Usage (from the repository root):
+    python resume-optimizer/benchmarks/run_benchmarks.py
+    python resume-optimizer/benchmarks/run_benchmarks.py --save-baseline
+    python resume-optimizer/benchmarks/run_benchmarks.py --filter list_saved_files --sizes 10,1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+# The pipeline benchmarks must never reach Gemini or the shared response cache
+os.environ["RESUME_OPTIMIZER_MODEL_PROVIDER"] = "fake"
+os.environ["RESUME_OPTIMIZER_LLM_CACHE"] = "0"
+os.environ.setdefault("RESUME_OPTIMIZER_FAKE_LATENCY", "0.05")
+os.environ.setdefault("RESUME_OPTIMIZER_FAKE_LATENCY_DIST", "fixed")
+os.environ.setdefault("RESUME_OPTIMIZER_FAKE_SEED", "0")
+
+from src import file_manager  # noqa: E402
+from src.file_manager import list_saved_files, save_job_analysis_result, save_resume_optimization_result  # noqa: E402
+from src.resume_generator import ResumeGenerator  # noqa: E402
+from test_resume_generator import test_optimization_result  # noqa: E402
+
+DEFAULT_RESULTS_PATH = os.path.join(BENCHMARKS_DIR, "results.json")
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+RESUME_PATH = os.path.join(PROJECT_DIR, "src", "docs", "resume.md")
+
+SAMPLE_ANALYSIS = {
+    "technical_skills": ["Distributed Systems", "API Design", "Algorithms"],
+    "technologies_and_tools": ["Python", "Java", "PostgreSQL", "Docker", "AWS"],
+    "soft_skills": ["Communication", "Collaboration"],
+    "certifications": [],
+    "other_requirements": ["3+ years of industry experience"],
+}
+SAMPLE_JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build distributed systems in Python and Java. "
+    "You will design APIs, own PostgreSQL data models and deploy with Docker on AWS. " * 6
+)
+
+
+def measure(func, runs, warmup=1):
+    """Time func over runs calls after warmup calls; returns summary stats in ms"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": runs,
+        "mean_ms": statistics.mean(timings),
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_ms": timings[0],
+    }
+
+
+class OutputsSandbox:
+    """
+    Temporary working directory laid out like the repository root.
+
+    The code under test writes to relative "resume-optimizer/outputs" paths, so
+    the benchmarks chdir into a scratch tree and reset the saved-files index
+    singleton for each scenario.
+    """
+
+    def __enter__(self):
+        self.previous_cwd = os.getcwd()
+        self.root = tempfile.mkdtemp(prefix="resume_bench_")
+        docs_dir = os.path.join(self.root, "resume-optimizer", "src", "docs")
+        os.makedirs(docs_dir)
+        shutil.copy(RESUME_PATH, docs_dir)
+        os.chdir(self.root)
+        file_manager._output_index = None
+        return self
+
+    def __exit__(self, *exc_info):
+        os.chdir(self.previous_cwd)
+        file_manager._output_index = None
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def populate_outputs(count):
+    """Write count job analysis files in the saved format without going through the index"""
+    directory = os.path.join("resume-optimizer", "outputs", "job_analysis")
+    os.makedirs(directory, exist_ok=True)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        timestamp = start + timedelta(seconds=i)
+        unique_id = uuid.uuid4().hex[:8]
+        filename = f"job_analysis_{timestamp.strftime('%Y%m%d_%H%M%S')}_{unique_id}.json"
+        data = {
+            "metadata": {"type": "job_analysis", "unique_id": unique_id,
+                         "timestamp": timestamp.isoformat(),
+                         "generated_at": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                         "filename": filename},
+            "input": {"job_description": SAMPLE_JOB_DESCRIPTION,
+                      "job_description_preview": SAMPLE_JOB_DESCRIPTION[:200] + "..."},
+            "output": {"analysis_result": SAMPLE_ANALYSIS, "total_keywords_extracted": 11},
+        }
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+# -- benchmarks ---------------------------------------------------------------
+
+def bench_resume_generation(results, runs):
+    generator = ResumeGenerator()
+    with open(RESUME_PATH, "r", encoding="utf-8") as f:
+        original_resume = f.read()
+    updated_html = generator.generate_updated_resume(
+        test_optimization_result, RESUME_PATH)
+
+    results["generate_updated_resume"] = measure(
+        lambda: generator.generate_updated_resume(test_optimization_result, RESUME_PATH), runs * 10)
+    results["extract_static_info"] = measure(
+        lambda: generator._extract_static_info(original_resume), runs * 10)
+    results["get_diff_html"] = measure(
+        lambda: generator.get_diff_html(original_resume, updated_html), runs)
+
+    output_dir = tempfile.mkdtemp(prefix="resume_bench_pdf_")
+    try:
+        output_path = os.path.join(output_dir, "bench.pdf")
+        results["create_pdf"] = measure(
+            lambda: generator.create_pdf(updated_html, output_path), runs)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def bench_file_manager(results, runs, sizes):
+    for size in sizes:
+        with OutputsSandbox():
+            populate_outputs(size)
+
+            # First call indexes every file; later calls are index queries
+            start = time.perf_counter()
+            list_saved_files("all")
+            results[f"list_saved_files_cold[{size}]"] = {
+                "runs": 1, "median_ms": (time.perf_counter() - start) * 1000}
+            results[f"list_saved_files[{size}]"] = measure(
+                lambda: list_saved_files("all"), runs)
+
+            results[f"save_job_analysis_result[{size}]"] = measure(
+                lambda: save_job_analysis_result(SAMPLE_JOB_DESCRIPTION, SAMPLE_ANALYSIS), runs)
+            results[f"save_resume_optimization_result[{size}]"] = measure(
+                lambda: save_resume_optimization_result(
+                    SAMPLE_ANALYSIS["technologies_and_tools"], SAMPLE_JOB_DESCRIPTION,
+                    test_optimization_result, "benchmark"), runs)
+
+
+def bench_pipeline(results, runs, concurrency_levels):
+    from src.pipeline import run_pipeline_batch
+
+    for concurrency in concurrency_levels:
+        items = [{"id": f"job_{i}", "job_description": f"{SAMPLE_JOB_DESCRIPTION} #{i}"}
+                 for i in range(runs)]
+        with OutputsSandbox() as sandbox:
+            output_dir = os.path.join(sandbox.root, "resumes")
+            start = time.perf_counter()
+            entries = asyncio.run(run_pipeline_batch(
+                items, concurrency=concurrency, output_dir=output_dir))
+            elapsed = time.perf_counter() - start
+
+        failures = [entry for entry in entries if entry["status"] != "ok"]
+        if failures:
+            raise RuntimeError(
+                f"Pipeline benchmark failed: {failures[0]['error']}")
+        results[f"pipeline_fake_llm[concurrency={concurrency}]"] = {
+            "runs": runs,
+            "median_ms": elapsed * 1000 / runs,
+            "total_ms": elapsed * 1000,
+            "docs_per_minute": runs / elapsed * 60,
+        }
+
+
+def bench_rewrite_modes(results, runs, output_rate=2000):
+    """Time the full-prompt and section-parallel rewriters when output size drives latency"""
+    from src.chains import clear_chain_registry, get_rewriter_chain
+
+    with open(RESUME_PATH, "r", encoding="utf-8") as f:
+        resume_text = f.read()
+    # The fake model reads its settings when the chains are built
+    previous_rate = os.environ.get("RESUME_OPTIMIZER_FAKE_OUTPUT_RATE")
+    os.environ["RESUME_OPTIMIZER_FAKE_OUTPUT_RATE"] = str(output_rate)
+    clear_chain_registry()
+    try:
+        for mode in ("full", "sections"):
+            chain = get_rewriter_chain(mode=mode)
+            inputs = {"keywords_to_integrate": SAMPLE_ANALYSIS["technologies_and_tools"],
+                      "original_resume_text": resume_text}
+            results[f"rewrite_fake_llm[mode={mode}]"] = measure(
+                lambda: asyncio.run(chain.ainvoke(inputs)), runs)
+    finally:
+        if previous_rate is None:
+            os.environ.pop("RESUME_OPTIMIZER_FAKE_OUTPUT_RATE", None)
+        else:
+            os.environ["RESUME_OPTIMIZER_FAKE_OUTPUT_RATE"] = previous_rate
+        clear_chain_registry()
+
+
+# -- reporting ----------------------------------------------------------------
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Print a comparison table and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"\n{'Benchmark':<50} {'Median (ms)':>12} {'Baseline':>12} {'Change':>9}")
+    print("-" * 86)
+    for name, stats in results.items():
+        current = stats["median_ms"]
+        previous = baseline.get(name, {}).get("median_ms")
+        if previous is None:
+            print(f"{name:<50} {current:>12.3f} {'-':>12} {'new':>9}")
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<50} {current:>12.3f} {previous:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the resume optimizer benchmark suite")
+    parser.add_argument("--runs", type=int, default=20,
+                        help="Timed runs per benchmark")
+    parser.add_argument("--sizes", default="10,1000,10000",
+                        help="Comma-separated saved-file counts for the file manager benchmarks")
+    parser.add_argument("--concurrency", default="1,8",
+                        help="Comma-separated concurrency levels for the pipeline benchmark")
+    parser.add_argument("--filter", default=None,
+                        help="Only run benchmark groups whose name contains this text "
+                             "(resume_generation, file_manager, pipeline, rewrite)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH,
+                        help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH,
+                        help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown of the median before flagging a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    concurrency_levels = [int(level)
+                          for level in args.concurrency.split(",") if level]
+    groups = {
+        "resume_generation": lambda results: bench_resume_generation(results, args.runs),
+        "file_manager": lambda results: bench_file_manager(results, args.runs, sizes),
+        "pipeline": lambda results: bench_pipeline(results, args.runs, concurrency_levels),
+        "rewrite": lambda results: bench_rewrite_modes(results, args.runs),
+    }
+
+    results = {}
+    for name, run_group in groups.items():
+        if args.filter and args.filter not in name:
+            continue
+        print(f"⏱️  Running {name} benchmarks...")
+        run_group(results)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("benchmarks", {})
+    else:
+        print(f"No baseline found at {args.baseline}; run with --save-baseline to create one.")
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
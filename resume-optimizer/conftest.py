@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run a test from an empty checkout root, so relative output paths land in tmp_path"""
+    from src import file_manager, segment_store
+
+    os.makedirs(tmp_path / "resume-optimizer" / "outputs")
+    monkeypatch.chdir(tmp_path)
+    # Process-wide stores remember that their (relative) paths are initialized
+    monkeypatch.setattr(file_manager, "_output_index", None)
+    monkeypatch.setattr(segment_store, "_segment_store", None)
+    return tmp_path
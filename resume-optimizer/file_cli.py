@@ -6,14 +6,31 @@ Usage: python file_cli.py [command] [options]
 
 import argparse
 import json
+import os
 import sys
 from datetime import datetime
-from src.file_manager import list_saved_files, load_saved_file
+from src.file_manager import (
+    count_saved_files,
+    group_commit,
+    list_saved_files,
+    load_saved_file,
+    migrate_to_segments,
+    query_saved_files,
+    rebuild_index,
+)
 
 
-def list_files(file_type="all"):
+def list_files(file_type="all", keywords_source=None, limit=None):
     """List all saved files."""
-    files = list_saved_files(file_type)
+    if keywords_source is not None or limit is not None:
+        file_types = ["job_analysis", "resume_optimization"] if file_type == "all" else [file_type]
+        files = {
+            t: [row["filename"] for row in query_saved_files(
+                t, keywords_source=keywords_source, limit=limit)]
+            for t in file_types
+        }
+    else:
+        files = list_saved_files(file_type)
 
     if file_type == "all":
         print("📁 All Saved Files:")
@@ -91,9 +108,9 @@ def show_file_details(file_type, filename):
 
 def show_stats():
     """Show summary statistics."""
-    files = list_saved_files("all")
-    job_count = len(files.get("job_analysis", []))
-    resume_count = len(files.get("resume_optimization", []))
+    counts = count_saved_files("all")
+    job_count = counts.get("job_analysis", 0)
+    resume_count = counts.get("resume_optimization", 0)
     total = job_count + resume_count
 
     print("📈 Summary Statistics")
@@ -108,6 +125,246 @@ def show_stats():
         print(f"  Resume Optimization: resume-optimizer/outputs/resume_optimization/")
 
 
+def reindex():
+    """Rebuild the index of saved files from the files on disk."""
+    result = rebuild_index()
+    print("🔄 Index rebuilt")
+    for file_type, changes in result.items():
+        print(f"  {file_type.replace('_', ' ').title()}: "
+              f"{changes['added']} indexed, {changes['removed']} removed")
+
+
+def _directory_usage(path):
+    """Return (bytes, file count) for everything under path."""
+    total_bytes = file_count = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            total_bytes += os.path.getsize(os.path.join(dirpath, name))
+            file_count += 1
+    return total_bytes, file_count
+
+
+def migrate_storage(keep_originals):
+    """Move per-file JSON outputs into compressed segment files."""
+    from src.file_manager import OUTPUT_TYPES, _output_dir
+    from src.segment_store import SEGMENTS_DIR
+
+    def usage():
+        paths = [_output_dir(file_type) for file_type in OUTPUT_TYPES] + [SEGMENTS_DIR]
+        totals = [_directory_usage(path) for path in paths]
+        return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+    bytes_before, files_before = usage()
+    result = migrate_to_segments(keep_originals=keep_originals)
+    bytes_after, files_after = usage()
+
+    print("📦 Migrated saved files to segment storage")
+    for file_type, counts in result.items():
+        print(f"  {file_type.replace('_', ' ').title()}: "
+              f"{counts['migrated']} migrated, {counts['skipped']} skipped (unreadable)")
+    print(f"Disk usage: {bytes_before / 1024:.1f} KB in {files_before} files -> "
+          f"{bytes_after / 1024:.1f} KB in {files_after} files")
+    print("Set RESUME_OPTIMIZER_STORAGE=segments to store new outputs the same way.")
+
+
+def prune(file_types, max_age, max_count, max_size, dry_run):
+    """Remove outputs beyond the retention limits (flags or RESUME_OPTIMIZER_RETENTION)."""
+    from src.retention import (RETENTION_TYPES, RetentionPolicy, parse_duration,
+                               parse_size, policies_from_env, prune_outputs)
+
+    try:
+        if max_age is None and max_count is None and max_size is None:
+            policies = policies_from_env()
+            if file_types:
+                policies = {t: p for t, p in policies.items() if t in file_types}
+        else:
+            policy = RetentionPolicy(
+                max_age_seconds=parse_duration(max_age) if max_age else None,
+                max_count=max_count,
+                max_bytes=parse_size(max_size) if max_size else None)
+            policies = {t: policy for t in file_types or RETENTION_TYPES}
+    except ValueError as e:
+        print(f"❌ Invalid retention limit: {e}")
+        sys.exit(1)
+
+    if not policies:
+        print("No retention limits given; pass --max-age/--max-count/--max-size "
+              "or set RESUME_OPTIMIZER_RETENTION. Only stale temp files are checked.")
+
+    result = prune_outputs(policies, dry_run=dry_run)
+    print("🧹 Would remove" if dry_run else "🧹 Pruned outputs")
+    total_removed = total_bytes = 0
+    for file_type, counts in result.items():
+        total_removed += counts["removed"]
+        total_bytes += counts["bytes"]
+        line = (f"  {file_type.replace('_', ' ').title()}: "
+                f"{counts['removed']} files, {counts['bytes'] / 1024:.1f} KB")
+        if counts.get("segments_compacted"):
+            line += f" ({counts['segments_compacted']} segments compacted)"
+        print(line)
+    print(f"Total: {total_removed} files, {total_bytes / 1024:.1f} KB"
+          + (" (dry run, nothing deleted)" if dry_run else " freed"))
+
+
+def _load_pipeline_inputs(inputs):
+    """Collect job descriptions from files, directories, JSONL files or stdin."""
+    from src.batch import load_job_descriptions
+
+    items = []
+    for source in inputs or ["-"]:
+        if source == "-":
+            text = sys.stdin.read().strip()
+            if text:
+                items.append({"id": "stdin", "job_description": text})
+        elif os.path.isdir(source) or source.endswith(".jsonl"):
+            items += load_job_descriptions(source)
+        else:
+            with open(source, "r", encoding="utf-8") as f:
+                items.append({"id": os.path.basename(source),
+                              "job_description": f.read()})
+    return items
+
+
+def _print_adaptive_concurrency(snapshot):
+    """Print the final adaptive concurrency limit and how it got there."""
+    counts = snapshot["counts"]
+    print(f"Concurrency limit: {snapshot['limit']} "
+          f"(range {snapshot['min_limit']}-{snapshot['max_limit']})")
+    print(f"Throttled: {counts['throttled']}, timed out: {counts['timeout']}")
+    print("Limit history: " + ", ".join(
+        f"{limit}@{seconds:.1f}s" for seconds, limit in snapshot["history"]))
+
+
+def run_pipeline(inputs, concurrency, output_dir, use_group_commit=False,
+                 adaptive=False, max_concurrency=None):
+    """Run the analyze -> rewrite -> PDF pipeline headlessly for each input."""
+    # Imported lazily so list/show/stats don't pay for loading LangChain
+    import asyncio
+    from src.adaptive_concurrency import AdaptiveConcurrencyLimiter
+    from src.pipeline import run_pipeline_batch
+
+    try:
+        items = _load_pipeline_inputs(inputs)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read job descriptions: {e}")
+        sys.exit(1)
+
+    if not items:
+        print("No job descriptions provided.")
+        sys.exit(1)
+
+    print(f"🚀 Running pipeline for {len(items)} job description(s) "
+          f"({'adaptive ' if adaptive else ''}concurrency {concurrency})")
+
+    def on_result(entry):
+        if entry["status"] == "ok":
+            print(f"  ✅ {entry['id']}: {entry['keywords_count']} keywords -> {entry['pdf_path']}")
+            for warning in entry["warnings"]:
+                print(f"     ⚠️  {warning}")
+        else:
+            print(f"  ❌ {entry['id']}: {entry['error']}")
+
+    limiter = None
+    if adaptive:
+        limiter = AdaptiveConcurrencyLimiter(
+            "pipeline", initial_limit=concurrency,
+            max_limit=max_concurrency or concurrency * 8)
+
+    with _commit_mode(use_group_commit):
+        results = asyncio.run(run_pipeline_batch(
+            items, concurrency=concurrency, output_dir=output_dir, on_result=on_result,
+            limiter=limiter))
+
+    success_count = sum(1 for entry in results if entry["status"] == "ok")
+    print(f"\n✅ Completed {success_count}/{len(items)} pipeline runs")
+    print(f"Resumes written to: {output_dir}")
+    if limiter is not None:
+        _print_adaptive_concurrency(limiter.snapshot())
+    if success_count < len(items):
+        sys.exit(1)
+
+
+def _commit_mode(enabled):
+    """group_commit() when requested, otherwise a no-op context."""
+    from contextlib import nullcontext
+    return group_commit() if enabled else nullcontext()
+
+
+def batch_analyze(path, concurrency, max_retries, use_group_commit=False,
+                  adaptive=False, max_concurrency=None, timeout=None):
+    """Analyze every job description in a directory or JSONL file."""
+    from src.batch import load_job_descriptions, run_batch_analysis_sync
+
+    try:
+        items = load_job_descriptions(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load job descriptions: {e}")
+        sys.exit(1)
+
+    if not items:
+        print(f"No job descriptions found in {path}")
+        return
+
+    print(f"🚀 Analyzing {len(items)} job descriptions "
+          f"({'adaptive ' if adaptive else ''}concurrency {concurrency})")
+
+    def on_result(entry):
+        if entry["status"] == "ok" and entry["reused"]:
+            print(f"  ♻️  {entry['id']} -> {entry['saved_path'].split('/')[-1]} "
+                  f"(already analyzed)")
+        elif entry["status"] == "ok":
+            print(f"  ✅ {entry['id']} -> {entry['saved_path'].split('/')[-1]} "
+                  f"({entry['latency_seconds']:.1f}s, {entry['attempts']} attempt(s))")
+        else:
+            print(f"  ❌ {entry['id']}: {entry['error']}")
+
+    with _commit_mode(use_group_commit):
+        summary = run_batch_analysis_sync(
+            items, concurrency=concurrency, max_retries=max_retries, on_result=on_result,
+            adaptive=adaptive, max_concurrency=max_concurrency, timeout=timeout)
+
+    print("\n📈 Batch Summary")
+    print("=" * 30)
+    print(f"Succeeded: {summary['succeeded']}/{summary['total']}")
+    print(f"Failed: {summary['failed']}")
+    print(f"Analyzed: {summary['analyzed']}")
+    print(f"Reused existing analyses: {summary['reused']} (not counted in throughput/latency)")
+    print(f"Elapsed: {summary['elapsed_seconds']:.1f}s")
+    print(f"Throughput: {summary['docs_per_minute']:.1f} docs/minute")
+    if summary["latency_p50_seconds"] is not None:
+        print(f"Latency p50: {summary['latency_p50_seconds']:.2f}s")
+        print(f"Latency p95: {summary['latency_p95_seconds']:.2f}s")
+    if summary["adaptive_concurrency"] is not None:
+        _print_adaptive_concurrency(summary["adaptive_concurrency"])
+
+
+def render_pdfs(filenames, output_dir, workers):
+    """Regenerate PDFs from saved resume optimization files in parallel."""
+    from src.bulk_render import render_optimization_files
+
+    if not filenames:
+        filenames = sorted(list_saved_files(
+            "resume_optimization").get("resume_optimization", []))
+    if not filenames:
+        print("No resume optimization files found.")
+        return
+
+    print(f"📄 Rendering {len(filenames)} PDFs...")
+
+    def on_progress(completed, total, entry):
+        if entry["status"] == "ok":
+            print(f"  [{completed}/{total}] ✅ {entry['filename']} -> {entry['pdf_path']}")
+        else:
+            print(f"  [{completed}/{total}] ❌ {entry['filename']}: {entry['error']}")
+
+    results = render_optimization_files(
+        filenames, output_dir=output_dir, max_workers=workers, progress_callback=on_progress)
+    success_count = sum(1 for entry in results if entry["status"] == "ok")
+    print(f"\n✅ Generated {success_count}/{len(filenames)} PDFs")
+    if success_count < len(filenames):
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Manage resume optimizer saved files")
@@ -118,6 +375,10 @@ def main():
     list_parser = subparsers.add_parser("list", help="List saved files")
     list_parser.add_argument("--type", choices=["all", "job_analysis", "resume_optimization"],
                              default="all", help="Type of files to list")
+    list_parser.add_argument("--source", default=None,
+                             help="Only list optimizations with this keywords source")
+    list_parser.add_argument("--limit", type=int, default=None,
+                             help="Only list the N most recent files of each type")
 
     # Show command
     show_parser = subparsers.add_parser("show", help="Show file details")
@@ -128,6 +389,78 @@ def main():
     # Stats command
     subparsers.add_parser("stats", help="Show summary statistics")
 
+    # Reindex command
+    subparsers.add_parser(
+        "reindex", help="Rebuild the saved files index from disk")
+
+    # Migrate storage command
+    migrate_parser = subparsers.add_parser(
+        "migrate-storage", help="Move saved JSON files into compressed segment files")
+    migrate_parser.add_argument("--keep-originals", action="store_true",
+                                help="Leave the original JSON files in place")
+
+    # Prune command
+    prune_parser = subparsers.add_parser(
+        "prune", help="Delete outputs beyond age/count/size retention limits")
+    prune_parser.add_argument("--type", dest="types", action="append", default=None,
+                              choices=["job_analysis", "resume_optimization", "regenerable_pdf",
+                                       "pdf", "html", "markdown"],
+                              help="Output type to prune (repeatable; default: all)")
+    prune_parser.add_argument("--max-age", default=None,
+                              help="Delete files older than this, e.g. 30d or 12h")
+    prune_parser.add_argument("--max-count", type=int, default=None,
+                              help="Keep at most the N newest files of each type")
+    prune_parser.add_argument("--max-size", default=None,
+                              help="Keep at most this much per type, e.g. 500MB")
+    prune_parser.add_argument("--dry-run", action="store_true",
+                              help="Only report what would be deleted")
+
+    # Batch analyze command
+    batch_parser = subparsers.add_parser(
+        "batch-analyze", help="Analyze job descriptions from a directory or JSONL file")
+    batch_parser.add_argument(
+        "path", help="Directory of .txt/.md files or a JSONL file")
+    batch_parser.add_argument("--concurrency", type=int, default=4,
+                              help="Maximum analyzer calls in flight")
+    batch_parser.add_argument("--max-retries", type=int, default=5,
+                              help="Retries per job description on rate-limit errors and timeouts")
+    batch_parser.add_argument("--adaptive", action="store_true",
+                              help="Adjust concurrency from throttling and latency (AIMD), "
+                                   "starting at --concurrency")
+    batch_parser.add_argument("--max-concurrency", type=int, default=None,
+                              help="Upper bound for --adaptive (default: 8x --concurrency)")
+    batch_parser.add_argument("--timeout", type=float, default=None,
+                              help="Per-call timeout in seconds")
+    batch_parser.add_argument("--group-commit", action="store_true",
+                              help="Batch fsyncs of saved files instead of syncing each one")
+
+    # Render PDFs command
+    render_parser = subparsers.add_parser(
+        "render-pdfs", help="Regenerate PDFs from resume optimization files")
+    render_parser.add_argument("filenames", nargs="*",
+                               help="Optimization files to render (default: all)")
+    render_parser.add_argument("--output-dir", default=None,
+                               help="Directory for the generated PDFs")
+    render_parser.add_argument("--workers", type=int, default=None,
+                               help="Worker processes (default: number of cores)")
+
+    # Run command
+    run_parser = subparsers.add_parser(
+        "run", help="Analyze job descriptions, optimize the resume and generate HTML/PDF resumes")
+    run_parser.add_argument("inputs", nargs="*",
+                            help="Job description files, directories or JSONL files ('-' or none for stdin)")
+    run_parser.add_argument("--concurrency", type=int, default=4,
+                            help="Maximum pipelines in flight")
+    run_parser.add_argument("--output-dir", default="resume-optimizer/outputs/resumes",
+                            help="Directory for the generated HTML and PDF resumes")
+    run_parser.add_argument("--adaptive", action="store_true",
+                            help="Adjust concurrency from throttling and latency (AIMD), "
+                                 "starting at --concurrency")
+    run_parser.add_argument("--max-concurrency", type=int, default=None,
+                            help="Upper bound for --adaptive (default: 8x --concurrency)")
+    run_parser.add_argument("--group-commit", action="store_true",
+                            help="Batch fsyncs of saved files instead of syncing each one")
+
     if len(sys.argv) == 1:
         parser.print_help()
         return
@@ -135,11 +468,26 @@ def main():
     args = parser.parse_args()
 
     if args.command == "list":
-        list_files(args.type)
+        list_files(args.type, args.source, args.limit)
     elif args.command == "show":
         show_file_details(args.type, args.filename)
     elif args.command == "stats":
         show_stats()
+    elif args.command == "reindex":
+        reindex()
+    elif args.command == "migrate-storage":
+        migrate_storage(args.keep_originals)
+    elif args.command == "prune":
+        prune(args.types, args.max_age, args.max_count,
+              args.max_size, args.dry_run)
+    elif args.command == "batch-analyze":
+        batch_analyze(args.path, args.concurrency, args.max_retries, args.group_commit,
+                      args.adaptive, args.max_concurrency, args.timeout)
+    elif args.command == "render-pdfs":
+        render_pdfs(args.filenames, args.output_dir, args.workers)
+    elif args.command == "run":
+        run_pipeline(args.inputs, args.concurrency, args.output_dir,
+                     args.group_commit, args.adaptive, args.max_concurrency)
     else:
         parser.print_help()
 
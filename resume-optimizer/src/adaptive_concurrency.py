@@ -0,0 +1,215 @@
+"""
+AIMD adaptive concurrency for batches of LLM calls.
+
+Instead of a fixed worker count, AdaptiveConcurrencyLimiter lets calls run
+while fewer than `limit` are in flight and adjusts the limit from their
+outcomes, like TCP congestion control. Each healthy completion raises the
+limit by 1/limit, i.e. by about one per round of calls. Rate-limit (429) and
+timeout errors cut it by backoff_factor, at most once per round so a burst of
+failures from the same round only counts once. A completion is healthy when
+its latency stays within latency_tolerance times the moving average latency
+and the recent error rate is below max_error_rate; otherwise the limit holds.
+
+The current limit of every limiter is exported as a metric: through
+get_concurrency_metrics(), in the batch summaries, and as the
+"resume_optimizer.llm.concurrency_limit" OpenTelemetry gauge when
+RESUME_OPTIMIZER_TRACE_OTEL is set.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.rate_limiter import is_rate_limit_error
+from src.tracing import TRACE_OTEL_ENV_VAR
+
+OUTCOMES = ("success", "throttled", "timeout", "error")
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_otel_gauge = None
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Return True for client-side timeouts and provider deadline errors"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status in (408, 504):
+        return True
+    message = str(error).lower()
+    return "deadline_exceeded" in message or "timed out" in message or "timeout" in message
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on calls in flight"""
+
+    def __init__(self, name: str = "llm", initial_limit: int = 4, min_limit: int = 1,
+                 max_limit: int = 32, backoff_factor: float = 0.5,
+                 latency_tolerance: float = 2.0, max_error_rate: float = 0.2,
+                 window: int = 20):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._outcomes = deque(maxlen=window)
+        self._baseline_latency = None
+        self._last_decrease = float("-inf")
+        self._started = time.monotonic()
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self.history = [(0.0, self.limit)]
+        _register(self)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _set_limit(self, value: float) -> None:
+        previous = self.limit
+        self._limit = min(max(value, self.min_limit), self.max_limit)
+        if self.limit != previous:
+            self.history.append((round(time.monotonic() - self._started, 3), self.limit))
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()"""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled; hand it on
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        return time.monotonic()
+
+    def release(self, started: float, outcome: Optional[str]) -> None:
+        """Free a slot and adjust the limit; outcome None (cancelled) leaves it unchanged"""
+        self._in_flight -= 1
+        if outcome is not None:
+            self._record(outcome, time.monotonic() - started, started)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _record(self, outcome: str, latency: float, started: float) -> None:
+        self.counts[outcome] += 1
+        self._outcomes.append(outcome)
+        if outcome in ("throttled", "timeout"):
+            # Calls started before the last decrease were admitted under the old
+            # limit; their failures are part of the congestion already handled
+            if started > self._last_decrease:
+                self._set_limit(self._limit * self.backoff_factor)
+                self._last_decrease = time.monotonic()
+            return
+        if outcome != "success":
+            return
+
+        healthy_latency = (self._baseline_latency is None
+                           or latency <= self.latency_tolerance * self._baseline_latency)
+        # A slow moving average, so one cache hit or outlier barely moves it
+        self._baseline_latency = latency if self._baseline_latency is None else (
+            0.9 * self._baseline_latency + 0.1 * latency)
+        error_rate = sum(1 for o in self._outcomes if o != "success") / len(self._outcomes)
+        if healthy_latency and error_rate <= self.max_error_rate:
+            self._set_limit(self._limit + 1 / self._limit)
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn() in a slot and feed its outcome back into the limit.
+
+        Args:
+            fn: Zero-argument coroutine function (e.g. lambda: chain.ainvoke(inputs))
+            timeout: Optional per-call timeout in seconds; expiry counts as a timeout
+
+        Raises:
+            Whatever fn raises, or asyncio.TimeoutError
+        """
+        started = await self.acquire()
+        outcome = None
+        try:
+            if timeout is None:
+                result = await fn()
+            else:
+                result = await asyncio.wait_for(fn(), timeout)
+            outcome = "success"
+            return result
+        except Exception as e:
+            if is_rate_limit_error(e):
+                outcome = "throttled"
+            elif is_timeout_error(e):
+                outcome = "timeout"
+            else:
+                outcome = "error"
+            raise
+        finally:
+            self.release(started, outcome)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limit, calls in flight, outcome counts and limit history"""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency_seconds": self._baseline_latency,
+            "counts": dict(self.counts),
+            "history": list(self.history),
+        }
+
+
+def _register(limiter: AdaptiveConcurrencyLimiter) -> None:
+    with _limiters_lock:
+        _limiters[limiter.name] = limiter
+    _ensure_otel_gauge()
+
+
+def get_concurrency_metrics() -> List[Dict[str, Any]]:
+    """Snapshots of the most recent limiter for each name"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.snapshot() for limiter in limiters]
+
+
+def _ensure_otel_gauge() -> None:
+    global _otel_gauge
+    if _otel_gauge is not None or os.getenv(TRACE_OTEL_ENV_VAR, "").lower() not in ("1", "true", "on"):
+        return
+    try:
+        from opentelemetry import metrics
+    except ImportError:
+        return
+
+    def observe(options):
+        return [metrics.Observation(snapshot["limit"], {"limiter": snapshot["name"]})
+                for snapshot in get_concurrency_metrics()]
+
+    with _limiters_lock:
+        if _otel_gauge is None:
+            _otel_gauge = metrics.get_meter("resume_optimizer").create_observable_gauge(
+                "resume_optimizer.llm.concurrency_limit", callbacks=[observe],
+                description="Current adaptive concurrency limit for LLM calls")
@@ -1,6 +1,8 @@
 """
 Application utilities for the resume optimizer
 """
+import uuid
+
 import streamlit as st
 
 
@@ -17,6 +19,14 @@ def initialize_all_session_state():
     if 'keywords_for_rewrite' not in st.session_state:
         st.session_state['keywords_for_rewrite'] = None
 
+    # Background pipeline jobs submitted from this session
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
+    if 'pipeline_jobs' not in st.session_state:
+        st.session_state['pipeline_jobs'] = []
+    if 'applied_pipeline_jobs' not in st.session_state:
+        st.session_state['applied_pipeline_jobs'] = set()
+
     # Resume generation session state
     if 'last_optimization_result' not in st.session_state:
         st.session_state['last_optimization_result'] = None
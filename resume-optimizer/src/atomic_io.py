@@ -0,0 +1,234 @@
+"""
+Crash-safe file writes.
+
+atomic_write_json writes to a temporary file in the target directory, fsyncs
+it, renames it over the destination and fsyncs the directory, so readers only
+ever see the old file or the complete new one - never a truncated JSON file.
+
+GroupCommit batches that work for high-throughput runs: staged files are
+written without fsync and become visible together when the group commits (after
+max_pending files or max_delay seconds). Each commit fsyncs the staged files, renames them,
+and then fsyncs each touched directory once. Files registered with track()
+(e.g. append-only segments) are fsynced once per commit instead of once per
+record. A crash loses at most the uncommitted group, never produces partial files.
+
+A write that fails to commit stays queued for the next commit, and the error
+is raised from commit()/close() in the caller's thread, including errors of
+commits run by the background timer.
+"""
+import json
+import os
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+_TEMP_SUFFIX_LENGTH = len(".12345678.tmp")
+
+
+def _temp_path(path: str) -> str:
+    # Hidden, and without the .json suffix, so directory scans never pick it up
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f".{filename}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def pending_filenames(names: List[str]) -> Set[str]:
+    """Filenames with a write in progress (or staged for a group commit) among directory entries"""
+    return {name[1:-_TEMP_SUFFIX_LENGTH] for name in names
+            if name.startswith(".") and name.endswith(".tmp") and len(name) > _TEMP_SUFFIX_LENGTH + 1}
+
+
+def fsync_directory(directory: str) -> None:
+    """Persist a directory entry change (create/rename) to disk"""
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_path(path: str) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _write_temp_json(path: str, data: Any, sync: bool) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = _temp_path(path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """Durably replace path with data serialized as indented JSON"""
+    temp_path = _write_temp_json(path, data, sync=True)
+    os.replace(temp_path, path)
+    fsync_directory(os.path.dirname(path))
+
+
+class GroupCommit:
+    """Batches fsyncs and renames of many writes into periodic commits"""
+
+    def __init__(self, max_pending: int = 100, max_delay: float = 1.0):
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        # Held for a whole commit, so commit() and close() wait for a commit
+        # the background timer already started (reentrant for on_commit
+        # callbacks that stage more writes)
+        self._commit_lock = threading.RLock()
+        self._staged: List[Tuple[str, str, Optional[Callable[[], None]]]] = []
+        self._tracked = set()
+        self._directories = set()
+        self._timer = None
+        # Error of a background commit that a retry cannot fix (an on_commit
+        # callback), raised by the next commit() in the caller's thread
+        self._error = None
+        self.commits = 0
+
+    def stage_json(self, path: str, data: Any, on_commit: Optional[Callable[[], None]] = None) -> None:
+        """Write data for path; it appears at path (and on_commit runs) at the next commit"""
+        temp_path = _write_temp_json(path, data, sync=False)
+        with self._lock:
+            self._staged.append((temp_path, path, on_commit))
+            full = len(self._staged) >= self.max_pending
+            self._schedule_locked()
+        if full:
+            self.commit()
+
+    def track(self, path: str) -> None:
+        """fsync path at the next commit (for files appended to in place)"""
+        with self._lock:
+            self._tracked.add(path)
+            self._schedule_locked()
+
+    def _schedule_locked(self):
+        if self._timer is None and self.max_delay is not None:
+            self._timer = threading.Timer(self.max_delay, self._commit_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _commit_in_background(self):
+        # Failed writes are requeued by _commit() and retried (and their error
+        # raised) by the next commit; only callback errors need keeping. The
+        # error is stored before the commit lock is released, so a commit()
+        # waiting on that lock always sees it
+        with self._commit_lock:
+            _, _, callback_error = self._commit()
+            if callback_error is not None:
+                with self._lock:
+                    self._error = self._error or callback_error
+
+    def _commit(self):
+        """Commit what is pending; returns (counts, write error, on_commit error)"""
+        with self._commit_lock:
+            return self._commit_pending()
+
+    def _commit_pending(self):
+        with self._lock:
+            staged, self._staged = self._staged, []
+            tracked, self._tracked = self._tracked, set()
+            directories, self._directories = self._directories, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        error = None
+        committed, failed = [], []
+        for entry in staged:
+            temp_path, path, _ = entry
+            try:
+                fsync_path(temp_path)
+                os.replace(temp_path, path)
+            except OSError as e:
+                failed.append(entry)
+                error = error or e
+                continue
+            committed.append(entry)
+            directories.add(os.path.dirname(path))
+        failed_tracked = set()
+        for path in tracked:
+            try:
+                fsync_path(path)
+            except FileNotFoundError:
+                # Removed since it was tracked (e.g. a compacted segment)
+                continue
+            except OSError as e:
+                failed_tracked.add(path)
+                error = error or e
+                continue
+            directories.add(os.path.dirname(path))
+        failed_directories = set()
+        for directory in directories:
+            try:
+                fsync_directory(directory)
+            except OSError as e:
+                failed_directories.add(directory)
+                error = error or e
+
+        if failed or failed_tracked or failed_directories:
+            with self._lock:
+                self._staged[:0] = failed
+                self._tracked |= failed_tracked
+                self._directories |= failed_directories
+
+        callback_error = None
+        for _, _, on_commit in committed:
+            if on_commit:
+                try:
+                    on_commit()
+                except Exception as e:
+                    callback_error = callback_error or e
+        if committed or len(tracked) > len(failed_tracked):
+            self.commits += 1
+        return ({"files": len(committed), "tracked": len(tracked) - len(failed_tracked)},
+                error, callback_error)
+
+    def commit(self) -> Dict[str, int]:
+        """
+        Make every staged and tracked write durable; returns what was committed.
+
+        Raises:
+            OSError: When a write could not be committed; it stays queued
+            Exception: The first error of an on_commit callback, here or in
+                a commit run by the background timer
+        """
+        with self._commit_lock:
+            counts, error, callback_error = self._commit()
+            with self._lock:
+                background_error, self._error = self._error, None
+        for e in (error, callback_error, background_error):
+            if e is not None:
+                raise e
+        return counts
+
+    def close(self) -> Dict[str, int]:
+        """
+        Commit whatever is still pending and stop the timer.
+
+        Waits for a background commit that is still running. Writes that
+        still fail to commit are dropped (their temporary files removed) and
+        the error is raised, as is any error a background commit left behind.
+        """
+        try:
+            return self.commit()
+        except BaseException:
+            with self._lock:
+                staged, self._staged = self._staged, []
+                self._tracked.clear()
+                self._directories.clear()
+            for temp_path, _, _ in staged:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            raise
@@ -0,0 +1,206 @@
+"""
+Batch job description analysis with bounded concurrency.
+
+Job descriptions are read from a directory of text files or a JSONL file, fanned
+out through the analyzer chain by a fixed (or AIMD-adjusted) number of async
+workers, retried with exponential backoff on rate-limit errors and timeouts and
+persisted with save_job_analysis_result.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.adaptive_concurrency import AdaptiveConcurrencyLimiter, is_timeout_error
+from src.chains import get_analyzer_chain
+from src.event_loop import run_sync
+from src.file_manager import find_job_analysis, save_job_analysis_result
+from src.rate_limiter import is_rate_limit_error
+from src.response_cache import is_cache_enabled
+
+JOB_DESCRIPTION_EXTENSIONS = ('.txt', '.md')
+JSONL_TEXT_FIELDS = ('job_description', 'text', 'description')
+
+
+def load_job_descriptions(path: str) -> List[Dict[str, str]]:
+    """
+    Load job descriptions from a directory or a JSONL file.
+
+    A directory contributes one job description per .txt/.md file. A JSONL file
+    contributes one per line, read from the "job_description", "text" or
+    "description" field, with an optional "id".
+
+    Returns:
+        List of {"id": ..., "job_description": ...} dicts
+    """
+    items = []
+
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith(JOB_DESCRIPTION_EXTENSIONS):
+                continue
+            with open(os.path.join(path, filename), 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+            if text:
+                items.append({"id": filename, "job_description": text})
+        return items
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = next((record[field] for field in JSONL_TEXT_FIELDS
+                         if record.get(field)), None)
+            if text is None:
+                raise ValueError(
+                    f"Line {line_number} of {path} has no job description field")
+            items.append({"id": str(record.get("id", line_number)),
+                          "job_description": text})
+    return items
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of values, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def _analyze_with_retry(chain, job_description: str, max_retries: int, base_delay: float,
+                              limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                              timeout: Optional[float] = None):
+    """Invoke the analyzer, backing off exponentially (with jitter) on rate limits and timeouts"""
+    def call():
+        invocation = chain.ainvoke({"job_description": job_description})
+        return invocation if timeout is None else asyncio.wait_for(invocation, timeout)
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = await (limiter.run(call) if limiter is not None else call())
+            return result, attempt
+        except Exception as e:
+            if not (is_rate_limit_error(e) or is_timeout_error(e)) or attempt > max_retries:
+                raise
+            delay = base_delay * (2 ** (attempt - 1))
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+
+async def run_batch_analysis(items: List[Dict[str, str]],
+                             concurrency: int = 4,
+                             max_retries: int = 5,
+                             base_delay: float = 2.0,
+                             on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             adaptive: bool = False,
+                             max_concurrency: Optional[int] = None,
+                             timeout: Optional[float] = None,
+                             reuse_analysis: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Analyze and persist a batch of job descriptions.
+
+    Args:
+        items: Job descriptions as returned by load_job_descriptions
+        concurrency: Maximum number of analyzer calls in flight (the starting
+            limit when adaptive)
+        max_retries: Retries per item on rate-limit errors and timeouts
+        base_delay: Initial backoff delay in seconds
+        on_result: Optional callback invoked with each per-item result
+        adaptive: Adjust the number of calls in flight with AIMD (see
+            src/adaptive_concurrency.py) instead of keeping it fixed
+        max_concurrency: Upper bound for the adaptive limit (default 8x concurrency)
+        timeout: Optional per-call timeout in seconds
+        reuse_analysis: Reuse saved analyses of the same job descriptions instead
+            of calling the model; defaults to whether the response cache is enabled
+
+    Returns:
+        Summary dict with per-item results, throughput and latency percentiles
+        of the analyzed items (reused ones are counted separately), plus the
+        adaptive limit's final value and history
+    """
+    if reuse_analysis is None:
+        reuse_analysis = is_cache_enabled()
+    chain = get_analyzer_chain()
+    limiter = None
+    workers = concurrency
+    if adaptive:
+        limiter = AdaptiveConcurrencyLimiter(
+            "batch_analysis", initial_limit=concurrency,
+            max_limit=max_concurrency or concurrency * 8)
+        # Enough workers for the limit to grow into; the limiter gates the calls
+        workers = limiter.max_limit
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+    results = []
+
+    async def worker():
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            start = time.perf_counter()
+            entry = {"id": item["id"], "status": "ok"}
+            try:
+                existing = await asyncio.to_thread(find_job_analysis, item["job_description"]) \
+                    if reuse_analysis else None
+                if existing:
+                    # Same posting (ignoring case and whitespace) was analyzed before
+                    entry["attempts"] = 0
+                    entry["reused"] = True
+                    entry["saved_path"] = existing["file_path"]
+                else:
+                    analysis_result, attempts = await _analyze_with_retry(
+                        chain, item["job_description"], max_retries, base_delay,
+                        limiter, timeout)
+                    entry["attempts"] = attempts
+                    entry["reused"] = False
+                    entry["saved_path"] = await asyncio.to_thread(
+                        save_job_analysis_result, item["job_description"], analysis_result,
+                        dedupe=reuse_analysis)
+            except Exception as e:
+                entry["status"] = "error"
+                entry["error"] = str(e)
+            entry["latency_seconds"] = time.perf_counter() - start
+
+            results.append(entry)
+            if on_result:
+                on_result(entry)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(workers, len(items) or 1)))))
+    elapsed = time.perf_counter() - start
+
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    # Reused analyses take milliseconds; counting them would inflate the
+    # throughput and hide the model's latency
+    latencies = [r["latency_seconds"] for r in results
+                 if r["status"] == "ok" and not r["reused"]]
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "analyzed": len(latencies),
+        "reused": succeeded - len(latencies),
+        "concurrency": concurrency,
+        "adaptive_concurrency": limiter.snapshot() if limiter is not None else None,
+        "elapsed_seconds": elapsed,
+        "docs_per_minute": len(latencies) / elapsed * 60 if elapsed > 0 else 0.0,
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "results": results,
+    }
+
+
+def run_batch_analysis_sync(items: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+    """Blocking wrapper around run_batch_analysis, run on the shared event loop"""
+    return run_sync(run_batch_analysis(items, **kwargs))
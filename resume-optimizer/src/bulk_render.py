@@ -0,0 +1,124 @@
+"""
+Parallel bulk PDF generation from saved resume optimization files.
+
+WeasyPrint layout is CPU-bound, so PDFs are rendered in a process pool sized
+to the machine's cores. Each file is rendered independently; a failure in one
+file is reported in its result entry and does not affect the others.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from src.file_manager import load_saved_file, record_artifact_source
+from src.resume_generator import ResumeGenerator, get_pdf_renderer
+
+DEFAULT_PDF_OUTPUT_DIR = "resume-optimizer/outputs"
+
+# One generator per worker process, created by the pool initializer
+_worker_generator = None
+
+
+def _init_worker():
+    global _worker_generator
+    _worker_generator = ResumeGenerator()
+
+
+def pdf_filename_for(optimization_filename: str) -> str:
+    """Name of the PDF rendered from a resume optimization JSON file"""
+    return f"resume_from_{os.path.splitext(optimization_filename)[0]}.pdf"
+
+
+def render_optimization_file(filename: str, output_dir: Optional[str] = None) -> str:
+    """
+    Render one saved optimization file to PDF.
+
+    Args:
+        filename: Resume optimization JSON filename
+        output_dir: Directory for the PDF (defaults to the outputs folder)
+
+    Returns:
+        str: Path of the generated PDF
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        _init_worker()
+
+    file_data = load_saved_file("resume_optimization", filename)
+    optimization_result = file_data["output"]["optimization_result"]
+
+    updated_resume_html = _worker_generator.generate_updated_resume(
+        optimization_result)
+    output_path = os.path.join(
+        output_dir or DEFAULT_PDF_OUTPUT_DIR, pdf_filename_for(filename))
+    pdf_path = _worker_generator.create_pdf(updated_resume_html, output_path)
+    record_artifact_source(pdf_path, filename)
+    return pdf_path
+
+
+def render_pdf_bytes(optimization_result: Dict[str, Any]) -> bytes:
+    """
+    Render an optimization result to PDF in memory.
+
+    Args:
+        optimization_result: Rewriter output (OptimizedResumeContent fields)
+
+    Returns:
+        bytes: The PDF document
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        _init_worker()
+
+    updated_resume_html = _worker_generator.generate_updated_resume(
+        optimization_result)
+    return get_pdf_renderer().render(updated_resume_html, None)
+
+
+def render_optimization_files(filenames: List[str],
+                              output_dir: Optional[str] = None,
+                              max_workers: Optional[int] = None,
+                              progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Render many saved optimization files to PDF in a process pool.
+
+    Args:
+        filenames: Resume optimization JSON filenames
+        output_dir: Directory for the PDFs (defaults to the outputs folder)
+        max_workers: Worker processes (defaults to the number of cores)
+        progress_callback: Optional callback(completed, total, result) invoked
+            in the calling thread as each file finishes
+
+    Returns:
+        One {"filename", "status", "pdf_path" | "error"} dict per input file,
+        in input order
+    """
+    if not filenames:
+        return []
+
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(filenames)))
+    results = {}
+
+    # "spawn" avoids forking a multi-threaded parent (the Streamlit server)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(render_optimization_file, filename, output_dir): filename
+            for filename in filenames
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            filename = futures[future]
+            try:
+                entry = {"filename": filename, "status": "ok",
+                         "pdf_path": future.result()}
+            except Exception as e:
+                entry = {"filename": filename,
+                         "status": "error", "error": str(e)}
+            results[filename] = entry
+
+            if progress_callback:
+                progress_callback(completed, len(filenames), entry)
+
+    return [results[filename] for filename in filenames]
@@ -1,13 +1,34 @@
 # # import os
 # # import getpass
+import json
+import os
+import threading
+import time
 from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
-from src.prompts import JOB_ANALYZER_PROMPT, REWRITE_PROMPT_TEMPLATE
+from pydantic import ValidationError
+from src.prompts import (
+    ANALYZER_MODEL,
+    JOB_ANALYZER_PROMPT,
+    JOB_ANALYZER_PROMPT_VERSION,
+    REWRITE_PROMPT_TEMPLATE,
+    REWRITE_PROMPT_VERSION,
+    SECTION_REWRITE_FOCUS,
+    SECTION_REWRITE_PROMPT_TEMPLATE,
+    SECTION_REWRITE_PROMPT_VERSION,
+    get_model_provider,
+)
 # <-- import the Pydantic models
-from src.parsers import JobDescriptionKeywords, OptimizedResumeContent
+from src.parsers import SECTION_MODELS, JobDescriptionKeywords, OptimizedResumeContent
+from src.hedging import HedgedChain, hedge_model_from_env
+from src.rate_limiter import RateLimitedChain, get_quota_manager
+from src.response_cache import CachedChain, is_cache_enabled
+from src.section_rewriter import SectionParallelRewriter
+from src.fake_llm import fake_model_from_env
+from src.tracing import get_langchain_tracer
 
 load_dotenv()
 
@@ -18,25 +39,136 @@ load_dotenv()
 
 # print("Gemini 2.5: " + str(gemini_15.invoke("what's your name").content) + "\n")
 
-# Function to build and return the Job Analyzer chain
+REWRITER_MODEL = "gemini-2.5-pro"
+REWRITER_TEMPERATURE = 0.5
+
+# Output token budgets reserved from the per-model token quota until the model
+# reports actual usage (the 2.5 models also spend tokens on thinking)
+ANALYZER_MAX_OUTPUT_TOKENS = 2048
+REWRITER_MAX_OUTPUT_TOKENS = 8192
+SECTION_REWRITER_MAX_OUTPUT_TOKENS = 4096
+
+# "full" (default) uses the single full-resume prompt; "sections" rewrites each
+# resume section in its own concurrent call (src/section_rewriter.py)
+REWRITE_MODE_ENV_VAR = "RESUME_OPTIMIZER_REWRITE_MODE"
+REWRITE_MODES = ("full", "sections")
+DEFAULT_REWRITE_MODE = "full"
+
+# Text that identifies each prompt for the response cache. The output schemas
+# are included because they are rendered into the prompts as format instructions.
+_ANALYZER_CACHE_PROMPT = JOB_ANALYZER_PROMPT + json.dumps(
+    JobDescriptionKeywords.model_json_schema(), sort_keys=True)
+_REWRITER_CACHE_PROMPT = REWRITE_PROMPT_TEMPLATE + json.dumps(
+    OptimizedResumeContent.model_json_schema(), sort_keys=True)
+_SECTION_CACHE_PROMPTS = {
+    section: SECTION_REWRITE_PROMPT_TEMPLATE + SECTION_REWRITE_FOCUS[section] + json.dumps(
+        model.model_json_schema(), sort_keys=True)
+    for section, model in SECTION_MODELS.items()
+}
+
+# Process-wide chain registry. Chains (prompt, model client and parser) are
+# stateless once built, so a single instance per configuration is shared by
+# every Streamlit session and thread in the process.
+_chain_registry = {}
+_chain_registry_lock = threading.Lock()
+_chain_registry_stats = {
+    "hits": 0,
+    "misses": 0,
+    "build_seconds_total": 0.0,
+    "build_seconds_by_key": {},
+}
+
+
+def _get_or_build_chain(key, builder):
+    """Return the registered chain for key, building it on first use"""
+    chain = _chain_registry.get(key)
+    if chain is not None:
+        with _chain_registry_lock:
+            _chain_registry_stats["hits"] += 1
+        return chain
+
+    with _chain_registry_lock:
+        # Another thread may have built the chain while we waited for the lock
+        chain = _chain_registry.get(key)
+        if chain is not None:
+            _chain_registry_stats["hits"] += 1
+            return chain
+
+        start = time.perf_counter()
+        chain = builder()
+        elapsed = time.perf_counter() - start
+
+        _chain_registry[key] = chain
+        _chain_registry_stats["misses"] += 1
+        _chain_registry_stats["build_seconds_total"] += elapsed
+        _chain_registry_stats["build_seconds_by_key"][":".join(
+            str(part) for part in key)] = elapsed
+        return chain
+
+
+def get_chain_registry_stats():
+    """Return a snapshot of the chain registry hit/miss and build-time counters"""
+    with _chain_registry_lock:
+        return {
+            "hits": _chain_registry_stats["hits"],
+            "misses": _chain_registry_stats["misses"],
+            "cached_chains": len(_chain_registry),
+            "build_seconds_total": _chain_registry_stats["build_seconds_total"],
+            "build_seconds_by_key": dict(_chain_registry_stats["build_seconds_by_key"]),
+        }
 
 
-def get_analyzer_chain():
+def clear_chain_registry():
+    """Drop all cached chains and reset the counters (e.g. after changing API keys)"""
+    with _chain_registry_lock:
+        _chain_registry.clear()
+        _chain_registry_stats["hits"] = 0
+        _chain_registry_stats["misses"] = 0
+        _chain_registry_stats["build_seconds_total"] = 0.0
+        _chain_registry_stats["build_seconds_by_key"] = {}
+
+
+def get_rewrite_mode():
+    """Return the configured rewrite mode ("full" or "sections")"""
+    mode = os.getenv(REWRITE_MODE_ENV_VAR, DEFAULT_REWRITE_MODE).strip().lower()
+    if mode not in REWRITE_MODES:
+        raise ValueError(f"{REWRITE_MODE_ENV_VAR} must be one of {REWRITE_MODES}, got {mode!r}")
+    return mode
+
+
+def _init_model(provider, model_name, temperature=None):
+    """Create the chat model client; temperature None keeps the provider default"""
+    if provider == "fake":
+        return fake_model_from_env(model_name)
+    if temperature is None:
+        return init_chat_model(model_name, model_provider=provider)
+    return init_chat_model(
+        model_name, model_provider=provider, temperature=temperature
+    )
+
+
+def _rate_limited(chain, provider, model_name, prompt_template, max_output_tokens):
+    """Put the chain behind the shared per-model quota, unless rate limiting is off"""
+    quota = get_quota_manager(provider)
+    if quota is None:
+        return chain
+    return RateLimitedChain(chain, quota, model_name, len(prompt_template), max_output_tokens)
+
+
+def _build_analyzer_chain(provider, model_name, temperature):
     prompt = PromptTemplate(
         template=JOB_ANALYZER_PROMPT,
         input_variables=["job_description"]
     )
-    model = init_chat_model(
-        "gemini-2.5-flash", model_provider="google_genai"
-    )
+    model = _init_model(provider, model_name, temperature)
     parser = JsonOutputParser(pydantic_object=JobDescriptionKeywords)
     # The pipe (`|`) operator is used here to chain LangChain components: prompt, model, and parser.
     chain = prompt | model | parser
-    return chain
+    # Record prompt, model (with token usage) and parser steps as trace spans
+    return chain.with_config(callbacks=[get_langchain_tracer()])
 
 
-# Function to build and return the Resume Rewriter chain
-def get_rewriter_chain():
+def _build_rewriter_chain(provider, model_name, temperature):
     # 1. Create the Parser: Instantiate JsonOutputParser with OptimizedResumeContent
     parser = JsonOutputParser(pydantic_object=OptimizedResumeContent)
 
@@ -48,8 +180,120 @@ def get_rewriter_chain():
     )
 
     # 3. Assemble the Chain: Create the rewriter_chain by piping components together
-    model = init_chat_model(
-        "gemini-2.5-pro", model_provider="google_genai", temperature=0.5
-    )
+    model = _init_model(provider, model_name, temperature)
     rewriter_chain = prompt | model | parser
-    return rewriter_chain
+    return rewriter_chain.with_config(callbacks=[get_langchain_tracer()])
+
+
+def _build_section_rewriter_chain(provider, model_name, temperature, section):
+    """Rewriter chain for a single section, with that section's sub-schema"""
+    parser = JsonOutputParser(pydantic_object=SECTION_MODELS[section])
+    prompt = ChatPromptTemplate.from_template(
+        template=SECTION_REWRITE_PROMPT_TEMPLATE,
+        partial_variables={
+            "format_instructions": parser.get_format_instructions(),
+            "section_focus": SECTION_REWRITE_FOCUS[section]}
+    )
+    model = _init_model(provider, model_name, temperature)
+    chain = prompt | model | parser
+    return chain.with_config(callbacks=[get_langchain_tracer()])
+
+
+def _is_valid_rewrite(result, model=OptimizedResumeContent):
+    """True when result validates against model's schema"""
+    try:
+        model.model_validate(result)
+    except ValidationError:
+        return False
+    return True
+
+
+def _hedged(build, provider, model_name, hedge_model, validate, label=""):
+    """
+    Build a chain with build(model_name) that hedges slow calls with hedge_model.
+
+    hedge_model None disables hedging. label keeps the latency histograms of
+    differently sized calls to the same model apart.
+    """
+    chain = build(model_name)
+    if hedge_model is None:
+        return chain
+    hedge = chain if hedge_model == model_name else build(hedge_model)
+    return HedgedChain(chain, hedge, f"{provider}:{model_name}{label}",
+                       f"{provider}:{hedge_model}{label}", validate=validate)
+
+
+# Function to build and return the Job Analyzer chain
+def get_analyzer_chain(model_name=ANALYZER_MODEL, temperature=None, use_cache=None):
+    """
+    Return the shared analyzer chain, fronted by the response cache.
+
+    Pass use_cache=False (or set RESUME_OPTIMIZER_LLM_CACHE=0) to always call the model.
+    """
+    provider = get_model_provider()
+    key = ("analyzer", provider, model_name,
+           temperature, JOB_ANALYZER_PROMPT_VERSION)
+    chain = _get_or_build_chain(key, lambda: _rate_limited(
+        _build_analyzer_chain(provider, model_name, temperature), provider, model_name,
+        _ANALYZER_CACHE_PROMPT, ANALYZER_MAX_OUTPUT_TOKENS))
+    return CachedChain(
+        chain, _ANALYZER_CACHE_PROMPT, f"{provider}:{model_name}", temperature,
+        enabled=is_cache_enabled() if use_cache is None else use_cache, name="analyzer",
+        validate=lambda result: _is_valid_rewrite(result, JobDescriptionKeywords))
+
+
+# Function to build and return the Resume Rewriter chain
+def get_rewriter_chain(model_name=REWRITER_MODEL, temperature=REWRITER_TEMPERATURE, use_cache=None,
+                       mode=None):
+    """
+    Return the shared rewriter chain, fronted by the response cache.
+
+    By default this uses the single full-resume prompt. In "sections" mode (pass
+    mode="sections" or set RESUME_OPTIMIZER_REWRITE_MODE) it is a
+    SectionParallelRewriter over one cached chain per section. Set RESUME_OPTIMIZER_HEDGE to hedge
+    async calls slower than the model's p95 (see src/hedging.py).
+    Pass use_cache=False (or set RESUME_OPTIMIZER_LLM_CACHE=0) to always call the model.
+    """
+    if (mode or get_rewrite_mode()) == "sections":
+        return SectionParallelRewriter({
+            section: get_section_rewriter_chain(section, model_name, temperature, use_cache)
+            for section in SECTION_MODELS
+        })
+
+    provider = get_model_provider()
+    hedge_model = hedge_model_from_env(model_name)
+    key = ("rewriter", provider, model_name,
+           temperature, REWRITE_PROMPT_VERSION, hedge_model)
+    chain = _get_or_build_chain(key, lambda: _hedged(
+        lambda name: _rate_limited(
+            _build_rewriter_chain(provider, name, temperature), provider, name,
+            _REWRITER_CACHE_PROMPT, REWRITER_MAX_OUTPUT_TOKENS),
+        provider, model_name, hedge_model, _is_valid_rewrite))
+    return CachedChain(
+        chain, _REWRITER_CACHE_PROMPT, f"{provider}:{model_name}", temperature,
+        enabled=is_cache_enabled() if use_cache is None else use_cache, name="rewriter",
+        validate=_is_valid_rewrite)
+
+
+def get_section_rewriter_chain(section, model_name=REWRITER_MODEL, temperature=REWRITER_TEMPERATURE,
+                               use_cache=None):
+    """
+    Return the shared rewriter chain for one OptimizedResumeContent section.
+
+    Its result is {section: value}; cached, rate limited and (if enabled) hedged
+    like the full rewriter, with a latency histogram of its own.
+    """
+    provider = get_model_provider()
+    hedge_model = hedge_model_from_env(model_name)
+    key = ("section_rewriter", section, provider, model_name,
+           temperature, SECTION_REWRITE_PROMPT_VERSION, hedge_model)
+    chain = _get_or_build_chain(key, lambda: _hedged(
+        lambda name: _rate_limited(
+            _build_section_rewriter_chain(provider, name, temperature, section), provider, name,
+            _SECTION_CACHE_PROMPTS[section], SECTION_REWRITER_MAX_OUTPUT_TOKENS),
+        provider, model_name, hedge_model,
+        lambda result: _is_valid_rewrite(result, SECTION_MODELS[section]), label=f":{section}"))
+    return CachedChain(
+        chain, _SECTION_CACHE_PROMPTS[section], f"{provider}:{model_name}", temperature,
+        enabled=is_cache_enabled() if use_cache is None else use_cache, name=f"rewriter.{section}",
+        validate=lambda result: _is_valid_rewrite(result, SECTION_MODELS[section]))
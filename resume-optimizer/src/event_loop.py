@@ -0,0 +1,53 @@
+"""
+Process-wide event loop for synchronous callers.
+
+The chains are cached for the life of the process, and so are the async HTTP
+clients of their models. An asyncio client is bound to the loop it was first
+used on, so running each call under its own asyncio.run() loop (one per
+Streamlit click or job thread) fails with "Event loop is closed" once the
+first loop is gone. run_sync() instead runs every coroutine on a single loop
+that lives in a background daemon thread.
+"""
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared event loop, starting its thread on first use"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="resume-event-loop",
+                                 daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine on the shared event loop and block until it finishes.
+
+    Must not be called from the shared loop's own thread, which would deadlock.
+    """
+    loop = get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("run_sync() cannot be called from the shared event loop")
+
+    future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+    try:
+        return future.result()
+    except BaseException:
+        # Interrupted while waiting (e.g. KeyboardInterrupt): stop the task too
+        future.cancel()
+        raise
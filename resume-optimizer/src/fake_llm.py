@@ -0,0 +1,302 @@
+"""
+Deterministic stand-in chat model for offline benchmarking and load tests.
+
+FakeResumeChatModel answers the analyzer and rewriter prompts with
+schema-valid JobDescriptionKeywords / OptimizedResumeContent JSON derived from
+a hash of the prompt, so identical prompts always get identical answers. Latency
+and failures are drawn from configurable distributions using a seeded RNG.
+
+Select it with RESUME_OPTIMIZER_MODEL_PROVIDER=fake; see fake_model_from_env
+for the other settings.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.parsers import JobDescriptionKeywords, OptimizedResumeContent
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# Vocabulary the fake analyzer draws keywords from
+_TECHNICAL_SKILLS = ["Distributed Systems", "Data Structures", "Algorithms", "API Design",
+                     "Microservices", "System Design", "Machine Learning", "Data Modeling",
+                     "Backend Development", "Object-Oriented Design", "Performance Tuning"]
+_TECHNOLOGIES = ["Python", "Java", "Spring Boot", "Django", "Flask", "PostgreSQL", "MySQL",
+                 "Redis", "Docker", "Kubernetes", "AWS", "GCP", "Kafka", "React", "Angular",
+                 "Jenkins", "Git", "Terraform", "LangChain", "SQL"]
+_SOFT_SKILLS = ["Communication", "Collaboration", "Ownership", "Mentoring",
+                "Stakeholder Management", "Problem Solving"]
+_CERTIFICATIONS = ["AWS Certified Developer", "Certified Kubernetes Administrator"]
+_OTHER_REQUIREMENTS = ["3+ years of industry experience", "Bachelor's degree in Computer Science",
+                       "Experience with production on-call", "Remote-friendly team"]
+
+_FILLER = ("Delivered measurable improvements by applying {a} and {b} across production "
+           "services, partnering with cross-functional teams to ship reliable features, "
+           "reduce latency, improve test coverage and document decisions for future engineers. ")
+
+# Character bounds taken from the OptimizedResumeContent field descriptions
+_SECTION_SHAPES = {
+    "updated_summary": (None, 500, 550),
+    "liberty_mutual_group": (3, 230, 250),
+    "inovace_technologies": (3, 230, 250),
+    "spider_digital_commerce": (2, 180, 240),
+    "echo_project": (2, 180, 240),
+}
+
+
+class FakeRateLimitError(Exception):
+    """Simulated provider quota error (HTTP 429)"""
+    status_code = 429
+
+
+class FakeModelError(Exception):
+    """Simulated provider failure"""
+    status_code = 500
+
+
+def _text_of_length(rng: random.Random, minimum: int, maximum: int) -> str:
+    target = rng.randint(minimum, maximum)
+    text = ""
+    while len(text) < target:
+        text += _FILLER.format(a=rng.choice(_TECHNOLOGIES),
+                               b=rng.choice(_TECHNICAL_SKILLS))
+    return text[:target - 1].rstrip() + "."
+
+
+class FakeResumeChatModel(BaseChatModel):
+    """Offline chat model returning schema-valid resume optimizer JSON"""
+
+    model_name: str = "fake"
+    latency_distribution: str = "lognormal"
+    latency_mean: float = 0.5
+    latency_sigma: float = 0.5
+    failure_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Simulated provider throttling: calls beyond this many in flight get a 429
+    max_concurrency: Optional[int] = None
+    # Simulated generation speed: when set, each call also takes len(output) / rate seconds
+    output_chars_per_second: Optional[float] = None
+    seed: Optional[int] = None
+    stream_chunk_size: int = 40
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+    _in_flight: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-resume-optimizer"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    # -- simulated behaviour -------------------------------------------------
+
+    def _sample_latency(self) -> float:
+        with self._rng_lock:
+            if self.latency_distribution == "fixed":
+                return self.latency_mean
+            if self.latency_distribution == "uniform":
+                return self._rng.uniform(0, 2 * self.latency_mean)
+            # lognormal with the requested mean
+            mu = -self.latency_sigma ** 2 / 2
+            return self.latency_mean * self._rng.lognormvariate(mu, self.latency_sigma)
+
+    def _latency_for(self, message: AIMessage) -> float:
+        """Sampled latency plus the time to generate message at output_chars_per_second"""
+        latency = self._sample_latency()
+        if self.output_chars_per_second:
+            latency += len(message.content) / self.output_chars_per_second
+        return latency
+
+    def _maybe_fail(self) -> None:
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeRateLimitError(
+                "429 RESOURCE_EXHAUSTED: simulated rate limit")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise FakeModelError("500 INTERNAL: simulated model failure")
+
+    @contextmanager
+    def _admit(self):
+        """Count the call as in flight, rejecting it when over max_concurrency"""
+        with self._rng_lock:
+            if self.max_concurrency is not None and self._in_flight >= self.max_concurrency:
+                raise FakeRateLimitError(
+                    "429 RESOURCE_EXHAUSTED: simulated concurrency limit exceeded")
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._rng_lock:
+                self._in_flight -= 1
+
+    # -- response content ----------------------------------------------------
+
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(message.content) for message in messages)
+
+    def _response_for(self, prompt: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(
+            f"{self.model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+
+        requested_sections = [
+            section for section in OptimizedResumeContent.model_fields if section in prompt]
+        if requested_sections:
+            return self._resume_content(rng, requested_sections)
+        return self._job_keywords(rng, prompt)
+
+    @staticmethod
+    def _job_keywords(rng: random.Random, prompt: str) -> Dict[str, Any]:
+        lowered = prompt.lower()
+
+        def pick(vocabulary, count):
+            # Prefer terms that actually appear in the job description
+            found = [term for term in vocabulary if term.lower() in lowered]
+            rest = [term for term in vocabulary if term not in found]
+            rng.shuffle(rest)
+            return (found + rest)[:count]
+
+        result = {
+            "technical_skills": pick(_TECHNICAL_SKILLS, rng.randint(3, 6)),
+            "technologies_and_tools": pick(_TECHNOLOGIES, rng.randint(4, 8)),
+            "soft_skills": pick(_SOFT_SKILLS, rng.randint(1, 3)),
+            "certifications": pick(_CERTIFICATIONS, rng.randint(0, 1)),
+            "other_requirements": pick(_OTHER_REQUIREMENTS, rng.randint(1, 3)),
+        }
+        return JobDescriptionKeywords(**result).model_dump()
+
+    @staticmethod
+    def _resume_content(rng: random.Random, sections: List[str]) -> Dict[str, Any]:
+        result = {}
+        for section in sections:
+            count, minimum, maximum = _SECTION_SHAPES[section]
+            if count is None:
+                result[section] = _text_of_length(rng, minimum, maximum)
+            else:
+                result[section] = [_text_of_length(rng, minimum, maximum)
+                                   for _ in range(count)]
+        return result
+
+    def _message_for(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = self._prompt_text(messages)
+        content = "```json\n" + \
+            json.dumps(self._response_for(prompt), indent=2) + "\n```"
+        input_tokens = max(1, len(prompt) // 4)
+        output_tokens = max(1, len(content) // 4)
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                            "total_tokens": input_tokens + output_tokens},
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _chunks(self, message: AIMessage) -> Iterator[str]:
+        content = message.content
+        for start in range(0, len(content), self.stream_chunk_size):
+            yield content[start:start + self.stream_chunk_size]
+
+    @staticmethod
+    def _generation_chunk(message: AIMessage, text: str, last: bool) -> ChatGenerationChunk:
+        # Like Gemini, report token usage on the final streamed chunk only
+        usage = message.usage_metadata if last else None
+        return ChatGenerationChunk(message=AIMessageChunk(content=text, usage_metadata=usage))
+
+    # -- BaseChatModel interface ---------------------------------------------
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._message_for(messages)
+        with self._admit():
+            time.sleep(self._latency_for(message))
+            self._maybe_fail()
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._message_for(messages)
+        with self._admit():
+            await asyncio.sleep(self._latency_for(message))
+            self._maybe_fail()
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message = self._message_for(messages)
+        chunks = list(self._chunks(message))
+        latency = self._latency_for(message)
+        with self._admit():
+            # Half the latency before the first token, the rest spread over the chunks
+            time.sleep(latency / 2)
+            self._maybe_fail()
+            for index, chunk in enumerate(chunks):
+                time.sleep(latency / 2 / len(chunks))
+                yield self._generation_chunk(message, chunk, last=index == len(chunks) - 1)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._message_for(messages)
+        chunks = list(self._chunks(message))
+        latency = self._latency_for(message)
+        with self._admit():
+            await asyncio.sleep(latency / 2)
+            self._maybe_fail()
+            for index, chunk in enumerate(chunks):
+                await asyncio.sleep(latency / 2 / len(chunks))
+                yield self._generation_chunk(message, chunk, last=index == len(chunks) - 1)
+
+
+def fake_model_from_env(model_name: str) -> FakeResumeChatModel:
+    """
+    Build a FakeResumeChatModel configured from environment variables.
+
+    RESUME_OPTIMIZER_FAKE_LATENCY       mean latency in seconds (default 1.0 for
+                                        "pro" models, 0.3 otherwise)
+    RESUME_OPTIMIZER_FAKE_LATENCY_DIST  fixed | uniform | lognormal (default lognormal)
+    RESUME_OPTIMIZER_FAKE_LATENCY_SIGMA lognormal sigma (default 0.5)
+    RESUME_OPTIMIZER_FAKE_FAILURE_RATE  probability of a simulated 500 (default 0)
+    RESUME_OPTIMIZER_FAKE_RATE_LIMIT_RATE probability of a simulated 429 (default 0)
+    RESUME_OPTIMIZER_FAKE_MAX_CONCURRENCY calls allowed in flight before the model
+                                        throttles with 429s (default unlimited)
+    RESUME_OPTIMIZER_FAKE_OUTPUT_RATE   output characters generated per second; adds
+                                        len(output) / rate to each call (default off)
+    RESUME_OPTIMIZER_FAKE_SEED          RNG seed for latency/failures (default unseeded)
+    """
+    default_latency = 1.0 if "pro" in model_name else 0.3
+    seed = os.getenv("RESUME_OPTIMIZER_FAKE_SEED")
+    max_concurrency = os.getenv("RESUME_OPTIMIZER_FAKE_MAX_CONCURRENCY")
+    output_rate = os.getenv("RESUME_OPTIMIZER_FAKE_OUTPUT_RATE")
+    return FakeResumeChatModel(
+        model_name=model_name,
+        latency_mean=float(os.getenv(
+            "RESUME_OPTIMIZER_FAKE_LATENCY", default_latency)),
+        latency_distribution=os.getenv(
+            "RESUME_OPTIMIZER_FAKE_LATENCY_DIST", "lognormal"),
+        latency_sigma=float(os.getenv(
+            "RESUME_OPTIMIZER_FAKE_LATENCY_SIGMA", 0.5)),
+        failure_rate=float(os.getenv(
+            "RESUME_OPTIMIZER_FAKE_FAILURE_RATE", 0.0)),
+        rate_limit_rate=float(os.getenv(
+            "RESUME_OPTIMIZER_FAKE_RATE_LIMIT_RATE", 0.0)),
+        max_concurrency=int(max_concurrency) if max_concurrency else None,
+        output_chars_per_second=float(output_rate) if output_rate else None,
+        seed=int(seed) if seed is not None else None,
+    )
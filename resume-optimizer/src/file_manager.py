@@ -1,29 +1,347 @@
 import json
 import os
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+from src.atomic_io import GroupCommit, atomic_write_json
+from src.output_index import OutputIndex, normalized_content_hash, record_from_data
+from src.prompts import get_analyzer_version
+from src.segment_store import get_segment_store, is_segment_storage_enabled
+from src.tracing import span
 
-def save_job_analysis_result(job_description: str, analysis_result: Dict[str, Any]) -> str:
+OUTPUTS_DIR = "resume-optimizer/outputs"
+OUTPUT_TYPES = ("job_analysis", "resume_optimization")
+INDEX_PATH = f"{OUTPUTS_DIR}/index.sqlite3"
+
+_output_index = None
+_output_index_lock = threading.Lock()
+
+# Active GroupCommit while inside group_commit(); None means every save is
+# individually durable
+_group_commit = None
+_group_commit_lock = threading.Lock()
+
+
+def get_output_index() -> OutputIndex:
+    """Return the process-wide index of saved outputs"""
+    global _output_index
+    if _output_index is None:
+        with _output_index_lock:
+            if _output_index is None:
+                _output_index = OutputIndex(INDEX_PATH)
+    return _output_index
+
+
+def _output_dir(file_type: str) -> str:
+    return f"{OUTPUTS_DIR}/{file_type}"
+
+
+def _index_saved_file(file_type: str, file_path: str, data: Dict[str, Any]) -> None:
+    """Add a freshly saved file to the index"""
+    record = record_from_data(
+        file_type, os.path.basename(file_path), file_path, data)
+    get_output_index().upsert(record, directory=_output_dir(file_type))
+
+
+def _write_output(file_type: str, filename: str, data: Dict[str, Any]) -> str:
+    """
+    Persist one output record with the configured storage backend.
+
+    Returns:
+        str: The record's path; with segment storage this is the logical path
+        under the output directory, which load_saved_file resolves via the index
+    """
+    file_path = f"{_output_dir(file_type)}/{filename}"
+    committer = _group_commit
+    if is_segment_storage_enabled():
+        location = get_segment_store().append(
+            file_type, filename, data, sync=committer is None)
+        if committer is not None:
+            committer.track(location["segment_path"])
+            committer.track(location["segment_path"] + ".idx")
+        get_output_index().upsert(record_from_data(
+            file_type, filename, location["segment_path"], data, location))
+        return file_path
+
+    if committer is not None:
+        # Renamed into place (and indexed) when the group commits
+        committer.stage_json(
+            file_path, data, on_commit=lambda: _index_saved_file(file_type, file_path, data))
+        return file_path
+
+    atomic_write_json(file_path, data)
+    _index_saved_file(file_type, file_path, data)
+    return file_path
+
+
+@contextmanager
+def group_commit(max_pending: int = 100, max_delay: float = 1.0):
+    """
+    Batch the fsyncs of every save made inside the block.
+
+    Saves stay atomic, but files become durable and visible together, every
+    max_pending saves or max_delay seconds and when the block exits, instead
+    of paying an fsync per record. Meant for batch runs processing many
+    postings; a crash can lose the saves of the last uncommitted group.
+
+    Args:
+        max_pending: Commit after this many staged files
+        max_delay: Commit at most this many seconds after the first staged write
+
+    Yields:
+        GroupCommit: The active committer
+
+    Raises:
+        OSError: When saves could not be committed at exit (including after a
+            failed background commit); those saves are discarded
+    """
+    global _group_commit
+    with _group_commit_lock:
+        if _group_commit is not None:
+            raise RuntimeError("group_commit() is already active")
+        committer = GroupCommit(max_pending=max_pending, max_delay=max_delay)
+        _group_commit = committer
+    try:
+        yield committer
+    finally:
+        with _group_commit_lock:
+            _group_commit = None
+        committer.close()
+
+
+def _sync_index(file_types) -> None:
+    """Resynchronize the index for directories changed outside of this module"""
+    index = get_output_index()
+    for file_type in file_types:
+        directory = _output_dir(file_type)
+        if index.is_stale(directory):
+            index.sync_directory(file_type, directory)
+
+
+def _segment_records(file_type: str) -> List[Dict[str, Any]]:
+    return [
+        record_from_data(file_type, filename,
+                         location["segment_path"], data, location)
+        for filename, location, data in get_segment_store().iter_records(file_type)
+    ]
+
+
+def rebuild_index() -> Dict[str, Dict[str, int]]:
+    """
+    Re-read every saved file and segment record and rebuild the index from scratch.
+
+    Returns:
+        Dict mapping each output type to the number of rows added and removed
+    """
+    index = get_output_index()
+    results = {}
+    for file_type in OUTPUT_TYPES:
+        counts = index.sync_directory(
+            file_type, _output_dir(file_type), full=True)
+        segment_records = _segment_records(file_type)
+        counts["removed"] += index.delete_segment_rows(file_type)
+        index.upsert_many(segment_records)
+        counts["added"] += len(segment_records)
+        results[file_type] = counts
+    return results
+
+
+def migrate_to_segments(keep_originals: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Move per-file JSON outputs into the segment store.
+
+    Each file is appended to the current segment and re-indexed at its new
+    location before the original is removed, so an interrupted migration can
+    simply be run again.
+
+    Args:
+        keep_originals: Leave the JSON files in place after copying them
+
+    Returns:
+        Dict mapping each output type to the number of files migrated and skipped
+    """
+    store = get_segment_store()
+    index = get_output_index()
+    results = {}
+    for file_type in OUTPUT_TYPES:
+        directory = _output_dir(file_type)
+        filenames = sorted(f for f in os.listdir(directory) if f.endswith('.json')) \
+            if os.path.isdir(directory) else []
+        records, skipped = [], 0
+        for filename in filenames:
+            try:
+                with open(f"{directory}/{filename}", 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                skipped += 1
+                continue
+            location = store.append(file_type, filename, data, sync=False)
+            records.append(record_from_data(
+                file_type, filename, location["segment_path"], data, location))
+
+        # Only drop the originals once the segment copies are durable and indexed
+        committer = GroupCommit(max_delay=None)
+        for segment_path in {record["file_path"] for record in records}:
+            committer.track(segment_path)
+            committer.track(segment_path + ".idx")
+        committer.commit()
+        index.upsert_many(records)
+        if not keep_originals:
+            for record in records:
+                os.remove(f"{directory}/{record['filename']}")
+            if os.path.isdir(directory):
+                # Record the emptied directory so the next listing doesn't rescan it
+                index.sync_directory(file_type, directory)
+        results[file_type] = {"migrated": len(records), "skipped": skipped}
+    return results
+
+
+def delete_saved_files(file_type: str, filenames: List[str]) -> Dict[str, int]:
+    """
+    Delete saved outputs and their index rows.
+
+    Records kept in segment files are removed by compacting each affected
+    segment into a new one that holds only the remaining records.
+
+    Args:
+        file_type: "job_analysis" or "resume_optimization"
+        filenames: Filenames to delete
+
+    Returns:
+        Dict with the number of records removed, bytes freed and segments compacted
+    """
+    index = get_output_index()
+    store = get_segment_store()
+    directory = _output_dir(file_type)
+    removed, freed = set(), 0
+    by_segment = {}
+    for filename in filenames:
+        file_path = f"{directory}/{filename}"
+        if os.path.exists(file_path):
+            freed += os.path.getsize(file_path)
+            os.remove(file_path)
+            removed.add(filename)
+        row = index.get(file_type, filename)
+        if row is not None and row["segment_offset"] is not None:
+            by_segment.setdefault(row["file_path"], set()).add(filename)
+        elif filename in removed:
+            index.delete(file_type, filename)
+    if removed and os.path.isdir(directory):
+        index.sync_directory(file_type, directory)
+
+    def _segment_bytes(segment_path):
+        return sum(os.path.getsize(path) for path in (segment_path, segment_path + ".idx")
+                   if path and os.path.exists(path))
+
+    for segment_path, drop in by_segment.items():
+        if not os.path.exists(segment_path):
+            index.delete_many(file_type, sorted(drop))
+            continue
+        before = _segment_bytes(segment_path)
+
+        def repoint(locations, drop=drop):
+            index.relocate(file_type, locations)
+            index.delete_many(file_type, sorted(drop))
+
+        new_path = store.compact(segment_path, drop, repoint)
+        freed += before - (_segment_bytes(new_path) if new_path else 0)
+        removed |= drop
+
+    return {"removed": len(removed), "bytes": freed, "segments_compacted": len(by_segment)}
+
+
+def record_artifact_source(artifact_path: str, saved_path: str,
+                           file_type: str = "resume_optimization") -> None:
+    """
+    Remember that a generated file (e.g. a PDF) was made from a saved output.
+
+    Retention treats such files as regenerable for as long as the saved
+    output is kept, whatever the file is called.
+    """
+    get_output_index().record_artifact(
+        os.path.normpath(artifact_path), file_type, os.path.basename(saved_path))
+
+
+def artifact_sources() -> Dict[str, Dict[str, str]]:
+    """Recorded artifacts as {normalized path: {"file_type", "filename"}}"""
+    return get_output_index().artifacts()
+
+
+def forget_artifacts(paths: List[str]) -> None:
+    """Drop the recorded sources of generated files that were removed"""
+    get_output_index().delete_artifacts([os.path.normpath(path) for path in paths])
+
+
+def job_description_hash(job_description: str, analyzer_version: Optional[str] = None) -> str:
+    """
+    Content hash of a job description, ignoring case and whitespace.
+
+    The analyzer version (provider, model and prompt version, by default the
+    current analyzer's) is part of the hash, so analyses by another model or
+    prompt are never reused.
+    """
+    if analyzer_version is None:
+        analyzer_version = get_analyzer_version()
+    return normalized_content_hash(job_description, analyzer_version)
+
+
+def find_job_analysis(job_description: str, analyzer_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Look up a saved analysis of the same job description.
+
+    Args:
+        job_description: The job description text
+        analyzer_version: See job_description_hash
+
+    Returns:
+        Dict with the saved "file_path" and its "analysis_result", or None if
+        this posting has not been analyzed before
+    """
+    _sync_index(("job_analysis",))
+    row = get_output_index().find_by_hash(
+        "job_analysis", job_description_hash(job_description, analyzer_version))
+    if row is None:
+        return None
+    try:
+        data = load_saved_file("job_analysis", row["filename"])
+    except (OSError, ValueError):
+        return None
+    return {
+        "file_path": f"{_output_dir('job_analysis')}/{row['filename']}",
+        "analysis_result": data["output"]["analysis_result"],
+    }
+
+
+def save_job_analysis_result(job_description: str, analysis_result: Dict[str, Any],
+                             dedupe: bool = False, analyzer_version: Optional[str] = None) -> str:
     """
     Save job analysis result to a JSON file with metadata.
 
     Args:
         job_description: The original job description text
         analysis_result: The analysis result from the analyzer chain
+        dedupe: Return the existing file instead of saving again when the same
+            job description (ignoring case and whitespace) was already saved for
+            this analyzer; for callers that reuse saved analyses. Otherwise the
+            result is always saved, and the older file stays the one reused.
+        analyzer_version: See job_description_hash
 
     Returns:
         str: The file path where the result was saved
     """
+    if analyzer_version is None:
+        analyzer_version = get_analyzer_version()
+    content_hash = job_description_hash(job_description, analyzer_version)
+
     # Generate unique identifier
     unique_id = str(uuid.uuid4())[:8]
     timestamp = datetime.now()
 
     # Create filename with timestamp and unique ID
     filename = f"job_analysis_{timestamp.strftime('%Y%m%d_%H%M%S')}_{unique_id}.json"
-    file_path = f"resume-optimizer/outputs/job_analysis/{filename}"
-
     # Prepare data to save
     data_to_save = {
         "metadata": {
@@ -31,7 +349,9 @@ def save_job_analysis_result(job_description: str, analysis_result: Dict[str, An
             "unique_id": unique_id,
             "timestamp": timestamp.isoformat(),
             "generated_at": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "filename": filename
+            "filename": filename,
+            "analyzer_version": analyzer_version,
+            "content_hash": content_hash
         },
         "input": {
             "job_description": job_description,
@@ -43,12 +363,24 @@ def save_job_analysis_result(job_description: str, analysis_result: Dict[str, An
         }
     }
 
-    # Save to file
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data_to_save, f, indent=2, ensure_ascii=False)
+    if dedupe:
+        # Claiming the hash in the index is atomic, so concurrent saves (and
+        # saves staged in the same group commit) of one posting keep one file
+        _sync_index(("job_analysis",))
+        file_path = f"{_output_dir('job_analysis')}/{filename}"
+        existing = get_output_index().claim(
+            record_from_data("job_analysis", filename, file_path, data_to_save))
+        if existing is not None:
+            return f"{_output_dir('job_analysis')}/{existing['filename']}"
 
-    return file_path
+    # Save to file (or segment store)
+    try:
+        with span("file.save", file_type="job_analysis", filename=filename):
+            return _write_output("job_analysis", filename, data_to_save)
+    except BaseException:
+        if dedupe:
+            get_output_index().delete("job_analysis", filename)
+        raise
 
 
 def save_resume_optimization_result(keywords: List[str], original_resume: str, optimization_result: Dict[str, Any], source_type: str = "job_analysis") -> str:
@@ -70,8 +402,6 @@ def save_resume_optimization_result(keywords: List[str], original_resume: str, o
 
     # Create filename with timestamp and unique ID
     filename = f"resume_optimization_{timestamp.strftime('%Y%m%d_%H%M%S')}_{unique_id}.json"
-    file_path = f"resume-optimizer/outputs/resume_optimization/{filename}"
-
     # Prepare data to save
     data_to_save = {
         "metadata": {
@@ -93,12 +423,9 @@ def save_resume_optimization_result(keywords: List[str], original_resume: str, o
         }
     }
 
-    # Save to file
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data_to_save, f, indent=2, ensure_ascii=False)
-
-    return file_path
+    # Save to file (or segment store)
+    with span("file.save", file_type="resume_optimization", filename=filename):
+        return _write_output("resume_optimization", filename, data_to_save)
 
 
 def list_saved_files(output_type: str = "all") -> Dict[str, List[str]]:
@@ -111,27 +438,62 @@ def list_saved_files(output_type: str = "all") -> Dict[str, List[str]]:
     Returns:
         Dict with file lists for each type
     """
-    base_path = "resume-optimizer/outputs"
+    file_types = OUTPUT_TYPES if output_type == "all" else (output_type,)
+    _sync_index(file_types)
 
-    result = {}
+    index = get_output_index()
+    return {
+        file_type: [row["filename"]
+                    for row in index.query(file_type=file_type)]
+        for file_type in file_types
+    }
 
-    if output_type in ["all", "job_analysis"]:
-        job_analysis_path = f"{base_path}/job_analysis"
-        if os.path.exists(job_analysis_path):
-            result["job_analysis"] = [f for f in os.listdir(
-                job_analysis_path) if f.endswith('.json')]
-        else:
-            result["job_analysis"] = []
 
-    if output_type in ["all", "resume_optimization"]:
-        resume_opt_path = f"{base_path}/resume_optimization"
-        if os.path.exists(resume_opt_path):
-            result["resume_optimization"] = [f for f in os.listdir(
-                resume_opt_path) if f.endswith('.json')]
-        else:
-            result["resume_optimization"] = []
+def query_saved_files(file_type: str, keywords_source: Optional[str] = None,
+                      since: Optional[str] = None, until: Optional[str] = None,
+                      newest_first: bool = True, limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Query the index of saved files without opening them.
+
+    Args:
+        file_type: "job_analysis" or "resume_optimization"
+        keywords_source: Only return optimizations with this keywords source
+        since: Only return files saved at or after this ISO timestamp
+        until: Only return files saved before this ISO timestamp
+        newest_first: Sort by timestamp descending (default) or ascending
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip (for pagination)
 
-    return result
+    Returns:
+        List of index rows (filename, file_path, timestamp, keywords_count, ...)
+    """
+    _sync_index((file_type,))
+    return get_output_index().query(
+        file_type=file_type, keywords_source=keywords_source, since=since,
+        until=until, newest_first=newest_first, limit=limit, offset=offset)
+
+
+def count_saved_files(output_type: str = "all", keywords_source: Optional[str] = None) -> Dict[str, int]:
+    """
+    Count saved files using the index.
+
+    Args:
+        output_type: "all", "job_analysis", or "resume_optimization"
+        keywords_source: Only count optimizations with this keywords source
+
+    Returns:
+        Dict with the file count for each type
+    """
+    file_types = OUTPUT_TYPES if output_type == "all" else (output_type,)
+    _sync_index(file_types)
+
+    index = get_output_index()
+    return {
+        file_type: index.count(
+            file_type=file_type, keywords_source=keywords_source)
+        for file_type in file_types
+    }
 
 
 def load_saved_file(file_type: str, filename: str) -> Dict[str, Any]:
@@ -145,11 +507,15 @@ def load_saved_file(file_type: str, filename: str) -> Dict[str, Any]:
     Returns:
         Dict containing the saved data
     """
-    base_path = "resume-optimizer/outputs"
-    file_path = f"{base_path}/{file_type}/{filename}"
+    file_path = f"{_output_dir(file_type)}/{filename}"
 
     if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+        # Records in the segment store are located through the index
+        row = get_output_index().get(file_type, filename)
+        if row is None or row["segment_offset"] is None:
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return get_segment_store().read(
+            row["file_path"], row["segment_offset"], row["segment_length"])
 
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
@@ -0,0 +1,281 @@
+"""
+Hedged requests for slow LLM calls.
+
+HedgedChain wraps a chain and tracks the latency of its calls in per-model
+histograms. When a call is still running after the primary model's p95 (until
+enough calls have been seen, a fixed default deadline), a second "hedge"
+request is sent to the same model or a faster fallback model. Whichever valid
+result arrives first is returned and the other request is cancelled, so one
+slow generation no longer sets the latency of the whole run. Hedging is off
+unless RESUME_OPTIMIZER_HEDGE is set, since every hedge is a second paid call.
+
+Configured with environment variables:
+
+    RESUME_OPTIMIZER_HEDGE           "off" (default), "same", or a model name
+                                     such as gemini-2.5-flash
+    RESUME_OPTIMIZER_HEDGE_QUANTILE  latency quantile used as the deadline (default 0.95)
+    RESUME_OPTIMIZER_HEDGE_DEADLINE  deadline in seconds until the histogram has
+                                     RESUME_OPTIMIZER_HEDGE_MIN_SAMPLES calls (defaults 45, 20)
+"""
+import asyncio
+import bisect
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.tracing import span
+
+HEDGE_ENV_VAR = "RESUME_OPTIMIZER_HEDGE"
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_HEDGE_DEADLINE_SECONDS = 45.0
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+
+# Log-spaced histogram buckets from 50ms to ~10 minutes, each 20% wider than
+# the last, so quantiles are accurate to within a bucket (20%)
+_BUCKET_BOUNDS = [0.05 * 1.2 ** i for i in range(53)]
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram with log-spaced buckets"""
+
+    def __init__(self):
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self._total = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._total
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile, or None when empty"""
+        with self._lock:
+            if not self._total:
+                return None
+            rank = max(1, math.ceil(q * self._total))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return _BUCKET_BOUNDS[min(index, len(_BUCKET_BOUNDS) - 1)]
+        return _BUCKET_BOUNDS[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self._total,
+            "mean_seconds": self._sum / self._total if self._total else None,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def get_latency_histogram(model_name: str) -> LatencyHistogram:
+    """Return the process-wide latency histogram for model_name"""
+    histogram = _histograms.get(model_name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(model_name, LatencyHistogram())
+    return histogram
+
+
+def get_latency_metrics() -> Dict[str, Dict[str, Any]]:
+    """Latency percentiles of every model called in this process"""
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {model_name: histogram.snapshot() for model_name, histogram in histograms.items()}
+
+
+def hedge_model_from_env(model_name: str) -> Optional[str]:
+    """Model to send hedged requests to for model_name, or None when hedging is off"""
+    setting = os.getenv(HEDGE_ENV_VAR, "off").strip()
+    if setting.lower() in ("off", "0", "false", "no", ""):
+        return None
+    return model_name if setting.lower() == "same" else setting
+
+
+class HedgedChain:
+    """
+    Wrap a chain so slow calls are raced against a hedged request.
+
+    `hedge` is the chain for the hedged request (the same chain object to hedge
+    with the same model) and `validate` decides whether a result counts; until
+    the hedge has been sent the primary's result is returned as is. Only
+    ainvoke/astream are hedged. Synchronous calls go straight to the primary
+    chain (their latency is still recorded): a blocking call cannot be
+    cancelled, and driving the async path from a throwaway event loop would
+    reuse the model's async HTTP client across loops.
+    """
+
+    def __init__(self, chain, hedge, model_name: str, hedge_model_name: str,
+                 validate: Optional[Callable[[Any], bool]] = None,
+                 quantile: Optional[float] = None, deadline: Optional[float] = None,
+                 min_samples: Optional[int] = None):
+        self.chain = chain
+        self.hedge = hedge
+        self.model_name = model_name
+        self.hedge_model_name = hedge_model_name
+        self.validate = validate or (lambda result: result is not None)
+        self.quantile = quantile if quantile is not None else float(os.getenv(
+            "RESUME_OPTIMIZER_HEDGE_QUANTILE", DEFAULT_HEDGE_QUANTILE))
+        self.default_deadline = deadline if deadline is not None else float(os.getenv(
+            "RESUME_OPTIMIZER_HEDGE_DEADLINE", DEFAULT_HEDGE_DEADLINE_SECONDS))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv(
+            "RESUME_OPTIMIZER_HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES))
+        self.histogram = get_latency_histogram(model_name)
+        self.hedge_histogram = get_latency_histogram(hedge_model_name)
+
+    def deadline(self) -> float:
+        """Seconds to wait for the primary before sending the hedged request"""
+        if self.histogram.count < self.min_samples:
+            return self.default_deadline
+        return self.histogram.quantile(self.quantile)
+
+    def _is_valid(self, result) -> bool:
+        try:
+            return bool(self.validate(result))
+        except Exception:
+            return False
+
+    async def _timed(self, awaitable, histogram):
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            # A cancelled loser took at least this long; leaving it out would
+            # drag the p95 (and so the deadline) down with every hedge
+            histogram.observe(time.perf_counter() - started)
+            raise
+        histogram.observe(time.perf_counter() - started)
+        return result
+
+    async def _race(self, primary, start_hedge, current):
+        """
+        Wait for primary, sending the hedge after the deadline; first valid result wins.
+
+        Args:
+            primary: Task running the primary call
+            start_hedge: Zero-argument function that starts the hedge task
+            current: The span to record hedged/winner attributes on
+
+        Returns:
+            ("primary" or "hedge", result)
+        """
+        done, _ = await asyncio.wait({primary}, timeout=self.deadline())
+        if done:
+            return "primary", primary.result()
+
+        current.set_attribute("hedged", True)
+        hedge = start_hedge()
+        labels = {primary: "primary", hedge: "hedge"}
+        pending = {primary, hedge}
+        first_error = None
+        fallback = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        if task is primary or first_error is None:
+                            first_error = task.exception()
+                        continue
+                    if self._is_valid(task.result()):
+                        current.set_attribute("winner", labels[task])
+                        return labels[task], task.result()
+                    if task is primary or fallback is None:
+                        fallback = task
+        finally:
+            for task in pending:
+                task.cancel()
+        if fallback is not None:
+            current.set_attribute("winner", labels[fallback])
+            return labels[fallback], fallback.result()
+        raise first_error
+
+    def _span(self, mode):
+        return span("chain.hedge", model=self.model_name, hedge_model=self.hedge_model_name,
+                    mode=mode, hedged=False, winner="primary")
+
+    def invoke(self, inputs, config=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.chain.invoke(inputs, config, **kwargs)
+        finally:
+            self.histogram.observe(time.perf_counter() - started)
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        with self._span("ainvoke") as current:
+            primary = asyncio.create_task(self._timed(
+                self.chain.ainvoke(inputs, config, **kwargs), self.histogram))
+            try:
+                _, result = await self._race(primary, lambda: asyncio.create_task(self._timed(
+                    self.hedge.ainvoke(inputs, config, **kwargs), self.hedge_histogram)), current)
+                return result
+            finally:
+                primary.cancel()
+
+    def stream(self, inputs, config=None, **kwargs):
+        return self.chain.stream(inputs, config, **kwargs)
+
+    async def astream(self, inputs, config=None, **kwargs):
+        """
+        Stream the primary; if the hedge finishes first, yield its result as the last chunk.
+
+        Chunks are cumulative (JsonOutputParser yields ever more complete dicts),
+        so consumers that keep the latest chunk end up with the winner's result.
+        """
+        with self._span("astream") as current:
+            chunks = asyncio.Queue()
+
+            async def consume():
+                final = None
+                async for chunk in self.chain.astream(inputs, config, **kwargs):
+                    final = chunk
+                    chunks.put_nowait(chunk)
+                return final
+
+            primary = asyncio.create_task(self._timed(consume(), self.histogram))
+            race = asyncio.create_task(self._race(primary, lambda: asyncio.create_task(self._timed(
+                self.hedge.ainvoke(inputs, config, **kwargs), self.hedge_histogram)), current))
+            try:
+                while True:
+                    getter = asyncio.create_task(chunks.get())
+                    await asyncio.wait({getter, race}, return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        yield getter.result()
+                        continue
+                    getter.cancel()
+                    break
+                winner, result = race.result()
+                if winner == "hedge":
+                    yield result
+                else:
+                    # Chunks the primary streamed just before it finished
+                    while not chunks.empty():
+                        yield chunks.get_nowait()
+            finally:
+                race.cancel()
+                primary.cancel()
+
+    def batch(self, inputs_list, config=None, **kwargs):
+        return [self.invoke(inputs, config, **kwargs) for inputs in inputs_list]
+
+    async def abatch(self, inputs_list, config=None, **kwargs):
+        return await asyncio.gather(*(self.ainvoke(inputs, config, **kwargs) for inputs in inputs_list))
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
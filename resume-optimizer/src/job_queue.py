@@ -0,0 +1,316 @@
+"""
+Background job runner for the streamlined pipeline.
+
+Jobs are recorded in a SQLite table and executed on a thread pool, so a
+Streamlit script run only has to submit a job and poll its status; widget
+clicks and reruns no longer interrupt (or block on) the LLM and PDF work.
+Progress, rewritten sections and the final result are written back to the job
+row as the pipeline reports them.
+
+Each job row records the process (host, pid and a per-process token) that
+runs it. Several processes can share the jobs database, so on startup only
+jobs whose process is gone are recovered.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.retention import start_background_pruning
+
+DEFAULT_JOBS_PATH = "resume-optimizer/outputs/jobs.sqlite3"
+# Each job renders to its own file; the generator's default name only has
+# one-second resolution, so concurrent jobs would overwrite each other's PDFs
+JOB_PDF_DIR = "resume-optimizer/outputs/resumes"
+DEFAULT_MAX_WORKERS = 4
+JOB_WORKERS_ENV_VAR = "RESUME_OPTIMIZER_JOB_WORKERS"
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+_JSON_COLUMNS = ("payload", "partial_result", "result")
+# Columns added after the first release, migrated onto existing tables
+_ADDED_COLUMNS = {"pdf_path": "TEXT", "runner_host": "TEXT",
+                  "runner_pid": "INTEGER", "runner_token": "TEXT"}
+
+# Tells this process apart from an earlier one that had the same pid (e.g. a
+# restarted container, where the server is often pid 1)
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+
+def job_pdf_path(job_id: str) -> str:
+    """Path of the PDF generated by a job"""
+    return os.path.join(JOB_PDF_DIR, f"job_{job_id}.pdf")
+
+
+def _runner_identity():
+    return socket.gethostname(), os.getpid(), _PROCESS_TOKEN
+
+
+def _runner_alive(host: Optional[str], pid: Optional[int], token: Optional[str]) -> bool:
+    """Whether the process recorded as running a job may still be running"""
+    if pid is None:
+        return False  # Recorded before jobs had a runner
+    if host != socket.gethostname():
+        return True  # Can't check another machine; its own restart recovers it
+    if pid == os.getpid():
+        return token == _PROCESS_TOKEN
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, but belongs to another user
+    return True
+
+
+class JobStore:
+    """Persistent table of pipeline jobs and their progress"""
+
+    def __init__(self, db_path: str = DEFAULT_JOBS_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        owner TEXT,
+                        status TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        progress_step INTEGER NOT NULL DEFAULT 0,
+                        progress_total INTEGER NOT NULL DEFAULT 0,
+                        progress_message TEXT,
+                        partial_result TEXT,
+                        result TEXT,
+                        error TEXT,
+                        pdf_path TEXT,
+                        runner_host TEXT,
+                        runner_pid INTEGER,
+                        runner_token TEXT,
+                        created_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL
+                    )
+                    """
+                )
+                columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+                for column, column_type in _ADDED_COLUMNS.items():
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner, created_at)")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+            self._initialized = True
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        job = dict(row)
+        for column in _JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create(self, payload: Dict[str, Any], owner: Optional[str] = None) -> str:
+        """Insert a queued job, to be run by this process, and return its ID"""
+        self._ensure_schema()
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, owner, status, payload, pdf_path, "
+                "runner_host, runner_pid, runner_token, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, owner, json.dumps(payload, ensure_ascii=False),
+                 job_pdf_path(job_id), *_runner_identity(), time.time()),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        """Set columns of a job; JSON columns are serialized automatically"""
+        self._ensure_schema()
+        values = []
+        for column, value in fields.items():
+            if column in _JSON_COLUMNS and value is not None:
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            values.append(value)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*values, job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job row, or None if there is no such job"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, owner: Optional[str] = None, status: Optional[str] = None,
+             limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """Return jobs, newest first, optionally filtered by owner and status"""
+        self._ensure_schema()
+        clauses, params = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        sql = "SELECT * FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def mark_interrupted(self) -> List[str]:
+        """
+        Recover jobs left behind by processes that are gone.
+
+        Their running jobs are failed (the work may be half done); their
+        queued jobs are taken over by this process and returned so they can
+        be resubmitted. Jobs of processes that are still alive are left alone.
+        """
+        self._ensure_schema()
+        recovered = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, status, runner_host, runner_pid, runner_token FROM jobs "
+                "WHERE status IN ('queued', 'running') ORDER BY created_at").fetchall()
+            for row in rows:
+                if _runner_alive(row["runner_host"], row["runner_pid"], row["runner_token"]):
+                    continue
+                # Only if no other process recovered the job in the meantime
+                match = "job_id = ? AND status = ? AND runner_token IS ?"
+                previous = (row["job_id"], row["status"], row["runner_token"])
+                if row["status"] == "running":
+                    conn.execute(
+                        f"UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE {match}",
+                        ("Interrupted by a restart", time.time(), *previous))
+                else:
+                    claimed = conn.execute(
+                        "UPDATE jobs SET runner_host = ?, runner_pid = ?, runner_token = ? "
+                        f"WHERE {match}", (*_runner_identity(), *previous))
+                    if claimed.rowcount:
+                        recovered.append(row["job_id"])
+        return recovered
+
+
+def _run_pipeline_job(store: JobStore, job_id: str, payload: Dict[str, Any]) -> None:
+    """Execute one pipeline job, recording progress and the outcome"""
+    from src.pipeline import run_streamlined_pipeline_sync
+
+    pdf_path = job_pdf_path(job_id)
+    store.update(job_id, status="running", started_at=time.time(), pdf_path=pdf_path)
+    partial = {}
+    # The callbacks run on the shared event loop, which must not wait on
+    # SQLite; one writer thread per job keeps the updates in order
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-job-progress")
+
+    def on_progress(step, total_steps, message):
+        writer.submit(store.update, job_id, progress_step=step,
+                      progress_total=total_steps, progress_message=message)
+
+    def on_section(section, value):
+        partial[section] = value
+        writer.submit(store.update, job_id, partial_result=dict(partial))
+
+    try:
+        result = run_streamlined_pipeline_sync(
+            payload["job_description"],
+            source_type=payload.get("source_type", "background_job"),
+            pdf_output_path=pdf_path,
+            on_progress=on_progress, on_section=on_section)
+    except Exception as e:
+        writer.shutdown(wait=True)
+        store.update(job_id, status="failed", error=f"{type(e).__name__}: {e}",
+                     finished_at=time.time())
+        return
+
+    writer.shutdown(wait=True)
+    store.update(job_id, status="succeeded", result=result,
+                 finished_at=time.time())
+
+
+class JobRunner:
+    """Thread pool that executes jobs recorded in a JobStore"""
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: Optional[int] = None):
+        self.store = store or JobStore()
+        if max_workers is None:
+            max_workers = int(
+                os.getenv(JOB_WORKERS_ENV_VAR, DEFAULT_MAX_WORKERS))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="resume-job")
+
+    def recover(self) -> int:
+        """Resubmit jobs that were still queued when the last process exited"""
+        job_ids = self.store.mark_interrupted()
+        for job_id in job_ids:
+            job = self.store.get(job_id)
+            self._executor.submit(
+                _run_pipeline_job, self.store, job_id, job["payload"])
+        return len(job_ids)
+
+    def submit(self, job_description: str, owner: Optional[str] = None,
+               source_type: str = "background_job") -> str:
+        """Queue a streamlined pipeline run and return its job ID"""
+        payload = {"job_description": job_description,
+                   "source_type": source_type}
+        job_id = self.store.create(payload, owner=owner)
+        self._executor.submit(_run_pipeline_job, self.store, job_id, payload)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the current state of a job"""
+        return self.store.get(job_id)
+
+    def list(self, owner: Optional[str] = None, status: Optional[str] = None,
+             limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """Return recent jobs, newest first"""
+        return self.store.list(owner=owner, status=status, limit=limit)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner, recovering queued jobs on first use"""
+    global _job_runner
+    if _job_runner is None:
+        with _job_runner_lock:
+            if _job_runner is None:
+                runner = JobRunner()
+                runner.recover()
+                _job_runner = runner
+                # The Streamlit server is long-lived; keep outputs/ bounded if configured
+                start_background_pruning()
+    return _job_runner
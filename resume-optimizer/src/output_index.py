@@ -0,0 +1,434 @@
+"""
+SQLite index of saved job analysis and resume optimization outputs.
+
+The index keeps the metadata needed for listing, counting and filtering saved
+files so those operations don't have to list directories or parse JSON files.
+src.file_manager keeps it up to date on every save and resynchronizes a
+directory when it has been changed by something else.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.atomic_io import pending_filenames
+
+INDEX_COLUMNS = (
+    "file_type", "filename", "unique_id", "timestamp", "generated_at",
+    "file_path", "keywords_count", "keywords_source", "preview",
+    "segment_offset", "segment_length", "content_hash", "claimed_at",
+)
+
+# Columns added after the first release of the index, with their SQL types
+_ADDED_COLUMNS = {"segment_offset": "INTEGER", "segment_length": "INTEGER",
+                  "content_hash": "TEXT", "claimed_at": "REAL"}
+
+# A claimed row has no file until its save finishes; reindexing keeps it this
+# long (a claim left behind by a crashed save is dropped afterwards)
+CLAIM_GRACE_SECONDS = 600
+
+
+def normalized_content_hash(text: str, context: str = "") -> str:
+    """
+    SHA-256 of text with case and whitespace differences removed.
+
+    context (e.g. the model and prompt version that produced a saved result)
+    is part of the hash, so the same text under another context hashes differently.
+    """
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(f"{context}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def record_from_data(file_type: str, filename: str, file_path: str, data: Dict[str, Any],
+                     location: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build an index row from the contents of a saved output.
+
+    location is the segment store position for records kept in a segment
+    (file_path is then the segment file); it is None for per-file outputs.
+    """
+    metadata = data.get("metadata", {})
+    input_data = data.get("input", {})
+    output_data = data.get("output", {})
+
+    content_hash = None
+    if file_type == "job_analysis":
+        keywords_count = output_data.get("total_keywords_extracted")
+        preview = input_data.get("job_description_preview")
+        # Only set by saves that recorded the analyzer; older analyses are never reused
+        content_hash = metadata.get("content_hash") if metadata.get("analyzer_version") else None
+    else:
+        keywords_count = input_data.get("keywords_count")
+        preview = input_data.get("original_resume_preview")
+
+    return {
+        "file_type": file_type,
+        "filename": filename,
+        "unique_id": metadata.get("unique_id"),
+        "timestamp": metadata.get("timestamp"),
+        "generated_at": metadata.get("generated_at"),
+        "file_path": file_path,
+        "keywords_count": keywords_count,
+        "keywords_source": metadata.get("keywords_source"),
+        "preview": preview,
+        "segment_offset": location["offset"] if location else None,
+        "segment_length": location["length"] if location else None,
+        "content_hash": content_hash,
+    }
+
+
+class OutputIndex:
+    """Embedded SQLite index of saved output files"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS outputs (
+                        file_type TEXT NOT NULL,
+                        filename TEXT NOT NULL,
+                        unique_id TEXT,
+                        timestamp TEXT,
+                        generated_at TEXT,
+                        file_path TEXT NOT NULL,
+                        keywords_count INTEGER,
+                        keywords_source TEXT,
+                        preview TEXT,
+                        segment_offset INTEGER,
+                        segment_length INTEGER,
+                        content_hash TEXT,
+                        claimed_at REAL,
+                        PRIMARY KEY (file_type, filename)
+                    )
+                    """
+                )
+                existing = {row["name"] for row in conn.execute("PRAGMA table_info(outputs)")}
+                missing = [column for column in _ADDED_COLUMNS if column not in existing]
+                for column in missing:
+                    conn.execute(
+                        f"ALTER TABLE outputs ADD COLUMN {column} {_ADDED_COLUMNS[column]}")
+                if missing:
+                    # Rows from an older schema lack the new values; drop the
+                    # per-file rows so the next listing re-reads those files
+                    conn.execute("DELETE FROM outputs WHERE segment_offset IS NULL")
+                    conn.execute("DROP TABLE IF EXISTS directory_state")
+                if not conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_outputs_type_hash_unique'"
+                ).fetchone():
+                    # The hash used to be indexed without a uniqueness constraint;
+                    # keep it on the oldest row of each duplicate set
+                    conn.execute("DROP INDEX IF EXISTS idx_outputs_type_hash")
+                    conn.execute(
+                        """
+                        UPDATE outputs SET content_hash = NULL WHERE rowid IN (
+                            SELECT rowid FROM (
+                                SELECT rowid, ROW_NUMBER() OVER (
+                                    PARTITION BY file_type, content_hash ORDER BY timestamp, filename) AS rank
+                                FROM outputs WHERE content_hash IS NOT NULL)
+                            WHERE rank > 1)
+                        """
+                    )
+                    conn.execute(
+                        "CREATE UNIQUE INDEX idx_outputs_type_hash_unique ON outputs(file_type, content_hash)")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_outputs_type_timestamp ON outputs(file_type, timestamp)")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_outputs_type_source ON outputs(file_type, keywords_source)")
+                # Directory mtimes as of the last index update, used to detect
+                # files added or removed behind the index's back
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS directory_state (directory TEXT PRIMARY KEY, mtime_ns INTEGER)")
+                # Generated files (e.g. PDFs) and the saved output they were generated from
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS artifacts (path TEXT PRIMARY KEY, "
+                    "file_type TEXT NOT NULL, filename TEXT NOT NULL)")
+            self._initialized = True
+
+    @staticmethod
+    def _write_rows(conn, records: List[Dict[str, Any]]) -> None:
+        """
+        Insert or update rows by (file_type, filename).
+
+        content_hash is unique per file type: a row whose hash another file
+        already holds is stored without it (the older file stays the one found
+        by find_by_hash). INSERT OR REPLACE would delete that other row instead.
+        """
+        sql = (f"INSERT INTO outputs ({', '.join(INDEX_COLUMNS)}) "
+               f"VALUES ({', '.join('?' for _ in INDEX_COLUMNS)}) "
+               f"ON CONFLICT(file_type, filename) DO UPDATE SET "
+               + ", ".join(f"{column} = excluded.{column}" for column in INDEX_COLUMNS[2:]))
+        for record in records:
+            try:
+                conn.execute(sql, tuple(record.get(column) for column in INDEX_COLUMNS))
+            except sqlite3.IntegrityError:
+                if record.get("content_hash") is None:
+                    raise
+                conn.execute(sql, tuple(None if column == "content_hash" else record.get(column)
+                                        for column in INDEX_COLUMNS))
+
+    def upsert(self, record: Dict[str, Any], directory: Optional[str] = None) -> None:
+        """Insert or replace one row; pass directory to record its current mtime"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            self._write_rows(conn, [record])
+            if directory is not None:
+                self._record_directory_state(conn, directory)
+        conn.close()
+
+    def upsert_many(self, records: List[Dict[str, Any]]) -> None:
+        """Insert or replace many rows in one transaction"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            self._write_rows(conn, records)
+        conn.close()
+
+    def claim(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Insert record unless another row already holds its content hash.
+
+        The unique index makes this atomic across threads and processes, so
+        concurrent saves of the same content cannot both claim it. The row is
+        marked as claimed until the saved file's row replaces it, so a
+        concurrent sync_directory() does not drop it meanwhile.
+
+        Returns:
+            The row holding the hash, or None if record was inserted
+        """
+        self._ensure_schema()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO outputs ({', '.join(INDEX_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in INDEX_COLUMNS)})",
+                    tuple(time.time() if column == "claimed_at" else record.get(column)
+                          for column in INDEX_COLUMNS))
+            return None
+        except sqlite3.IntegrityError:
+            pass
+        finally:
+            conn.close()
+        existing = self.find_by_hash(record["file_type"], record["content_hash"])
+        if existing is None:
+            # The conflict was on the filename, not the hash
+            raise ValueError(f"{record['filename']} is already indexed")
+        return existing
+
+    def delete(self, file_type: str, filename: str) -> None:
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM outputs WHERE file_type = ? AND filename = ?", (file_type, filename))
+        conn.close()
+
+    def delete_many(self, file_type: str, filenames: List[str]) -> None:
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM outputs WHERE file_type = ? AND filename = ?",
+                [(file_type, filename) for filename in filenames])
+        conn.close()
+
+    def relocate(self, file_type: str, locations: Dict[str, Dict[str, Any]]) -> None:
+        """Point segment rows at new locations ({filename: {segment_path, offset, length}})"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outputs SET file_path = ?, segment_offset = ?, segment_length = ? "
+                "WHERE file_type = ? AND filename = ?",
+                [(location["segment_path"], location["offset"], location["length"],
+                  file_type, filename) for filename, location in locations.items()])
+        conn.close()
+
+    def delete_segment_rows(self, file_type: str) -> int:
+        """Drop every row that points into the segment store; returns the count"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            removed = conn.execute(
+                "DELETE FROM outputs WHERE file_type = ? AND segment_offset IS NOT NULL",
+                (file_type,)).rowcount
+        conn.close()
+        return removed
+
+    def _record_directory_state(self, conn, directory):
+        mtime_ns = os.stat(directory).st_mtime_ns if os.path.isdir(
+            directory) else None
+        conn.execute(
+            "INSERT OR REPLACE INTO directory_state (directory, mtime_ns) VALUES (?, ?)",
+            (os.path.abspath(directory), mtime_ns))
+
+    def is_stale(self, directory: str) -> bool:
+        """True when directory changed since the index last recorded it"""
+        self._ensure_schema()
+        current = os.stat(directory).st_mtime_ns if os.path.isdir(
+            directory) else None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT mtime_ns FROM directory_state WHERE directory = ?",
+                (os.path.abspath(directory),)).fetchone()
+        conn.close()
+        if row is None:
+            return current is not None
+        return row["mtime_ns"] != current
+
+    def sync_directory(self, file_type: str, directory: str, full: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the JSON files in directory.
+
+        Only files missing from the index are parsed unless full is True, in
+        which case every file is re-read. Rows for deleted files are dropped;
+        rows for records kept in segment files, and rows claimed by a save
+        that has not written its file yet, are left alone.
+
+        Returns:
+            Dict with the number of rows added and removed
+        """
+        self._ensure_schema()
+        on_disk, pending = set(), set()
+        if os.path.isdir(directory):
+            names = os.listdir(directory)
+            on_disk = {f for f in names if f.endswith('.json')}
+            # Files still being written or staged for a group commit keep
+            # their rows (e.g. content hashes claimed before the write)
+            pending = pending_filenames(names)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT filename, claimed_at FROM outputs WHERE file_type = ? AND segment_offset IS NULL",
+                (file_type,)).fetchall()
+            indexed = {row["filename"] for row in rows}
+            claimed = {row["filename"] for row in rows if row["claimed_at"] is not None
+                       and time.time() - row["claimed_at"] < CLAIM_GRACE_SECONDS}
+
+            to_add = on_disk if full else on_disk - indexed
+            to_remove = indexed - on_disk - pending - claimed
+
+            records = []
+            for filename in sorted(to_add):
+                file_path = f"{directory}/{filename}"
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    # Unreadable or truncated files are left out of the index
+                    continue
+                records.append(record_from_data(file_type, filename, file_path, data))
+
+            self._write_rows(conn, records)
+            conn.executemany(
+                "DELETE FROM outputs WHERE file_type = ? AND filename = ?",
+                [(file_type, filename) for filename in to_remove])
+            self._record_directory_state(conn, directory)
+        conn.close()
+
+        return {"added": len(records), "removed": len(to_remove)}
+
+    def query(self, file_type: Optional[str] = None, keywords_source: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              newest_first: bool = True, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Return index rows matching the filters, ordered by timestamp.
+
+        since/until are ISO timestamps compared against the saved metadata.
+        """
+        self._ensure_schema()
+        where, params = self._where(file_type, keywords_source, since, until)
+        sql = f"SELECT * FROM outputs{where} ORDER BY timestamp {'DESC' if newest_first else 'ASC'}, filename"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params)]
+        conn.close()
+        return rows
+
+    def count(self, file_type: Optional[str] = None, keywords_source: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> int:
+        self._ensure_schema()
+        where, params = self._where(file_type, keywords_source, since, until)
+        with self._connect() as conn:
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM outputs{where}", params).fetchone()[0]
+        conn.close()
+        return count
+
+    def get(self, file_type: str, filename: str) -> Optional[Dict[str, Any]]:
+        self._ensure_schema()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM outputs WHERE file_type = ? AND filename = ?",
+                (file_type, filename)).fetchone()
+        conn.close()
+        return dict(row) if row is not None else None
+
+    def record_artifact(self, path: str, file_type: str, filename: str) -> None:
+        """Remember that the file at path was generated from a saved output"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, file_type, filename) VALUES (?, ?, ?)",
+                (path, file_type, filename))
+        conn.close()
+
+    def artifacts(self) -> Dict[str, Dict[str, str]]:
+        """Every recorded artifact as {path: {"file_type", "filename"}}"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            rows = {row["path"]: {"file_type": row["file_type"], "filename": row["filename"]}
+                    for row in conn.execute("SELECT * FROM artifacts")}
+        conn.close()
+        return rows
+
+    def delete_artifacts(self, paths: List[str]) -> None:
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM artifacts WHERE path = ?", [(path,) for path in paths])
+        conn.close()
+
+    def find_by_hash(self, file_type: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the row holding the given content hash, or None"""
+        self._ensure_schema()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM outputs WHERE file_type = ? AND content_hash = ?",
+                (file_type, content_hash)).fetchone()
+        conn.close()
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def _where(file_type, keywords_source, since, until):
+        clauses, params = [], []
+        if file_type is not None:
+            clauses.append("file_type = ?")
+            params.append(file_type)
+        if keywords_source is not None:
+            clauses.append("keywords_source = ?")
+            params.append(keywords_source)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
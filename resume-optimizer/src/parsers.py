@@ -1,5 +1,5 @@
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 
 class JobDescriptionKeywords(BaseModel):
@@ -65,3 +65,13 @@ class OptimizedResumeContent(BaseModel):
                 ]
             }
         }
+
+
+# One sub-schema per OptimizedResumeContent field (e.g. UpdatedSummaryContent),
+# used by the section-parallel rewriter to request a single section per call
+SECTION_MODELS = {
+    section: create_model(
+        "".join(part.title() for part in section.split("_")) + "Content",
+        **{section: (field.annotation, field)})
+    for section, field in OptimizedResumeContent.model_fields.items()
+}
@@ -0,0 +1,273 @@
+"""
+Asyncio pipeline for the streamlined analyze -> rewrite -> PDF workflow.
+
+The LLM calls use the chains' ainvoke, while file persistence, resume loading
+and PDF rendering run in worker threads so they overlap with the next LLM call
+instead of sitting on the critical path. Nothing here imports Streamlit, so the
+UI and the CLI can both drive it.
+"""
+import asyncio
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from src.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from src.chains import get_analyzer_chain, get_rewriter_chain
+from src.event_loop import run_sync
+from src.file_manager import (
+    find_job_analysis,
+    record_artifact_source,
+    save_job_analysis_result,
+    save_resume_optimization_result,
+)
+from src.response_cache import is_cache_enabled
+from src.resume_generator import ResumeGenerator
+from src.streaming import astream_rewriter_sections
+from src.tracing import span, trace_run
+
+DEFAULT_RESUME_OUTPUT_DIR = "resume-optimizer/outputs/resumes"
+RESUME_PATH = "resume-optimizer/src/docs/resume.md"
+TOTAL_STEPS = 4
+
+# Keyword categories passed on to the rewriter
+REWRITE_KEYWORD_CATEGORIES = ['technical_skills',
+                              'technologies_and_tools', 'soft_skills']
+
+
+def extract_rewrite_keywords(analysis_result: Dict[str, Any]) -> List[str]:
+    """Flatten the analyzer output into the keyword list used for rewriting"""
+    keywords = []
+    for key in REWRITE_KEYWORD_CATEGORIES:
+        keywords += analysis_result.get(key, [])
+    return keywords
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def _render_pdf(optimization_result: Dict[str, Any], pdf_output_path: Optional[str],
+                html_output_path: Optional[str] = None) -> Dict[str, str]:
+    """Generate the resume HTML and PDF; runs in a worker thread"""
+    resume_generator = ResumeGenerator()
+    with span("resume.generate_html"):
+        updated_resume_html = resume_generator.generate_updated_resume(
+            optimization_result)
+    if html_output_path:
+        os.makedirs(os.path.dirname(html_output_path) or ".", exist_ok=True)
+        with open(html_output_path, 'w', encoding='utf-8') as f:
+            f.write(updated_resume_html)
+    pdf_path = resume_generator.create_pdf(
+        updated_resume_html, pdf_output_path)
+    return {"html": updated_resume_html, "pdf_path": pdf_path}
+
+
+async def _call_model(limiter: Optional[AdaptiveConcurrencyLimiter], fn):
+    """Await fn(), in a limiter slot when one is given"""
+    return await (limiter.run(fn) if limiter is not None else fn())
+
+
+async def run_streamlined_pipeline(job_description: str,
+                                   source_type: str = "streamlined_workflow",
+                                   resume_path: str = RESUME_PATH,
+                                   pdf_output_path: Optional[str] = None,
+                                   html_output_path: Optional[str] = None,
+                                   on_progress: Optional[Callable[[int, int, str], None]] = None,
+                                   on_section: Optional[Callable[[str, Any], None]] = None,
+                                   reuse_analysis: Optional[bool] = None,
+                                   limiter: Optional[AdaptiveConcurrencyLimiter] = None) -> Dict[str, Any]:
+    """
+    Run analyze -> extract keywords -> rewrite -> PDF for one job description.
+
+    Args:
+        job_description: The job description text
+        source_type: Keywords source recorded with the saved optimization
+        resume_path: Path to the original resume markdown
+        pdf_output_path: Optional path for the generated PDF
+        html_output_path: Optional path to also write the generated HTML to
+        on_progress: Optional callback(step, total_steps, message), called on the event loop
+        on_section: Optional callback(section, value); when given the rewriter
+            output is streamed and each section is reported as soon as it is complete
+        reuse_analysis: Skip the analyzer when this job description (ignoring case
+            and whitespace) already has a saved analysis from the same analyzer;
+            defaults to whether the response cache is enabled
+        limiter: Optional AdaptiveConcurrencyLimiter gating the analyzer and
+            rewriter calls; file saves and PDF rendering run outside it, so
+            only model latency feeds the limit
+
+    Returns:
+        Dict with the analysis (and whether it was reused), keywords, optimization result, generated HTML,
+        PDF path, saved JSON paths, any non-fatal save warnings and the
+        run's trace spans (see src/tracing.py)
+    """
+    def progress(step, message):
+        if on_progress:
+            on_progress(step, TOTAL_STEPS, message)
+
+    with trace_run("pipeline.streamlined", source_type=source_type) as trace:
+        warnings = []
+
+        # The resume is only needed by the rewriter, so load it while the analyzer runs
+        resume_task = asyncio.create_task(asyncio.to_thread(_read_text, resume_path))
+
+        # Step 1: Analyze job description
+        progress(1, "Analyzing job description...")
+        if reuse_analysis is None:
+            reuse_analysis = is_cache_enabled()
+        existing = await asyncio.to_thread(find_job_analysis, job_description) \
+            if reuse_analysis else None
+        if existing:
+            analysis_result = existing["analysis_result"]
+        else:
+            analysis_result = await _call_model(limiter, lambda: get_analyzer_chain().ainvoke(
+                {"job_description": job_description}))
+        # When reusing, saving is deduplicated too, so a reused analysis just
+        # resolves to its file
+        save_analysis_task = asyncio.create_task(asyncio.to_thread(
+            save_job_analysis_result, job_description, analysis_result, dedupe=reuse_analysis))
+
+        # Step 2: Extract keywords for rewrite
+        progress(2, "Extracting keywords...")
+        keywords = extract_rewrite_keywords(analysis_result)
+
+        # Step 3: Optimize resume with keywords (the analysis is saved meanwhile)
+        progress(3, "Optimizing resume with extracted keywords...")
+        resume_text = await resume_task
+        rewriter_inputs = {
+            "keywords_to_integrate": keywords,
+            "original_resume_text": resume_text
+        }
+        if on_section:
+            optimization_result = {}
+
+            async def stream_sections():
+                async for section, value in astream_rewriter_sections(get_rewriter_chain(), rewriter_inputs):
+                    optimization_result[section] = value
+                    on_section(section, value)
+
+            await _call_model(limiter, stream_sections)
+        else:
+            optimization_result = await _call_model(
+                limiter, lambda: get_rewriter_chain().ainvoke(rewriter_inputs))
+        save_optimization_task = asyncio.create_task(asyncio.to_thread(
+            save_resume_optimization_result, keywords, resume_text, optimization_result, source_type))
+
+        # Step 4: Generate updated resume PDF off the event loop
+        progress(4, "Generating updated resume PDF...")
+        rendered = await asyncio.to_thread(
+            _render_pdf, optimization_result, pdf_output_path, html_output_path)
+
+        saved_analysis_path, saved_optimization_path = await asyncio.gather(
+            save_analysis_task, save_optimization_task, return_exceptions=True)
+        if isinstance(saved_analysis_path, Exception):
+            warnings.append(
+                f"Analysis completed but couldn't save file: {saved_analysis_path}")
+            saved_analysis_path = None
+        if isinstance(saved_optimization_path, Exception):
+            warnings.append(
+                f"Optimization completed but couldn't save file: {saved_optimization_path}")
+            saved_optimization_path = None
+        if saved_optimization_path:
+            # Lets retention treat the PDF as regenerable while the JSON is kept
+            try:
+                await asyncio.to_thread(
+                    record_artifact_source, rendered["pdf_path"], saved_optimization_path)
+            except Exception as e:
+                warnings.append(f"Couldn't record the PDF's source: {e}")
+
+    return {
+        "analysis_result": analysis_result,
+        "analysis_reused": existing is not None,
+        "keywords": keywords,
+        "resume_text": resume_text,
+        "optimization_result": optimization_result,
+        "resume_html": rendered["html"],
+        "html_path": html_output_path,
+        "pdf_path": rendered["pdf_path"],
+        "saved_analysis_path": saved_analysis_path,
+        "saved_optimization_path": saved_optimization_path,
+        "warnings": warnings,
+        "trace": trace.breakdown(),
+    }
+
+
+def run_streamlined_pipeline_sync(job_description: str, **kwargs) -> Dict[str, Any]:
+    """
+    Blocking wrapper around run_streamlined_pipeline for callers without an event loop.
+
+    The pipeline runs on the process-wide loop from src.event_loop, so the
+    cached chains' async clients are never reused across event loops.
+    """
+    return run_sync(run_streamlined_pipeline(job_description, **kwargs))
+
+
+def _output_stem(item_id: str, used: set) -> str:
+    """Filesystem-safe, unique output name for a pipeline input"""
+    stem = re.sub(r'[^A-Za-z0-9_.-]', '_',
+                  os.path.splitext(os.path.basename(str(item_id)))[0]) or "job"
+    candidate, counter = stem, 2
+    while candidate in used:
+        candidate = f"{stem}_{counter}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+async def run_pipeline_batch(items: List[Dict[str, str]],
+                             concurrency: int = 4,
+                             output_dir: str = DEFAULT_RESUME_OUTPUT_DIR,
+                             source_type: str = "cli",
+                             on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             limiter: Optional[AdaptiveConcurrencyLimiter] = None) -> List[Dict[str, Any]]:
+    """
+    Run the full pipeline for many job descriptions concurrently.
+
+    Args:
+        items: {"id": ..., "job_description": ...} dicts (see src.batch.load_job_descriptions)
+        concurrency: Maximum number of pipelines in flight
+        output_dir: Directory for the generated HTML and PDF resumes
+        source_type: Keywords source recorded with the saved optimizations
+        on_result: Optional callback invoked with each per-item result
+        limiter: Optional AdaptiveConcurrencyLimiter that decides how many
+            analyzer/rewriter calls run at once instead of the fixed concurrency
+
+    Returns:
+        One result dict per input, in input order; failed inputs have
+        status "error" and do not affect the others
+    """
+    # With a limiter, allow enough pipelines for the limit to grow into; the
+    # limiter gates their model calls
+    semaphore = asyncio.Semaphore(max(1, limiter.max_limit if limiter is not None else concurrency))
+    used_stems = set()
+    stems = [_output_stem(item["id"], used_stems) for item in items]
+
+    async def run_one(item, stem):
+        async with semaphore:
+            entry = {"id": item["id"], "status": "ok"}
+            try:
+                result = await run_streamlined_pipeline(
+                    item["job_description"],
+                    source_type=source_type,
+                    pdf_output_path=os.path.join(
+                        output_dir, f"optimized_resume_{stem}.pdf"),
+                    html_output_path=os.path.join(
+                        output_dir, f"optimized_resume_{stem}.html"),
+                    limiter=limiter)
+                entry.update({
+                    "keywords_count": len(result["keywords"]),
+                    "saved_analysis_path": result["saved_analysis_path"],
+                    "saved_optimization_path": result["saved_optimization_path"],
+                    "html_path": result["html_path"],
+                    "pdf_path": result["pdf_path"],
+                    "warnings": result["warnings"],
+                })
+            except Exception as e:
+                entry["status"] = "error"
+                entry["error"] = str(e)
+
+        if on_result:
+            on_result(entry)
+        return entry
+
+    return await asyncio.gather(*(run_one(item, stem) for item, stem in zip(items, stems)))
@@ -1,3 +1,5 @@
+import os
+
 # Template for the job analyzer prompt
 JOB_ANALYZER_PROMPT = (
     """
@@ -97,7 +99,8 @@ JOB_ANALYZER_PROMPT = (
 #     """
 # )
 
-REWRITE_PROMPT_TEMPLATE = (
+# Persona rules and inputs shared by the full and the per-section rewrite prompts
+REWRITE_PROMPT_INSTRUCTIONS = (
     """
     You are an AI assistant helping a user tailor their resume for a specific job application. Your primary goal is to adopt the user's persona and writing style to make subtle, authentic-sounding tweaks to their resume.
 
@@ -117,7 +120,11 @@ REWRITE_PROMPT_TEMPLATE = (
     {keywords_to_integrate}
 
     **2. Original Resume Text:**
-    {original_resume_text}
+    {original_resume_text}"""
+)
+
+REWRITE_PROMPT_TEMPLATE = REWRITE_PROMPT_INSTRUCTIONS + (
+    """
 
     **Your Task:**
     Rewrite only the specific bullet points or sentences that can be improved to align with the "Target Keywords to Integrate," while following all the rules above. Provide your output in a valid JSON format that adheres to the following schema.
@@ -126,3 +133,53 @@ REWRITE_PROMPT_TEMPLATE = (
     {format_instructions}
     """
 )
+
+
+# Template for rewriting one resume section at a time (section-parallel mode).
+# {section_focus} names the part of the resume to rewrite and the schema only
+# contains that section.
+SECTION_REWRITE_PROMPT_TEMPLATE = REWRITE_PROMPT_INSTRUCTIONS + (
+    """
+
+    **Your Task:**
+    Rewrite only {section_focus}, following all the rules above. The other parts of the resume are rewritten separately, so leave them out. Provide your output in a valid JSON format that adheres to the following schema.
+
+    **JSON Output Schema:**
+    {format_instructions}
+    """
+)
+
+# The part of the resume each OptimizedResumeContent section covers
+SECTION_REWRITE_FOCUS = {
+    "updated_summary": "the professional summary",
+    "liberty_mutual_group": "the bullet points of the Liberty Mutual Group experience",
+    "inovace_technologies": "the bullet points of the Inovace Technologies experience",
+    "spider_digital_commerce": "the bullet points of the Spider Digital Commerce internship",
+    "echo_project": "the bullet points of the Echo project",
+}
+
+
+# Bump these whenever the corresponding prompt text changes so that chains
+# cached by src.chains are rebuilt instead of reusing the old prompt.
+JOB_ANALYZER_PROMPT_VERSION = "1"
+REWRITE_PROMPT_VERSION = "1"
+SECTION_REWRITE_PROMPT_VERSION = "1"
+
+# The analyzer's default model and the provider setting live here rather than
+# in src.chains, so saved analyses can be tagged with the analyzer that
+# produced them without importing LangChain
+ANALYZER_MODEL = "gemini-2.5-flash"
+
+# "google_genai" (default) or "fake" for the offline stand-in model in src/fake_llm.py
+MODEL_PROVIDER_ENV_VAR = "RESUME_OPTIMIZER_MODEL_PROVIDER"
+DEFAULT_MODEL_PROVIDER = "google_genai"
+
+
+def get_model_provider():
+    """Return the configured model provider"""
+    return os.getenv(MODEL_PROVIDER_ENV_VAR, DEFAULT_MODEL_PROVIDER)
+
+
+def get_analyzer_version(model_name=ANALYZER_MODEL):
+    """Provider, model and prompt version of the analyzer, as recorded with saved analyses"""
+    return f"{get_model_provider()}:{model_name}:{JOB_ANALYZER_PROMPT_VERSION}"
@@ -0,0 +1,375 @@
+"""
+Shared Gemini quota manager.
+
+Every model call takes one request and an estimate of its tokens from a pair
+of token buckets per model (requests per minute and tokens per minute). The
+bucket levels live in a SQLite database, so batch runs, Streamlit sessions and
+API workers on the same host draw from one budget for the shared
+GOOGLE_API_KEY. When a bucket is empty, callers wait for it to refill instead
+of sending a request that would come back as a 429. After the call, the
+estimate is settled against the token usage the model reported. A 429 that
+still gets through (e.g. from another host using the same key) drains the
+model's request bucket, so every process backs off together instead of
+retrying into the error.
+
+Limits default to Gemini's tier-1 quotas and can be overridden with
+RESUME_OPTIMIZER_RATE_LIMITS, e.g. "gemini-2.5-pro:rpm=150,tpm=2000000";
+set it to "off" to disable limiting. The fake provider is only limited when the
+variable is set explicitly.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import merge_configs
+
+DEFAULT_RATE_LIMITS_PATH = "resume-optimizer/outputs/cache/rate_limits.sqlite3"
+RATE_LIMITS_ENV_VAR = "RESUME_OPTIMIZER_RATE_LIMITS"
+
+DEFAULT_RATE_LIMITS = {
+    "gemini-2.5-flash": {"rpm": 1000, "tpm": 1000000},
+    "gemini-2.5-pro": {"rpm": 150, "tpm": 2000000},
+}
+# Buckets hold this many seconds of quota, which bounds bursts within a minute
+DEFAULT_BURST_SECONDS = 10
+# How long a 429 pauses new requests for that model
+RATE_LIMIT_PENALTY_SECONDS = 5
+# Rough prompt size estimate used until the model reports real usage
+CHARS_PER_TOKEN = 4
+# Quota error types of google-api-core, google-genai (via LangChain) and LangChain
+RATE_LIMIT_ERROR_TYPES = ("ResourceExhausted", "TooManyRequests",
+                          "GoogleRateLimitError", "ModelRateLimitError")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Return True for provider quota / rate-limit errors (HTTP 429).
+
+    Checks the error and the errors it was explicitly raised from, since
+    LangChain re-raises the SDK's ClientError (which carries the status code) as
+    its own type with "raise ... from". Implicit context is not followed: an
+    error raised while a 429 was being handled is not a rate limit itself.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if any(cls.__name__ in RATE_LIMIT_ERROR_TYPES for cls in type(error).__mro__):
+            return True
+        for attribute in ("status_code", "code"):
+            if getattr(error, attribute, None) == 429:
+                return True
+        if getattr(error, "status", None) == "RESOURCE_EXHAUSTED":
+            return True
+        error = error.__cause__
+    return False
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Dict[str, int]]:
+    """
+    Parse "model:rpm=N,tpm=N;model:..." into {model: {"rpm": N, "tpm": N}}.
+
+    Raises:
+        ValueError: On unknown limit names or malformed values
+    """
+    limits = {}
+    for clause in filter(None, (part.strip() for part in spec.split(";"))):
+        model, _, values = clause.partition(":")
+        model_limits = {}
+        for value in filter(None, (part.strip() for part in values.split(","))):
+            name, _, number = value.partition("=")
+            name = name.strip()
+            if name not in ("rpm", "tpm"):
+                raise ValueError(f"Unknown rate limit for {model.strip()}: {name!r}")
+            model_limits[name] = int(number)
+        limits[model.strip()] = model_limits
+    return limits
+
+
+def rate_limits_from_env(provider: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """Per-model limits for provider, or None when rate limiting is off"""
+    spec = os.getenv(RATE_LIMITS_ENV_VAR)
+    if spec is None:
+        return None if provider == "fake" else dict(DEFAULT_RATE_LIMITS)
+    if spec.strip().lower() in ("0", "off", "false", "no"):
+        return None
+    limits = {model: dict(values) for model, values in DEFAULT_RATE_LIMITS.items()}
+    for model, values in parse_rate_limits(spec).items():
+        limits.setdefault(model, {}).update(values)
+    return limits
+
+
+class QuotaManager:
+    """Per-model request and token buckets stored in SQLite"""
+
+    def __init__(self, limits: Dict[str, Dict[str, int]], db_path: str = DEFAULT_RATE_LIMITS_PATH,
+                 burst_seconds: float = DEFAULT_BURST_SECONDS, namespace: str = "google_genai"):
+        self.limits = limits
+        self.namespace = namespace
+        self.db_path = db_path
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def _connect(self):
+        # isolation_level=None so BEGIN IMMEDIATE below controls the transaction
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = self._connect()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)")
+            conn.close()
+            self._initialized = True
+
+    def _buckets(self, model: str):
+        """(name, refill per second, capacity) for each limited bucket of model"""
+        buckets = []
+        for kind, unit in (("rpm", "requests"), ("tpm", "tokens")):
+            per_minute = self.limits.get(model, {}).get(kind)
+            if per_minute:
+                rate = per_minute / 60
+                buckets.append((f"{self.namespace}:{model}:{unit}", rate, max(1.0, rate * self.burst_seconds)))
+        return buckets
+
+    def _update(self, model: str, amounts: Dict[str, float], consume_if_available: bool) -> float:
+        """
+        Refill the model's buckets, then take amounts from them.
+
+        With consume_if_available, amounts are only taken when every bucket
+        has enough, and the wait until they would have is returned otherwise.
+        Without it they are always applied (negative amounts refund), which
+        can leave a bucket in debt.
+        """
+        buckets = self._buckets(model)
+        if not buckets:
+            return 0.0
+        self._ensure_schema()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            levels, wait = {}, 0.0
+            for name, rate, capacity in buckets:
+                row = conn.execute(
+                    "SELECT level, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+                level = capacity if row is None else min(
+                    capacity, row[0] + (now - row[1]) * rate)
+                levels[name] = level
+                need = min(amounts.get(name.rsplit(":", 1)[1], 0), capacity)
+                if consume_if_available and level < need:
+                    wait = max(wait, (need - level) / rate)
+            if wait == 0.0:
+                for name, _, _ in buckets:
+                    levels[name] -= amounts.get(name.rsplit(":", 1)[1], 0)
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                [(name, level, now) for name, level in levels.items()])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return wait
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            self._waits += 1
+            self._wait_seconds += seconds
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """Block until one request and tokens are available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            wait = self._update(model, {"requests": 1, "tokens": tokens}, True)
+            if wait == 0.0:
+                if waited:
+                    self._record_wait(waited)
+                return waited
+            # Jitter keeps waiting processes from retrying in lockstep
+            delay = wait + random.uniform(0, 0.05)
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self, model: str, tokens: int) -> float:
+        """Async acquire(); waits on the event loop instead of blocking it"""
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(
+                self._update, model, {"requests": 1, "tokens": tokens}, True)
+            if wait == 0.0:
+                if waited:
+                    self._record_wait(waited)
+                return waited
+            delay = wait + random.uniform(0, 0.05)
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def settle(self, model: str, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Replace a call's token estimate with its reported usage"""
+        if actual_tokens is None or actual_tokens == estimated_tokens:
+            return
+        self._update(model, {"tokens": actual_tokens - estimated_tokens}, False)
+
+    def penalize(self, model: str, seconds: float = RATE_LIMIT_PENALTY_SECONDS) -> None:
+        """Empty the model's request bucket so no process sends for about seconds"""
+        for name, rate, capacity in self._buckets(model):
+            if name.endswith(":requests"):
+                self._update(model, {"requests": capacity + rate * seconds}, False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current bucket levels plus this process's wait counters"""
+        self._ensure_schema()
+        conn = self._connect()
+        levels = {name: level for name, level in conn.execute("SELECT name, level FROM buckets")}
+        conn.close()
+        with self._lock:
+            return {"levels": levels, "waits": self._waits, "wait_seconds": self._wait_seconds}
+
+
+class _UsageRecorder(BaseCallbackHandler):
+    """Collects the token usage reported by the model calls of one chain run"""
+
+    def __init__(self):
+        self.total_tokens = None
+
+    def on_llm_end(self, response, **kwargs):
+        try:
+            usage = getattr(response.generations[0][0].message, "usage_metadata", None)
+        except (AttributeError, IndexError):
+            usage = None
+        if usage and usage.get("total_tokens") is not None:
+            self.total_tokens = (self.total_tokens or 0) + usage["total_tokens"]
+
+
+class RateLimitedChain:
+    """
+    Wrap a chain so each call first takes its share of the model's quota.
+
+    The token estimate is the prompt size plus max_output_tokens; it is settled
+    against the reported usage once the call finishes, however it finishes. A
+    call that fails or is cancelled (e.g. the loser of a hedge) before
+    reporting usage gives back its max_output_tokens reservation.
+    """
+
+    def __init__(self, chain, quota: QuotaManager, model_name: str,
+                 prompt_chars: int, max_output_tokens: int):
+        self.chain = chain
+        self.quota = quota
+        self.model_name = model_name
+        self.prompt_chars = prompt_chars
+        self.max_output_tokens = max_output_tokens
+
+    def estimate_tokens(self, inputs) -> int:
+        input_chars = self.prompt_chars + len(json.dumps(inputs, ensure_ascii=False, default=str))
+        return input_chars // CHARS_PER_TOKEN + self.max_output_tokens
+
+    def _finish(self, estimated, recorder, error=None):
+        if error is not None and is_rate_limit_error(error):
+            self.quota.penalize(self.model_name)
+        actual = recorder.total_tokens
+        if actual is None and error is not None:
+            # The output reserved for the call was never generated
+            actual = max(0, estimated - self.max_output_tokens)
+        self.quota.settle(self.model_name, estimated, actual)
+
+    async def _afinish(self, estimated, recorder, error=None):
+        # Shielded so a second cancellation cannot skip the settlement
+        await asyncio.shield(asyncio.to_thread(self._finish, estimated, recorder, error))
+
+    def invoke(self, inputs, config=None, **kwargs):
+        estimated = self.estimate_tokens(inputs)
+        self.quota.acquire(self.model_name, estimated)
+        recorder = _UsageRecorder()
+        error = None
+        try:
+            return self.chain.invoke(
+                inputs, merge_configs(config, {"callbacks": [recorder]}), **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(estimated, recorder, error)
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        estimated = self.estimate_tokens(inputs)
+        await self.quota.aacquire(self.model_name, estimated)
+        recorder = _UsageRecorder()
+        error = None
+        try:
+            return await self.chain.ainvoke(
+                inputs, merge_configs(config, {"callbacks": [recorder]}), **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await self._afinish(estimated, recorder, error)
+
+    def stream(self, inputs, config=None, **kwargs):
+        estimated = self.estimate_tokens(inputs)
+        self.quota.acquire(self.model_name, estimated)
+        recorder = _UsageRecorder()
+        error = None
+        try:
+            yield from self.chain.stream(
+                inputs, merge_configs(config, {"callbacks": [recorder]}), **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(estimated, recorder, error)
+
+    async def astream(self, inputs, config=None, **kwargs):
+        estimated = self.estimate_tokens(inputs)
+        await self.quota.aacquire(self.model_name, estimated)
+        recorder = _UsageRecorder()
+        error = None
+        try:
+            async for chunk in self.chain.astream(
+                    inputs, merge_configs(config, {"callbacks": [recorder]}), **kwargs):
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await self._afinish(estimated, recorder, error)
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+_quota_managers = {}
+_quota_managers_lock = threading.Lock()
+
+
+def get_quota_manager(provider: str) -> Optional[QuotaManager]:
+    """Return the process-wide quota manager for provider, or None when limiting is off"""
+    limits = rate_limits_from_env(provider)
+    if limits is None:
+        return None
+    key = (provider, json.dumps(limits, sort_keys=True))
+    manager = _quota_managers.get(key)
+    if manager is None:
+        with _quota_managers_lock:
+            manager = _quota_managers.get(key)
+            if manager is None:
+                manager = QuotaManager(limits, namespace=provider)
+                _quota_managers[key] = manager
+    return manager
@@ -0,0 +1,449 @@
+"""
+Content-addressed cache for LLM chain responses.
+
+Responses are keyed by a hash of the prompt template, model name, temperature
+and the normalized chain inputs, and stored in a local SQLite database so that
+repeated job descriptions (or keyword sets) skip the Gemini call entirely.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+from src.single_flight import InFlightAbandoned, get_single_flight, single_flight_mode
+from src.tracing import span
+
+DEFAULT_CACHE_PATH = "resume-optimizer/outputs/cache/llm_responses.sqlite3"
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+# Eviction scans the whole table, so it runs on the first write and then on
+# every Nth write only; the limits may be overshot by up to N - 1 entries
+DEFAULT_EVICT_INTERVAL = 50
+
+# Set RESUME_OPTIMIZER_LLM_CACHE=0 (or "off"/"false") to bypass the cache globally
+CACHE_ENV_VAR = "RESUME_OPTIMIZER_LLM_CACHE"
+
+
+def is_cache_enabled() -> bool:
+    """Return False when the response cache has been disabled via the environment"""
+    value = os.getenv(CACHE_ENV_VAR, "1").strip().lower()
+    return value not in ("0", "off", "false", "no")
+
+
+def _normalize_value(value: Any) -> Any:
+    """Normalize an input value so cosmetic differences map to the same key"""
+    if isinstance(value, str):
+        # Collapse runs of whitespace; pasted job descriptions differ mostly here
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in value.items()}
+    return value
+
+
+def make_cache_key(prompt_template: str, model_name: str, temperature: Optional[float], inputs: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        prompt_template: The raw prompt template text used by the chain
+        model_name: Name of the chat model
+        temperature: Sampling temperature (None for the provider default)
+        inputs: The chain inputs
+
+    Returns:
+        str: Hex SHA-256 digest identifying the request
+    """
+    payload = json.dumps(
+        {
+            "prompt_template": prompt_template,
+            "model": model_name,
+            "temperature": temperature,
+            "inputs": _normalize_value(inputs),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with age- and size-based eviction"""
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, max_age_seconds=DEFAULT_MAX_AGE_SECONDS,
+                 evict_interval=DEFAULT_EVICT_INTERVAL):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.evict_interval = max(1, evict_interval)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._initialized = False
+
+    def _connect(self):
+        # A connection per operation keeps the cache safe across threads and
+        # processes; WAL lets readers proceed while another process writes.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _transaction(self):
+        # The connection's own context manager only commits or rolls back;
+        # closing() makes sure it is closed as well
+        return closing(self._connect())
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._transaction() as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses(last_accessed)")
+        self._initialized = True
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None on a miss or expired entry"""
+        self._ensure_schema()
+        now = time.time()
+        with self._transaction() as conn, conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                with self._lock:
+                    self._misses += 1
+                return None
+            conn.execute(
+                "UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+
+        with self._lock:
+            self._hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable response; every evict_interval-th write applies the eviction policy"""
+        self._ensure_schema()
+        serialized = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            evict = self._writes % self.evict_interval == 0
+            self._writes += 1
+        with self._transaction() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized.encode("utf-8")), now, now),
+            )
+            if evict:
+                self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until within limits"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?",
+                     (now - self.max_age_seconds,))
+
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_accessed ASC").fetchall()
+        stale_keys = []
+        for key, size in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            count -= 1
+            total_bytes -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        self._ensure_schema()
+        with self._transaction() as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, stored bytes and in-process hit/miss counters"""
+        self._ensure_schema()
+        with self._transaction() as conn, conn:
+            count, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            return {
+                "entries": count,
+                "bytes": total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ResponseCache()
+    return _default_cache
+
+
+class CachedChain:
+    """
+    Wrap a LangChain runnable so that invoke/ainvoke consult the response cache.
+
+    stream/astream yield the cached value as a single chunk on a hit and cache
+    the final chunk on a miss. Identical calls already in flight are coalesced
+    (see src/single_flight.py): followers wait for the leading call and get its
+    result (each caller its own deep copy), streamed calls as a single chunk.
+    Everything else is delegated to the wrapped chain unchanged. Each call is
+    recorded as a "chain.<name>" trace span. When validate is given, results it
+    rejects are still returned but never cached, so a malformed response is not
+    replayed for the lifetime of the cache.
+    """
+
+    def __init__(self, chain, prompt_template, model_name, temperature, cache=None, enabled=True,
+                 name="chain", coalesce=None, validate: Optional[Callable[[Any], bool]] = None):
+        self.chain = chain
+        self.prompt_template = prompt_template
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache or get_response_cache()
+        self.enabled = enabled
+        self.name = name
+        self.validate = validate or (lambda result: True)
+        mode = single_flight_mode()
+        self.coalesce = mode != "off" if coalesce is None else coalesce
+        # Lock files only help when the result can be picked up from the shared cache
+        self.host_coalesce = self.coalesce and enabled and mode == "host"
+
+    def cache_key(self, inputs):
+        return make_cache_key(self.prompt_template, self.model_name, self.temperature, inputs)
+
+    def _store(self, key, result):
+        if self.validate(result):
+            self.cache.set(key, result)
+
+    def _span(self, mode):
+        return span(f"chain.{self.name}", model=self.model_name, mode=mode,
+                    cache_hit=False, coalesced=False)
+
+    def _call(self, key, inputs, config, kwargs):
+        """Call the model and cache the result (under the host lock if enabled)"""
+        if not self.host_coalesce:
+            result = self.chain.invoke(inputs, config, **kwargs)
+            if self.enabled:
+                self._store(key, result)
+            return result
+        with get_single_flight().host_lock(key):
+            # Another process may have finished this request while we waited
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            result = self.chain.invoke(inputs, config, **kwargs)
+            self._store(key, result)
+        return result
+
+    async def _acall(self, key, inputs, config, kwargs):
+        if not self.host_coalesce:
+            result = await self.chain.ainvoke(inputs, config, **kwargs)
+            if self.enabled:
+                await asyncio.to_thread(self._store, key, result)
+            return result
+        async with get_single_flight().ahost_lock(key):
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+            result = await self.chain.ainvoke(inputs, config, **kwargs)
+            await asyncio.to_thread(self._store, key, result)
+        return result
+
+    def invoke(self, inputs, config=None, **kwargs):
+        with self._span("invoke") as current:
+            if not self.enabled and not self.coalesce:
+                return self.chain.invoke(inputs, config, **kwargs)
+
+            key = self.cache_key(inputs)
+            if self.enabled:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    current.set_attribute("cache_hit", True)
+                    return cached
+
+            if not self.coalesce:
+                return self._call(key, inputs, config, kwargs)
+            result, shared = get_single_flight().do(
+                key, lambda: self._call(key, inputs, config, kwargs))
+            current.set_attribute("coalesced", shared)
+            # Every caller gets its own copy, so one caller mutating its
+            # result can't change what the others sharing the call see
+            return copy.deepcopy(result)
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        with self._span("ainvoke") as current:
+            if not self.enabled and not self.coalesce:
+                return await self.chain.ainvoke(inputs, config, **kwargs)
+
+            key = self.cache_key(inputs)
+            if self.enabled:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    current.set_attribute("cache_hit", True)
+                    return cached
+
+            if not self.coalesce:
+                return await self._acall(key, inputs, config, kwargs)
+            result, shared = await get_single_flight().ado(
+                key, lambda: self._acall(key, inputs, config, kwargs))
+            current.set_attribute("coalesced", shared)
+            # Every caller gets its own copy, so one caller mutating its
+            # result can't change what the others sharing the call see
+            return copy.deepcopy(result)
+
+    def stream(self, inputs, config=None, **kwargs):
+        with self._span("stream") as current:
+            if not self.enabled and not self.coalesce:
+                yield from self.chain.stream(inputs, config, **kwargs)
+                return
+
+            key = self.cache_key(inputs)
+            if self.enabled:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    current.set_attribute("cache_hit", True)
+                    yield cached
+                    return
+
+            flight = get_single_flight() if self.coalesce else None
+            if flight is not None:
+                while True:
+                    future, is_leader = flight.claim(key)
+                    if is_leader:
+                        break
+                    try:
+                        result = future.result()
+                    except InFlightAbandoned:
+                        continue
+                    current.set_attribute("coalesced", True)
+                    if result is not None:
+                        yield copy.deepcopy(result)
+                    return
+
+            final = None
+            try:
+                with get_single_flight().host_lock(key) if self.host_coalesce else nullcontext():
+                    cached = self.cache.get(key) if self.host_coalesce else None
+                    if cached is not None:
+                        final = cached
+                        yield cached
+                    else:
+                        for chunk in self.chain.stream(inputs, config, **kwargs):
+                            final = chunk
+                            yield chunk
+                        if final is not None and self.enabled:
+                            self._store(key, final)
+            except Exception as e:
+                if flight is not None:
+                    flight.resolve(key, future, error=e)
+                raise
+            except BaseException:
+                # Closed early (GeneratorExit) or cancelled: let a follower take over
+                if flight is not None:
+                    flight.abandon(key, future)
+                raise
+            if flight is not None:
+                # Followers copy this snapshot, not the chunk the caller holds
+                flight.resolve(key, future, copy.deepcopy(final))
+
+    async def astream(self, inputs, config=None, **kwargs):
+        with self._span("astream") as current:
+            if not self.enabled and not self.coalesce:
+                async for chunk in self.chain.astream(inputs, config, **kwargs):
+                    yield chunk
+                return
+
+            key = self.cache_key(inputs)
+            if self.enabled:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    current.set_attribute("cache_hit", True)
+                    yield cached
+                    return
+
+            flight = get_single_flight() if self.coalesce else None
+            if flight is not None:
+                while True:
+                    future, is_leader = flight.claim(key)
+                    if is_leader:
+                        break
+                    try:
+                        result = await asyncio.wrap_future(future)
+                    except InFlightAbandoned:
+                        continue
+                    current.set_attribute("coalesced", True)
+                    if result is not None:
+                        yield copy.deepcopy(result)
+                    return
+
+            final = None
+            try:
+                async with get_single_flight().ahost_lock(key) if self.host_coalesce else nullcontext():
+                    cached = await asyncio.to_thread(self.cache.get, key) if self.host_coalesce else None
+                    if cached is not None:
+                        final = cached
+                        yield cached
+                    else:
+                        async for chunk in self.chain.astream(inputs, config, **kwargs):
+                            final = chunk
+                            yield chunk
+                        if final is not None and self.enabled:
+                            await asyncio.to_thread(self._store, key, final)
+            except Exception as e:
+                if flight is not None:
+                    flight.resolve(key, future, error=e)
+                raise
+            except BaseException:
+                if flight is not None:
+                    flight.abandon(key, future)
+                raise
+            if flight is not None:
+                # Followers copy this snapshot, not the chunk the caller holds
+                flight.resolve(key, future, copy.deepcopy(final))
+
+    def batch(self, inputs_list, config=None, **kwargs):
+        return [self.invoke(inputs, config, **kwargs) for inputs in inputs_list]
+
+    async def abatch(self, inputs_list, config=None, **kwargs):
+        return await asyncio.gather(*(self.ainvoke(inputs, config, **kwargs) for inputs in inputs_list))
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
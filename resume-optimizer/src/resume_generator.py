@@ -2,16 +2,113 @@
 
 import os
 import difflib
+import threading
 from datetime import datetime
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
 import re
 from string import Template
 
+from src.tracing import span
+
+# Additional CSS for PDF optimization
+PDF_CSS = '''
+    @page {
+        size: A4;
+        margin: 1in;
+    }
+    body {
+        font-size: 11pt;
+        line-height: 1.4;
+    }
+    .container {
+        max-width: none;
+        padding: 0;
+    }
+'''
+
+class PdfRenderer:
+    """
+    Long-lived WeasyPrint renderer.
+
+    Fonts are configured and the PDF overrides (PDF_CSS) are parsed once, then
+    reused for later renders. The template's own <style> blocks stay in the
+    HTML: stylesheets passed to write_pdf() are user-origin CSS, so lifting
+    them out would let PDF_CSS override the template. Renders are serialized
+    per instance; use get_pdf_renderer() to get the instance for the current
+    process.
+    """
+
+    def __init__(self):
+        self.font_config = FontConfiguration()
+        self.pdf_stylesheet = CSS(string=PDF_CSS, font_config=self.font_config)
+        self._lock = threading.Lock()
+
+    def render(self, resume_html, output_path):
+        """Write resume_html to output_path as a PDF; returns the PDF bytes when output_path is None"""
+        with span("pdf.render", output_path=output_path), self._lock:
+            pdf_bytes = HTML(string=resume_html).write_pdf(
+                output_path, stylesheets=[self.pdf_stylesheet], font_config=self.font_config)
+
+        return pdf_bytes if output_path is None else output_path
+
+
+_pdf_renderer = None
+_pdf_renderer_pid = None
+_pdf_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer():
+    """Return the PdfRenderer for this process (recreated after a fork)"""
+    global _pdf_renderer, _pdf_renderer_pid
+    with _pdf_renderer_lock:
+        if _pdf_renderer is None or _pdf_renderer_pid != os.getpid():
+            _pdf_renderer = PdfRenderer()
+            _pdf_renderer_pid = os.getpid()
+        return _pdf_renderer
+
+
+class _MtimeCache:
+    """
+    Cache of values derived from files, keyed by path.
+
+    An entry is rebuilt when the file's mtime or size changes, so edits to the
+    template or resume are picked up without restarting the process.
+    """
 
-class ResumeGenerator:
     def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, build):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with open(path, 'r', encoding='utf-8') as file:
+            value = build(file.read())
+        with self._lock:
+            self._entries[path] = (version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Compiled HTML templates and static resume info, shared by all generators
+_template_cache = _MtimeCache()
+_static_info_cache = _MtimeCache()
+
+
+class ResumeGenerator:
+    def __init__(self, pdf_renderer=None):
         self.template_path = self._get_template_path()
+        self.pdf_renderer = pdf_renderer
 
     def _get_template_path(self):
         """Get the path to the HTML template"""
@@ -28,12 +125,9 @@ class ResumeGenerator:
         if original_resume_path is None:
             original_resume_path = "resume-optimizer/src/docs/resume.md"
 
-        # Read original resume to extract static data
-        with open(original_resume_path, 'r', encoding='utf-8') as file:
-            original_content = file.read()
-
-        # Extract static information from original resume
-        static_info = self._extract_static_info(original_content)
+        # Extract static information from original resume (cached until the file changes)
+        static_info = _static_info_cache.get(
+            original_resume_path, self._extract_static_info)
 
         # Format bullets for each section
         liberty_bullets = self._format_bullets_html(
@@ -45,11 +139,8 @@ class ResumeGenerator:
         echo_bullets = self._format_bullets_html(
             optimization_result.get('echo_project', []))
 
-        # Load template
-        template_html = self._load_template()
-
         # Fill template with data using Template (safer for HTML with CSS)
-        template = Template(template_html)
+        template = _template_cache.get(self.template_path, Template)
         updated_resume = template.substitute(
             NAME=static_info['name'],
             EMAIL=static_info['email'],
@@ -198,30 +289,8 @@ class ResumeGenerator:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # Create PDF from HTML
-        font_config = FontConfiguration()
-        html_doc = HTML(string=resume_html)
-
-        # Additional CSS for PDF optimization
-        pdf_css = CSS(string='''
-            @page {
-                size: A4;
-                margin: 1in;
-            }
-            body {
-                font-size: 11pt;
-                line-height: 1.4;
-            }
-            .container {
-                max-width: none;
-                padding: 0;
-            }
-        ''')
-
-        html_doc.write_pdf(output_path, stylesheets=[
-                           pdf_css], font_config=font_config)
-
-        return output_path
+        renderer = self.pdf_renderer or get_pdf_renderer()
+        return renderer.render(resume_html, output_path)
 
     def generate_markdown_from_html(self, html_content):
         """Convert HTML back to markdown for display purposes"""
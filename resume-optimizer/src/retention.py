@@ -0,0 +1,343 @@
+"""
+Retention limits for everything written under outputs/.
+
+Each output type can have an age, count and size limit; anything beyond a
+limit is removed, oldest first. The types are the saved JSON outputs
+(job_analysis, resume_optimization) and the generated artifacts: PDFs, HTML
+and markdown resumes anywhere under outputs/ (the segment files and caches
+are left alone). PDFs whose optimization JSON is still saved are tracked
+separately as "regenerable_pdf", since `file_cli.py render-pdfs` can recreate
+them at any time; they can be given a much tighter limit than PDFs that have
+no saved source. A PDF's source is whatever was recorded when it was rendered
+(see file_manager.record_artifact_source), which covers every naming scheme
+(optimized_resume_*, resume_pdf_*, job_<id>.pdf); resume_from_<optimization>.pdf
+names from `render-pdfs` are recognized even without a record. Files written
+outside outputs/ (e.g. with --output-dir) belong to the user and are never
+pruned. Leftover temporary files from interrupted atomic writes are removed as
+well.
+
+Limits come from RESUME_OPTIMIZER_RETENTION, e.g.
+    "regenerable_pdf:max_age=1d;pdf:max_count=200;job_analysis:max_size=500MB"
+and are applied by `python file_cli.py prune`, or every
+RESUME_OPTIMIZER_RETENTION_INTERVAL seconds by a background thread in
+long-running processes (the Streamlit app's job runner and the HTTP API).
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.file_manager import (
+    OUTPUT_TYPES,
+    OUTPUTS_DIR,
+    artifact_sources,
+    delete_saved_files,
+    forget_artifacts,
+    query_saved_files,
+)
+
+logger = logging.getLogger(__name__)
+
+RETENTION_ENV_VAR = "RESUME_OPTIMIZER_RETENTION"
+RETENTION_INTERVAL_ENV_VAR = "RESUME_OPTIMIZER_RETENTION_INTERVAL"
+
+# Directories under outputs/ that never hold artifacts (saved JSON outputs are
+# pruned through the index instead)
+SKIPPED_DIRS = ("segments", "cache") + OUTPUT_TYPES
+ARTIFACT_EXTENSIONS = {"pdf": ".pdf", "html": ".html", "markdown": ".md"}
+RETENTION_TYPES = OUTPUT_TYPES + ("regenerable_pdf", "pdf", "html", "markdown")
+
+# Temporary files younger than this may still belong to a write in progress
+TEMP_FILE_GRACE_SECONDS = 3600
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3}
+
+
+class RetentionPolicy:
+    """Age, count and size limits for one output type (None means unlimited)"""
+
+    def __init__(self, max_age_seconds: Optional[float] = None,
+                 max_count: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+
+    def is_unlimited(self) -> bool:
+        return self.max_age_seconds is None and self.max_count is None and self.max_bytes is None
+
+    def expired(self, entries: List[Dict[str, Any]], now: float) -> List[Dict[str, Any]]:
+        """
+        Pick the entries that fall outside the limits.
+
+        Args:
+            entries: Dicts with "mtime" (epoch seconds) and "bytes", in any order
+            now: Current time in epoch seconds
+
+        Returns:
+            The entries to remove
+        """
+        expired = []
+        kept_count = kept_bytes = 0
+        for entry in sorted(entries, key=lambda e: e["mtime"], reverse=True):
+            too_old = (self.max_age_seconds is not None
+                       and now - entry["mtime"] > self.max_age_seconds)
+            too_many = self.max_count is not None and kept_count >= self.max_count
+            too_big = (self.max_bytes is not None
+                       and kept_bytes + entry["bytes"] > self.max_bytes)
+            if too_old or too_many or too_big:
+                expired.append(entry)
+            else:
+                kept_count += 1
+                kept_bytes += entry["bytes"]
+        return expired
+
+    def __repr__(self):
+        return (f"RetentionPolicy(max_age_seconds={self.max_age_seconds}, "
+                f"max_count={self.max_count}, max_bytes={self.max_bytes})")
+
+
+def parse_duration(value: str) -> float:
+    """Parse "90", "30m", "12h" or "7d" into seconds"""
+    value = value.strip().lower()
+    if value and value[-1] in _DURATION_UNITS:
+        return float(value[:-1]) * _DURATION_UNITS[value[-1]]
+    return float(value)
+
+
+def parse_size(value: str) -> int:
+    """Parse "2048", "500KB", "200MB" or "1GB" into bytes"""
+    value = value.strip().lower()
+    for unit in sorted(_SIZE_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * _SIZE_UNITS[unit])
+    return int(value)
+
+
+def parse_policies(spec: str) -> Dict[str, RetentionPolicy]:
+    """
+    Parse a retention spec such as "pdf:max_age=7d,max_count=200;html:max_size=50MB".
+
+    Raises:
+        ValueError: On unknown output types, limits or malformed values
+    """
+    policies = {}
+    for clause in filter(None, (part.strip() for part in spec.split(";"))):
+        file_type, _, limits = clause.partition(":")
+        file_type = file_type.strip()
+        if file_type not in RETENTION_TYPES:
+            raise ValueError(f"Unknown output type in retention spec: {file_type!r}")
+        policy = RetentionPolicy()
+        for limit in filter(None, (part.strip() for part in limits.split(","))):
+            name, _, value = limit.partition("=")
+            name = name.strip()
+            if name == "max_age":
+                policy.max_age_seconds = parse_duration(value)
+            elif name == "max_count":
+                policy.max_count = int(value)
+            elif name == "max_size":
+                policy.max_bytes = parse_size(value)
+            else:
+                raise ValueError(f"Unknown retention limit for {file_type}: {name!r}")
+        policies[file_type] = policy
+    return policies
+
+
+def policies_from_env() -> Dict[str, RetentionPolicy]:
+    """Retention policies configured through RESUME_OPTIMIZER_RETENTION"""
+    return parse_policies(os.getenv(RETENTION_ENV_VAR, ""))
+
+
+def _timestamp_seconds(timestamp: Optional[str], fallback: float) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return fallback
+
+
+def _saved_output_entries(file_type: str, now: float) -> List[Dict[str, Any]]:
+    entries = []
+    for row in query_saved_files(file_type):
+        if row["segment_offset"] is not None:
+            size = row["segment_length"] or 0
+        else:
+            try:
+                size = os.path.getsize(row["file_path"])
+            except OSError:
+                size = 0
+        entries.append({"type": file_type, "filename": row["filename"],
+                        "path": row["file_path"], "bytes": size,
+                        "mtime": _timestamp_seconds(row["timestamp"], now)})
+    return entries
+
+
+def _walk_outputs(skipped_dirs=SKIPPED_DIRS):
+    """Yield the path of every file under outputs/, minus the skipped top-level directories"""
+    for directory, subdirectories, filenames in os.walk(OUTPUTS_DIR):
+        if os.path.normpath(directory) == os.path.normpath(OUTPUTS_DIR):
+            subdirectories[:] = [name for name in subdirectories if name not in skipped_dirs]
+        for filename in filenames:
+            yield os.path.join(directory, filename)
+
+
+def _pdf_source(path: str, sources: Dict[str, Dict[str, str]]) -> Optional[str]:
+    """Name (without extension) of the optimization a PDF was rendered from, if known"""
+    recorded = sources.get(os.path.normpath(path))
+    if recorded is not None:
+        if recorded["file_type"] != "resume_optimization":
+            return None
+        return os.path.splitext(recorded["filename"])[0]
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name.startswith("resume_from_"):
+        return name[len("resume_from_"):]
+    return None
+
+
+def _artifact_entries() -> Dict[str, List[Dict[str, Any]]]:
+    """Generated PDF/HTML/markdown files, grouped by retention type"""
+    optimizations = {os.path.splitext(row["filename"])[0]
+                     for row in query_saved_files("resume_optimization")}
+    sources = artifact_sources()
+    grouped = {file_type: [] for file_type in ("regenerable_pdf",) + tuple(ARTIFACT_EXTENSIONS)}
+    for path in sorted(_walk_outputs()):
+        name = os.path.basename(path)
+        file_type = next((t for t, ext in ARTIFACT_EXTENSIONS.items()
+                          if name.endswith(ext)), None)
+        if file_type is None:
+            continue
+        if file_type == "pdf" and _pdf_source(path, sources) in optimizations:
+            file_type = "regenerable_pdf"
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        grouped[file_type].append({"type": file_type, "filename": name,
+                                   "path": path, "bytes": stat.st_size,
+                                   "mtime": stat.st_mtime})
+    return grouped
+
+
+def _stale_temp_files(now: float) -> List[Dict[str, Any]]:
+    """Temporary files left behind by atomic writes that never completed"""
+    stale = []
+    for path in _walk_outputs(skipped_dirs=("cache",)):
+        name = os.path.basename(path)
+        if name.startswith(".") and name.endswith(".tmp"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > TEMP_FILE_GRACE_SECONDS:
+                stale.append({"type": "temp", "filename": name, "path": path,
+                              "bytes": stat.st_size, "mtime": stat.st_mtime})
+    return stale
+
+
+def plan_pruning(policies: Dict[str, RetentionPolicy],
+                 now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Work out what the policies would remove without touching anything.
+
+    Args:
+        policies: RetentionPolicy per output type (types not listed are kept)
+        now: Reference time in epoch seconds (defaults to the current time)
+
+    Returns:
+        Dict mapping each output type (plus "temp") to the entries to remove,
+        each a dict with "filename", "path", "bytes" and "mtime"
+    """
+    now = time.time() if now is None else now
+    plan = {}
+    artifacts = None
+    for file_type, policy in policies.items():
+        if policy.is_unlimited():
+            continue
+        if file_type in OUTPUT_TYPES:
+            entries = _saved_output_entries(file_type, now)
+        else:
+            if artifacts is None:
+                artifacts = _artifact_entries()
+            entries = artifacts[file_type]
+        plan[file_type] = policy.expired(entries, now)
+    plan["temp"] = _stale_temp_files(now)
+    return plan
+
+
+def prune_outputs(policies: Optional[Dict[str, RetentionPolicy]] = None,
+                  dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Remove whatever falls outside the retention policies.
+
+    Saved JSON outputs are deleted through file_manager (which keeps the index
+    in sync and compacts segment files); artifacts and temp files are removed
+    directly.
+
+    Args:
+        policies: RetentionPolicy per output type (defaults to RESUME_OPTIMIZER_RETENTION)
+        dry_run: Only report what would be removed
+
+    Returns:
+        Dict mapping each output type to {"removed", "bytes"} (plus
+        "segments_compacted" for saved outputs)
+    """
+    policies = policies_from_env() if policies is None else policies
+    plan = plan_pruning(policies)
+    summary = {}
+    for file_type, entries in plan.items():
+        result = {"removed": len(entries), "bytes": sum(e["bytes"] for e in entries)}
+        if not dry_run and entries:
+            if file_type in OUTPUT_TYPES:
+                result = delete_saved_files(
+                    file_type, [entry["filename"] for entry in entries])
+            else:
+                result = {"removed": 0, "bytes": 0}
+                for entry in entries:
+                    try:
+                        os.remove(entry["path"])
+                    except FileNotFoundError:
+                        continue
+                    result["removed"] += 1
+                    result["bytes"] += entry["bytes"]
+                if file_type != "temp":
+                    forget_artifacts([entry["path"] for entry in entries])
+        summary[file_type] = result
+    return summary
+
+
+_background_thread = None
+_background_lock = threading.Lock()
+
+
+def _prune_periodically(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            prune_outputs()
+        except Exception:
+            # Keep the thread alive; the next interval tries again
+            logger.exception("Retention pruning failed")
+
+
+def start_background_pruning() -> bool:
+    """
+    Start the background pruning thread if RESUME_OPTIMIZER_RETENTION_INTERVAL is set.
+
+    Safe to call more than once; only one thread is started per process.
+
+    Returns:
+        bool: True if background pruning is running
+    """
+    global _background_thread
+    interval = float(os.getenv(RETENTION_INTERVAL_ENV_VAR, 0) or 0)
+    if interval <= 0:
+        return False
+    policies_from_env()  # Fail fast on a malformed spec
+    with _background_lock:
+        if _background_thread is None:
+            _background_thread = threading.Thread(
+                target=_prune_periodically, args=(interval,),
+                name="retention-pruner", daemon=True)
+            _background_thread.start()
+    return True
@@ -0,0 +1,128 @@
+"""
+Section-parallel resume rewriting.
+
+The full rewriter prompt asks one model call for all five OptimizedResumeContent
+sections, so its latency is the sum of every section's output tokens.
+SectionParallelRewriter instead sends one call per section (each with its own
+sub-schema, see parsers.SECTION_MODELS) concurrently and merges the results,
+so a rewrite takes about as long as the slowest section.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict
+
+from src.tracing import span
+
+
+class SectionParallelRewriter:
+    """
+    Chain-like object that rewrites every section concurrently and merges the results.
+
+    Exposes invoke/ainvoke/stream/astream like the full rewriter chain. Streams
+    yield the merged dict each time a section finishes, so every chunk only
+    holds complete sections (streams_complete_sections). If any section fails
+    the whole rewrite fails: async calls still running are cancelled, while
+    sync calls already running in threads finish in the background and their
+    results are discarded.
+    """
+
+    # Lets src.streaming emit each section as soon as it shows up in a chunk
+    streams_complete_sections = True
+
+    def __init__(self, section_chains: Dict[str, Any]):
+        self.section_chains = section_chains
+
+    def _merge(self, results: Dict[str, Dict[str, Any]], partial: bool = False) -> Dict[str, Any]:
+        """
+        Combine the per-section results in schema order.
+
+        Args:
+            results: {section: result of that section's chain}
+            partial: Allow sections without a result yet (for stream chunks)
+
+        Raises:
+            ValueError: When a result lacks its section, or a section has no
+                result and partial is False
+        """
+        merged = {}
+        for section in self.section_chains:
+            if section not in results:
+                if partial:
+                    continue
+                raise ValueError(f"No rewrite result for section {section!r}")
+            result = results[section]
+            if not isinstance(result, dict) or section not in result:
+                raise ValueError(f"Rewrite result for section {section!r} does not contain it")
+            merged[section] = result[section]
+        return merged
+
+    def _span(self, mode):
+        return span("chain.rewriter_sections", mode=mode, sections=len(self.section_chains))
+
+    def _iter_threaded(self, inputs, config, kwargs):
+        """
+        Run the section chains in threads, yielding (section, result) as each finishes.
+
+        When a section fails (or the caller stops iterating) this returns
+        without waiting for the other calls: a running call cannot be
+        interrupted, so it finishes in its thread and its result is dropped.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(self.section_chains))
+        try:
+            # Copy the context so the sections' spans nest under this one
+            futures = {
+                executor.submit(contextvars.copy_context().run,
+                                chain.invoke, inputs, config, **kwargs): section
+                for section, chain in self.section_chains.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def invoke(self, inputs, config=None, **kwargs):
+        with self._span("invoke"):
+            return self._merge(dict(self._iter_threaded(inputs, config, kwargs)))
+
+    def stream(self, inputs, config=None, **kwargs):
+        with self._span("stream"):
+            results = {}
+            for section, result in self._iter_threaded(inputs, config, kwargs):
+                results[section] = result
+                yield self._merge(results, partial=len(results) < len(self.section_chains))
+
+    async def _iter_tasks(self, inputs, config, kwargs):
+        tasks = {
+            asyncio.create_task(chain.ainvoke(inputs, config, **kwargs)): section
+            for section, chain in self.section_chains.items()
+        }
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield tasks[task], task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        with self._span("ainvoke"):
+            results = {}
+            async for section, result in self._iter_tasks(inputs, config, kwargs):
+                results[section] = result
+            return self._merge(results)
+
+    async def astream(self, inputs, config=None, **kwargs):
+        with self._span("astream"):
+            results = {}
+            async for section, result in self._iter_tasks(inputs, config, kwargs):
+                results[section] = result
+                yield self._merge(results, partial=len(results) < len(self.section_chains))
+
+    def batch(self, inputs_list, config=None, **kwargs):
+        return [self.invoke(inputs, config, **kwargs) for inputs in inputs_list]
+
+    async def abatch(self, inputs_list, config=None, **kwargs):
+        return await asyncio.gather(*(self.ainvoke(inputs, config, **kwargs) for inputs in inputs_list))
@@ -0,0 +1,272 @@
+"""
+Append-only compressed segment storage for saved outputs.
+
+Instead of one pretty-printed JSON file per run, records are appended to large
+segment files under outputs/segments/<file_type>/. Every record is compressed as
+an independent gzip member (or zstd frame), so it can be read back by seeking to
+its offset and decompressing only its own bytes. Next to each segment, a
+".idx" sidecar lists (filename, offset, length) for the records it holds; the
+saved-files index caches these locations for random access and can always be
+rebuilt from the sidecars.
+
+Enable it with RESUME_OPTIMIZER_STORAGE=segments; set
+RESUME_OPTIMIZER_SEGMENT_CODEC=zstd to use zstd (needs the zstandard package)
+instead of gzip for new segments. Existing per-file outputs can
+be moved over with `python file_cli.py migrate-storage`.
+"""
+import fcntl
+import gzip
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+from src.atomic_io import fsync_directory
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+SEGMENTS_DIR = "resume-optimizer/outputs/segments"
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+STORAGE_ENV_VAR = "RESUME_OPTIMIZER_STORAGE"
+CODEC_ENV_VAR = "RESUME_OPTIMIZER_SEGMENT_CODEC"
+
+_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def is_segment_storage_enabled() -> bool:
+    """True when new outputs should be appended to segment files"""
+    return os.getenv(STORAGE_ENV_VAR, "files").strip().lower() == "segments"
+
+
+def _default_codec() -> str:
+    codec = os.getenv(CODEC_ENV_VAR, "gzip").strip().lower()
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec if codec in _EXTENSIONS else "gzip"
+
+
+def _codec_for(segment_path: str) -> str:
+    return "zstd" if segment_path.endswith(_EXTENSIONS["zstd"]) else "gzip"
+
+
+def _segment_number(segment_path: str) -> int:
+    return int(os.path.basename(segment_path)[len("segment_"):].split(".")[0])
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor().compress(payload)
+    return gzip.compress(payload, mtime=0)
+
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "zstandard is required to read .zst segments (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+class SegmentStore:
+    """Compressed, append-only JSONL segments with per-record offsets"""
+
+    def __init__(self, root: str = SEGMENTS_DIR, codec: Optional[str] = None,
+                 max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES):
+        self.root = root
+        self.codec = codec or _default_codec()
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+
+    def _directory(self, file_type: str) -> str:
+        return f"{self.root}/{file_type}"
+
+    def segment_paths(self, file_type: str):
+        """Segment files for file_type, oldest first"""
+        directory = self._directory(file_type)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            f"{directory}/{name}" for name in os.listdir(directory)
+            if name.startswith("segment_") and name.endswith(tuple(_EXTENSIONS.values())))
+
+    def _active_segment(self, file_type: str) -> str:
+        """Newest segment with room left (and the current codec), else a new one"""
+        paths = self.segment_paths(file_type)
+        if paths:
+            latest = paths[-1]
+            if (_codec_for(latest) == self.codec
+                    and os.path.getsize(latest) < self.max_segment_bytes):
+                return latest
+        # Numbered after the newest segment, since compaction can remove older ones
+        number = _segment_number(paths[-1]) + 1 if paths else 1
+        return f"{self._directory(file_type)}/segment_{number:06d}{_EXTENSIONS[self.codec]}"
+
+    def append(self, file_type: str, filename: str, data: Dict[str, Any], sync: bool = True) -> Dict[str, Any]:
+        """
+        Append one record.
+
+        Args:
+            file_type: "job_analysis" or "resume_optimization"
+            filename: Logical filename the record is saved under
+            data: The JSON-serializable record
+            sync: fsync the segment and its sidecar before returning (pass False
+                when a GroupCommit fsyncs them later)
+
+        Returns:
+            Dict with the segment path, offset and compressed length of the record
+        """
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        blob = _compress(payload.encode("utf-8"), self.codec)
+        os.makedirs(self._directory(file_type), exist_ok=True)
+
+        with self._lock:
+            while True:
+                segment_path = self._active_segment(file_type)
+                is_new_segment = not os.path.exists(segment_path)
+                segment = open(segment_path, "ab")
+                # The file lock keeps offsets consistent across processes
+                fcntl.flock(segment, fcntl.LOCK_EX)
+                if os.fstat(segment.fileno()).st_nlink > 0:
+                    break
+                # Compacted away while we waited for the lock; pick the new active segment
+                segment.close()
+            with segment:
+                try:
+                    offset = os.fstat(segment.fileno()).st_size
+                    segment.write(blob)
+                    segment.flush()
+                    if sync:
+                        os.fsync(segment.fileno())
+                    location = {"segment_path": segment_path,
+                                "offset": offset, "length": len(blob)}
+                    with open(segment_path + ".idx", "a", encoding="utf-8") as sidecar:
+                        sidecar.write(json.dumps(
+                            {"filename": filename, "offset": offset, "length": len(blob)}) + "\n")
+                        if sync:
+                            sidecar.flush()
+                            os.fsync(sidecar.fileno())
+                finally:
+                    fcntl.flock(segment, fcntl.LOCK_UN)
+            if sync and is_new_segment:
+                fsync_directory(self._directory(file_type))
+        return location
+
+    @staticmethod
+    def read(segment_path: str, offset: int, length: int) -> Dict[str, Any]:
+        """Read the record stored at offset in segment_path"""
+        with open(segment_path, "rb") as segment:
+            segment.seek(offset)
+            blob = segment.read(length)
+        return json.loads(_decompress(blob, _codec_for(segment_path)))
+
+    def iter_records(self, file_type: str) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Yield (filename, location, data) for every stored record of file_type"""
+        for segment_path in self.segment_paths(file_type):
+            sidecar_path = segment_path + ".idx"
+            if not os.path.exists(sidecar_path):
+                continue
+            with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+                lines = [line for line in sidecar if line.strip()]
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                location = {"segment_path": segment_path,
+                            "offset": entry["offset"], "length": entry["length"]}
+                try:
+                    data = self.read(segment_path, entry["offset"], entry["length"])
+                except (OSError, ValueError, EOFError):
+                    # A record cut off by a crash is skipped, like a truncated JSON file
+                    continue
+                yield entry["filename"], location, data
+
+    def compact(self, segment_path: str, drop: Set[str],
+                on_relocated: Callable[[Dict[str, Dict[str, Any]]], None]) -> Optional[str]:
+        """
+        Rewrite a segment without the records named in drop.
+
+        Kept records are copied, still compressed, into a new segment that is
+        fsynced before on_relocated(locations) is called with the new
+        location of each kept filename (so the caller can repoint its index).
+        The old segment and sidecar are removed afterwards. Appends to the
+        segment wait on its file lock meanwhile and then move on to the new
+        active segment.
+
+        Returns:
+            Path of the new segment, or None when no records were kept
+        """
+        file_type = os.path.basename(os.path.dirname(segment_path))
+        sidecar_path = segment_path + ".idx"
+        with self._lock, open(segment_path, "rb") as segment:
+            fcntl.flock(segment, fcntl.LOCK_EX)
+            try:
+                entries = []
+                if os.path.exists(sidecar_path):
+                    with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+                        for line in sidecar:
+                            try:
+                                entries.append(json.loads(line))
+                            except ValueError:
+                                continue
+
+                new_path, locations = None, {}
+                kept = [entry for entry in entries if entry["filename"] not in drop]
+                if kept:
+                    number = _segment_number(self.segment_paths(file_type)[-1]) + 1
+                    new_path = (f"{self._directory(file_type)}/segment_{number:06d}"
+                                f"{_EXTENSIONS[_codec_for(segment_path)]}")
+                    with open(new_path, "xb") as out, \
+                            open(new_path + ".idx", "w", encoding="utf-8") as out_sidecar:
+                        for entry in kept:
+                            segment.seek(entry["offset"])
+                            blob = segment.read(entry["length"])
+                            if len(blob) != entry["length"]:
+                                continue
+                            offset = out.tell()
+                            out.write(blob)
+                            out_sidecar.write(json.dumps(
+                                {"filename": entry["filename"], "offset": offset,
+                                 "length": len(blob)}) + "\n")
+                            locations[entry["filename"]] = {
+                                "segment_path": new_path, "offset": offset, "length": len(blob)}
+                        out.flush()
+                        os.fsync(out.fileno())
+                        out_sidecar.flush()
+                        os.fsync(out_sidecar.fileno())
+                    fsync_directory(self._directory(file_type))
+
+                on_relocated(locations)
+                os.remove(segment_path)
+                if os.path.exists(sidecar_path):
+                    os.remove(sidecar_path)
+                fsync_directory(self._directory(file_type))
+            finally:
+                fcntl.flock(segment, fcntl.LOCK_UN)
+        return new_path
+
+    def disk_usage(self) -> int:
+        """Total bytes used by segments and their sidecars"""
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+        return total
+
+
+_segment_store = None
+_segment_store_lock = threading.Lock()
+
+
+def get_segment_store() -> SegmentStore:
+    """Return the process-wide segment store"""
+    global _segment_store
+    if _segment_store is None:
+        with _segment_store_lock:
+            if _segment_store is None:
+                _segment_store = SegmentStore()
+    return _segment_store
@@ -0,0 +1,183 @@
+"""
+Single-flight coalescing of identical in-flight chain calls.
+
+When the same request (same response-cache key) is already running, later
+callers wait for that call and share its result instead of calling the model
+again. This covers every thread, Streamlit session and event loop in the
+process. With RESUME_OPTIMIZER_SINGLE_FLIGHT=host, calls are also serialized
+across processes on the machine through lock files. A process that gets the
+lock after another one finished reads the result from the shared response
+cache, so this mode relies on the cache being enabled.
+"""
+import asyncio
+import fcntl
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+SINGLE_FLIGHT_ENV_VAR = "RESUME_OPTIMIZER_SINGLE_FLIGHT"
+DEFAULT_LOCK_DIR = "resume-optimizer/outputs/cache/inflight"
+# Keys are striped over a fixed set of lock files so the directory stays small
+LOCK_STRIPES = 1024
+
+
+def single_flight_mode() -> str:
+    """Return "process" (the default), "off", or "host" to also coalesce across processes"""
+    mode = os.getenv(SINGLE_FLIGHT_ENV_VAR, "process").strip().lower()
+    if mode in ("0", "off", "false", "no"):
+        return "off"
+    return "host" if mode == "host" else "process"
+
+
+class InFlightAbandoned(Exception):
+    """The leading call was cancelled or its stream closed early; followers retry"""
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by request key"""
+
+    def __init__(self, lock_dir: str = DEFAULT_LOCK_DIR):
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        """
+        Join the in-flight call for key, or start one.
+
+        Returns:
+            (future, is_leader): the leader must call resolve() when done;
+            followers wait on the future
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._leaders += 1
+            return future, True
+
+    def resolve(self, key: str, future: Future, result: Any = None,
+                error: BaseException = None) -> None:
+        """Publish the leader's outcome and retire the in-flight entry"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def abandon(self, key: str, future: Future) -> None:
+        self.resolve(key, future, error=InFlightAbandoned())
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key at a time.
+
+        Returns:
+            (result, shared): shared is True when the result came from another caller's call
+        """
+        while True:
+            future, is_leader = self.claim(key)
+            if not is_leader:
+                try:
+                    return future.result(), True
+                except InFlightAbandoned:
+                    continue
+            try:
+                result = fn()
+            except BaseException as e:
+                self.resolve(key, future, error=e if isinstance(e, Exception) else InFlightAbandoned())
+                raise
+            self.resolve(key, future, result)
+            return result, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async version of do(); callers may be on different event loops and threads"""
+        while True:
+            future, is_leader = self.claim(key)
+            if not is_leader:
+                try:
+                    return await asyncio.wrap_future(future), True
+                except InFlightAbandoned:
+                    continue
+            try:
+                result = await fn()
+            except BaseException as e:
+                # A cancelled leader hands the call over to a follower instead of failing it
+                self.resolve(key, future, error=e if isinstance(e, Exception) else InFlightAbandoned())
+                raise
+            self.resolve(key, future, result)
+            return result, False
+
+    def _lock_path(self, key: str) -> str:
+        return f"{self.lock_dir}/{int(key[:8], 16) % LOCK_STRIPES:04d}.lock"
+
+    @contextmanager
+    def host_lock(self, key: str):
+        """Hold the machine-wide lock for key while the block runs (blocking)"""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with open(self._lock_path(key), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _release(lock_file) -> None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            lock_file.close()
+
+    @asynccontextmanager
+    async def ahost_lock(self, key: str):
+        """host_lock() for coroutines; waits for the lock in a worker thread"""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock_file = open(self._lock_path(key), "a")
+        acquire = asyncio.ensure_future(
+            asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX))
+        try:
+            await asyncio.shield(acquire)
+        except BaseException:
+            # Cancelled while the worker thread still waits on the file: closing
+            # it now would leave that thread locking a reused descriptor, so
+            # release and close it once the thread is done
+            acquire.add_done_callback(lambda _: self._release(lock_file))
+            raise
+        try:
+            yield
+        finally:
+            self._release(lock_file)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Calls that went to the model vs. calls that joined one already in flight"""
+        with self._lock:
+            return {"leaders": self._leaders, "coalesced": self._coalesced,
+                    "in_flight": len(self._calls)}
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight registry"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
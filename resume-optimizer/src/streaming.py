@@ -0,0 +1,76 @@
+"""
+Section-by-section streaming of the resume rewriter output.
+
+The rewriter chain ends in a JsonOutputParser, so chain.stream()/astream()
+yield progressively more complete dicts as the model writes its JSON. Because
+the model writes one key after another, a section is complete as soon as the
+next key shows up (or the stream ends); the helpers below turn the stream of
+partial dicts into a stream of finished (section, value) pairs.
+
+Section-parallel rewriters (src/section_rewriter.py) only ever yield complete
+sections, so every key of their chunks is emitted right away.
+
+If the final chunk disagrees with a section that was already emitted (a hedged
+request won the race, see src/hedging.py), the section is emitted again with
+its final value.
+"""
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Tuple
+
+from src.parsers import OptimizedResumeContent
+
+# Sections in the order the schema (and therefore the model) lists them
+RESUME_SECTIONS = list(OptimizedResumeContent.model_fields)
+
+
+class _SectionTracker:
+    """Tracks which sections of the streamed partial JSON are complete"""
+
+    def __init__(self, complete_chunks: bool = False):
+        self.complete_chunks = complete_chunks
+        self.emitted = {}
+        self.latest = {}
+
+    def update(self, partial: Dict[str, Any]):
+        if not isinstance(partial, dict):
+            return []
+        self.latest = partial
+        if self.complete_chunks:
+            return self._collect(list(partial))
+        # Every key except the one currently being written is final
+        return self._collect(list(partial)[:-1])
+
+    def finish(self):
+        return self._collect(list(self.latest), final=True)
+
+    def _collect(self, keys, final=False):
+        completed = []
+        for key in keys:
+            if key not in self.emitted or (final and self.emitted[key] != self.latest[key]):
+                self.emitted[key] = self.latest[key]
+                completed.append((key, self.latest[key]))
+        return completed
+
+
+def iter_completed_sections(partials: Iterable[Dict[str, Any]],
+                            complete_chunks: bool = False) -> Iterator[Tuple[str, Any]]:
+    """Yield (section, value) for each section once it is complete"""
+    tracker = _SectionTracker(complete_chunks)
+    for partial in partials:
+        yield from tracker.update(partial)
+    yield from tracker.finish()
+
+
+def stream_rewriter_sections(rewriter_chain, inputs: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """Stream the rewriter chain, yielding each (section, value) as it completes"""
+    return iter_completed_sections(
+        rewriter_chain.stream(inputs), getattr(rewriter_chain, "streams_complete_sections", False))
+
+
+async def astream_rewriter_sections(rewriter_chain, inputs: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Async variant of stream_rewriter_sections built on chain.astream()"""
+    tracker = _SectionTracker(getattr(rewriter_chain, "streams_complete_sections", False))
+    async for partial in rewriter_chain.astream(inputs):
+        for completed in tracker.update(partial):
+            yield completed
+    for completed in tracker.finish():
+        yield completed
@@ -0,0 +1,337 @@
+"""
+Lightweight per-stage timing and tracing.
+
+span() times a block of work and records it with its parent span, so a
+pipeline run breaks down into LLM calls, parsing, file saves and PDF renders.
+Spans are exported when tracing is configured:
+
+    RESUME_OPTIMIZER_TRACE_FILE=path.jsonl  append one JSON object per span
+    RESUME_OPTIMIZER_TRACE_OTEL=1           mirror spans to OpenTelemetry (needs
+                                            the optional opentelemetry-api package
+                                            and an SDK/exporter configured by the host)
+
+trace_run() additionally collects the spans of one run in memory, which is what
+the UI uses for its per-run timing breakdown. When neither is active, span() is a
+no-op. TracingCallbackHandler turns LangChain runs (prompt, model, parser) into
+spans, including the model's token usage.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TRACE_FILE_ENV_VAR = "RESUME_OPTIMIZER_TRACE_FILE"
+TRACE_OTEL_ENV_VAR = "RESUME_OPTIMIZER_TRACE_OTEL"
+
+_current_span = contextvars.ContextVar("resume_optimizer_span", default=None)
+_current_run = contextvars.ContextVar("resume_optimizer_trace_run", default=None)
+
+
+class Span:
+    """One timed unit of work"""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self.status = "ok"
+        self.error = None
+        self.otel_span = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self.otel_span is not None and value is not None:
+            self.otel_span.set_attribute(key, value)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NullSpan:
+    """Stand-in returned by span() when tracing is inactive"""
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TraceRun:
+    """Collects the spans of one run for an in-process timing breakdown"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Finished spans ordered by start time, as plain dicts"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_time)
+        return [s.to_dict() for s in spans]
+
+
+class JsonlTraceExporter:
+    """Appends finished spans to a local JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class OpenTelemetryBridge:
+    """Mirrors spans onto OpenTelemetry spans using the host's tracer provider"""
+
+    def __init__(self):
+        from opentelemetry import trace
+        self._trace = trace
+        self._tracer = trace.get_tracer("resume-optimizer")
+
+    def start(self, span: Span, parent: Optional[Span]) -> None:
+        context = None
+        if parent is not None and parent.otel_span is not None:
+            context = self._trace.set_span_in_context(parent.otel_span)
+        span.otel_span = self._tracer.start_span(
+            span.name, context=context,
+            attributes={k: v for k, v in span.attributes.items() if v is not None})
+
+    def end(self, span: Span) -> None:
+        if span.otel_span is None:
+            return
+        if span.error:
+            span.otel_span.set_status(
+                self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        span.otel_span.end()
+
+
+_exporters = []
+_otel_bridge = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+def configure_tracing(jsonl_path: Optional[str] = None, otel: bool = False) -> None:
+    """Set the trace exporters explicitly (overrides the environment variables)"""
+    global _exporters, _otel_bridge, _configured
+    with _config_lock:
+        _exporters = [JsonlTraceExporter(jsonl_path)] if jsonl_path else []
+        _otel_bridge = None
+        if otel:
+            try:
+                _otel_bridge = OpenTelemetryBridge()
+            except ImportError:
+                # opentelemetry-api is optional; fall back to the other exporters
+                _otel_bridge = None
+        _configured = True
+
+
+def _ensure_configured() -> None:
+    if not _configured:
+        configure_tracing(
+            jsonl_path=os.getenv(TRACE_FILE_ENV_VAR) or None,
+            otel=os.getenv(TRACE_OTEL_ENV_VAR, "").lower() in ("1", "true", "on"))
+
+
+def is_tracing_active() -> bool:
+    """True when spans are being recorded in this context"""
+    _ensure_configured()
+    return _current_run.get() is not None or bool(_exporters) or _otel_bridge is not None
+
+
+def _start_span(name: str, attributes: Dict[str, Any], parent: Optional[Span]) -> Span:
+    run = _current_run.get()
+    trace_id = run.trace_id if run else (
+        parent.trace_id if parent else uuid.uuid4().hex)
+    new_span = Span(name, trace_id, parent, attributes)
+    if _otel_bridge is not None:
+        _otel_bridge.start(new_span, parent)
+    return new_span
+
+
+def _end_span(finished: Span, run: Optional[TraceRun]) -> None:
+    if run is not None:
+        run.add(finished)
+    if _otel_bridge is not None:
+        _otel_bridge.end(finished)
+    for exporter in _exporters:
+        exporter.export(finished)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed block as a span named name with the given attributes"""
+    if not is_tracing_active():
+        yield _NULL_SPAN
+        return
+
+    parent = _current_span.get()
+    current = _start_span(name, attributes, parent)
+    token = _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A generator closed from another context (e.g. garbage collected)
+            pass
+        current.finish(error)
+        _end_span(current, _current_run.get())
+
+
+@contextmanager
+def trace_run(name: str, **attributes):
+    """Collect every span recorded inside the block into a TraceRun"""
+    run = TraceRun(name)
+    token = _current_run.set(run)
+    try:
+        with span(name, **attributes):
+            yield run
+    finally:
+        _current_run.reset(token)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that records each runnable step as a span.
+
+    Attach it to a chain with chain.with_config(callbacks=[...]); prompt
+    formatting, the model call (with token usage) and output parsing then show
+    up as children of the enclosing span.
+    """
+
+    # Run in the caller's context so contextvars (current span/run) are visible
+    run_inline = True
+
+    def __init__(self):
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, name, attributes):
+        if not is_tracing_active():
+            return
+        parent = _current_span.get()
+        with self._lock:
+            parent_entry = self._open.get(attributes.pop("_parent_run_id", None))
+        if parent_entry is not None:
+            parent = parent_entry[0]
+        started = _start_span(name, attributes, parent)
+        with self._lock:
+            self._open[run_id] = (started, _current_run.get())
+
+    def _end(self, run_id, error=None, **attributes):
+        with self._lock:
+            entry = self._open.pop(run_id, None)
+        if entry is None:
+            return
+        finished, run = entry
+        for key, value in attributes.items():
+            finished.set_attribute(key, value)
+        finished.finish(error)
+        _end_span(finished, run)
+
+    @staticmethod
+    def _name(serialized, kwargs, default):
+        name = kwargs.get("name")
+        if not name and serialized:
+            name = serialized.get("name") or (serialized.get("id") or [None])[-1]
+        return name or default
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = self._name(serialized, kwargs, "chain")
+        self._start(run_id, f"langchain.{name}", {"_parent_run_id": parent_run_id})
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        invocation = kwargs.get("invocation_params") or {}
+        model = invocation.get("model") or invocation.get("model_name")
+        self._start(run_id, "llm.call", {"_parent_run_id": parent_run_id, "model": model})
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, "llm.call", {"_parent_run_id": parent_run_id})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        try:
+            message = response.generations[0][0].message
+            usage = getattr(message, "usage_metadata", None) or {}
+        except (AttributeError, IndexError):
+            pass
+        self._end(run_id,
+                  input_tokens=usage.get("input_tokens"),
+                  output_tokens=usage.get("output_tokens"),
+                  total_tokens=usage.get("total_tokens"))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+_langchain_handler = TracingCallbackHandler()
+
+
+def get_langchain_tracer() -> TracingCallbackHandler:
+    """Return the shared LangChain callback handler"""
+    return _langchain_handler
+
+
+def summarize_breakdown(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate span dicts by name: count, total duration and token counts"""
+    totals = {}
+    for item in spans:
+        entry = totals.setdefault(item["name"], {
+            "name": item["name"], "count": 0, "total_ms": 0.0,
+            "input_tokens": 0, "output_tokens": 0})
+        entry["count"] += 1
+        entry["total_ms"] += item["duration_ms"] or 0.0
+        entry["input_tokens"] += item["attributes"].get("input_tokens") or 0
+        entry["output_tokens"] += item["attributes"].get("output_tokens") or 0
+    return sorted(totals.values(), key=lambda e: e["total_ms"], reverse=True)
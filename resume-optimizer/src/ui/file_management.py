@@ -2,7 +2,8 @@
 File management UI components
 """
 import streamlit as st
-from src.file_manager import list_saved_files, load_saved_file
+from src.bulk_render import render_optimization_files
+from src.file_manager import count_saved_files, list_saved_files, load_saved_file, query_saved_files, record_artifact_source
 from src.resume_generator import ResumeGenerator
 
 
@@ -24,19 +25,52 @@ def render_saved_files_section():
     _render_summary_statistics()
 
 
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+
+def _render_pagination_controls(file_type, total):
+    """Render sort and page controls; returns (limit, offset, newest_first)"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_order = st.selectbox(
+            "Sort by", ["Newest first", "Oldest first"], key=f"{file_type}_sort")
+    with col2:
+        page_size = st.selectbox(
+            "Per page", PAGE_SIZE_OPTIONS, key=f"{file_type}_page_size")
+
+    total_pages = max(1, -(-total // page_size))
+    with col3:
+        page = st.number_input(
+            f"Page (of {total_pages})", min_value=1, max_value=total_pages,
+            value=1, step=1, key=f"{file_type}_page")
+
+    return page_size, (int(page) - 1) * page_size, sort_order == "Newest first"
+
+
+def _file_label(row):
+    """Expander label built from index metadata, without opening the file"""
+    details = [row["generated_at"] or ""]
+    if row["keywords_count"] is not None:
+        details.append(f"{row['keywords_count']} keywords")
+    return f"📄 {row['filename']} · {' · '.join(d for d in details if d)}"
+
+
 def _render_job_analysis_files():
     """Render job analysis files section"""
     st.subheader("Job Analysis Results")
     try:
-        saved_files = list_saved_files("job_analysis")
-        job_analysis_files = saved_files.get("job_analysis", [])
-
-        if job_analysis_files:
-            st.write(
-                f"Found {len(job_analysis_files)} saved job analysis files:")
-            for i, filename in enumerate(sorted(job_analysis_files, reverse=True)):
-                with st.expander(f"📄 {filename}", expanded=False):
-                    if st.button(f"Show Details", key=f"job_analysis_{i}"):
+        total = count_saved_files("job_analysis")["job_analysis"]
+
+        if total:
+            st.write(f"Found {total} saved job analysis files:")
+            limit, offset, newest_first = _render_pagination_controls(
+                "job_analysis", total)
+            rows = query_saved_files(
+                "job_analysis", newest_first=newest_first, limit=limit, offset=offset)
+            for row in rows:
+                filename = row["filename"]
+                with st.expander(_file_label(row), expanded=False):
+                    if st.button(f"Show Details", key=f"job_analysis_{filename}"):
                         _show_job_analysis_details(filename)
         else:
             st.info(
@@ -49,18 +83,21 @@ def _render_resume_optimization_files():
     """Render resume optimization files section"""
     st.subheader("Resume Optimization Results")
     try:
-        saved_files = list_saved_files("resume_optimization")
-        resume_opt_files = saved_files.get("resume_optimization", [])
+        total = count_saved_files("resume_optimization")["resume_optimization"]
 
-        if resume_opt_files:
+        if total:
             st.write(
-                f"Found {len(resume_opt_files)} saved resume optimization files:")
-            for i, filename in enumerate(sorted(resume_opt_files, reverse=True)):
-                with st.expander(f"📄 {filename}", expanded=False):
-                    _render_optimization_file_actions(filename, i)
+                f"Found {total} saved resume optimization files:")
+            limit, offset, newest_first = _render_pagination_controls(
+                "resume_optimization", total)
+            rows = query_saved_files(
+                "resume_optimization", newest_first=newest_first, limit=limit, offset=offset)
+            for row in rows:
+                with st.expander(_file_label(row), expanded=False):
+                    _render_optimization_file_actions(row["filename"])
 
             # Add bulk PDF generation option
-            _render_bulk_pdf_generation(resume_opt_files)
+            _render_bulk_pdf_generation(total)
         else:
             st.info(
                 "No resume optimization files found. Run a resume optimization to create your first file!")
@@ -87,20 +124,20 @@ def _show_job_analysis_details(filename):
         st.error(f"Error loading file: {e}")
 
 
-def _render_optimization_file_actions(filename, index):
+def _render_optimization_file_actions(filename):
     """Render actions for optimization files"""
     col1, col2, col3 = st.columns([2, 1, 1])
 
     with col1:
-        if st.button(f"Show Details", key=f"resume_opt_{index}"):
+        if st.button(f"Show Details", key=f"resume_opt_{filename}"):
             _show_optimization_details(filename)
 
     with col2:
-        if st.button(f"📄 Generate PDF", key=f"generate_pdf_{index}"):
+        if st.button(f"📄 Generate PDF", key=f"generate_pdf_{filename}"):
             _generate_pdf_from_file(filename)
 
     with col3:
-        if st.button(f"🔄 Load & Use", key=f"load_use_{index}"):
+        if st.button(f"🔄 Load & Use", key=f"load_use_{filename}"):
             _load_and_use_optimization(filename)
 
 
@@ -153,6 +190,7 @@ def _generate_pdf_from_file(filename):
 
             # Create PDF
             pdf_path = resume_generator.create_pdf(updated_resume_html)
+            record_artifact_source(pdf_path, filename)
 
             # Provide download link
             with open(pdf_path, "rb") as pdf_file:
@@ -186,34 +224,26 @@ def _load_and_use_optimization(filename):
         st.error(f"Error loading optimization: {e}")
 
 
-def _render_bulk_pdf_generation(resume_opt_files):
+def _render_bulk_pdf_generation(total_files):
     """Render bulk PDF generation section"""
     st.subheader("🚀 Bulk PDF Generation")
     st.info("Generate PDFs from multiple optimization files at once.")
 
-    if st.button("📄 Generate PDFs from All Optimization Files"):
+    if st.button(f"📄 Generate PDFs from All {total_files} Optimization Files"):
+        resume_opt_files = list_saved_files(
+            "resume_optimization").get("resume_optimization", [])
         progress_bar = st.progress(0)
         status_text = st.empty()
-        success_count = 0
-
-        for i, filename in enumerate(resume_opt_files):
-            try:
-                status_text.text(f"Processing {filename}...")
-                progress_bar.progress((i + 1) / len(resume_opt_files))
-
-                file_data = load_saved_file("resume_optimization", filename)
-                optimization_result = file_data["output"]["optimization_result"]
-
-                # Generate HTML resume and PDF
-                resume_generator = ResumeGenerator()
-                updated_resume_html = resume_generator.generate_updated_resume(
-                    optimization_result)
-                pdf_path = resume_generator.create_pdf(updated_resume_html)
 
-                success_count += 1
+        def _on_progress(completed, total, entry):
+            progress_bar.progress(completed / total)
+            status_text.text(f"Processed {entry['filename']} ({completed}/{total})")
+            if entry["status"] == "error":
+                st.error(f"Error processing {entry['filename']}: {entry['error']}")
 
-            except Exception as e:
-                st.error(f"Error processing {filename}: {e}")
+        results = render_optimization_files(
+            resume_opt_files, progress_callback=_on_progress)
+        success_count = sum(1 for entry in results if entry["status"] == "ok")
 
         status_text.text("Bulk PDF generation complete!")
         st.success(
@@ -225,9 +255,9 @@ def _render_summary_statistics():
     """Render summary statistics"""
     st.subheader("📈 Summary Statistics")
     try:
-        all_files = list_saved_files("all")
-        total_job_analysis = len(all_files.get("job_analysis", []))
-        total_resume_opt = len(all_files.get("resume_optimization", []))
+        counts = count_saved_files("all")
+        total_job_analysis = counts.get("job_analysis", 0)
+        total_resume_opt = counts.get("resume_optimization", 0)
 
         col1, col2, col3 = st.columns(3)
         with col1:
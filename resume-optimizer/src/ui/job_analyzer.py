@@ -1,10 +1,15 @@
 """
 Job Description Analyzer UI components
 """
+import os
 import streamlit as st
-from src.chains import get_analyzer_chain, get_rewriter_chain
-from src.file_manager import save_job_analysis_result, save_resume_optimization_result
-from src.resume_generator import ResumeGenerator
+from src.chains import get_analyzer_chain
+from src.file_manager import find_job_analysis, save_job_analysis_result
+from src.job_queue import get_job_runner
+from src.pipeline import extract_rewrite_keywords
+from src.response_cache import is_cache_enabled
+from src.tracing import summarize_breakdown
+from src.ui.resume_optimizer import create_section_placeholders, render_streamed_section
 
 
 def render_job_analyzer():
@@ -31,111 +36,181 @@ def render_job_analyzer():
             else:
                 st.warning("Please paste a job description first.")
 
+    _render_pipeline_jobs()
     _render_keywords_usage_section()
 
 
+JOB_POLL_SECONDS = 2
+
+
 def _streamlined_workflow(job_description):
-    """Complete streamlined workflow: analyze job description, optimize resume, and generate PDF"""
+    """Queue the streamlined workflow (analyze, optimize, PDF) as a background job"""
     try:
-        # Step 1: Analyze job description
-        with st.spinner("Step 1/4: Analyzing job description..."):
-            analyzer_chain = get_analyzer_chain()
-            analysis_result = analyzer_chain.invoke(
-                {"job_description": job_description})
-            st.session_state['analyzed_keywords'] = analysis_result
-
-            # Save the analysis result
-            try:
-                saved_analysis_path = save_job_analysis_result(
-                    job_description, analysis_result)
-                st.success(
-                    f"✅ Job analysis saved to: {saved_analysis_path.split('/')[-1]}")
-            except Exception as e:
-                st.warning(f"Analysis completed but couldn't save file: {e}")
-
-        # Step 2: Extract keywords for rewrite
-        with st.spinner("Step 2/4: Extracting keywords..."):
-            keywords = []
-            for key in ['technical_skills', 'technologies_and_tools', 'soft_skills']:
-                keywords += analysis_result.get(key, [])
-            st.session_state['keywords_for_rewrite'] = keywords
-
-            st.info(
-                f"📋 Extracted {len(keywords)} keywords from job description")
-
-        # Step 3: Optimize resume with keywords
-        with st.spinner("Step 3/4: Optimizing resume with extracted keywords..."):
-            rewriter_chain = get_rewriter_chain()
-            with open("resume-optimizer/src/docs/resume.md", "r", encoding="utf-8") as file:
-                resume_text = file.read()
-
-            optimization_result = rewriter_chain.invoke({
-                "keywords_to_integrate": keywords,
-                "original_resume_text": resume_text
-            })
-
-            st.session_state['last_optimization_result'] = optimization_result
-
-            # Save the optimization result
-            try:
-                saved_optimization_path = save_resume_optimization_result(
-                    keywords, resume_text, optimization_result, "streamlined_workflow"
-                )
-                st.success(
-                    f"✅ Resume optimization saved to: {saved_optimization_path.split('/')[-1]}")
-            except Exception as e:
-                st.warning(
-                    f"Optimization completed but couldn't save file: {e}")
-
-        # Step 4: Generate updated resume PDF
-        with st.spinner("Step 4/4: Generating updated resume PDF..."):
-            resume_generator = ResumeGenerator()
-            updated_resume_html = resume_generator.generate_updated_resume(
-                optimization_result)
-            pdf_path = resume_generator.create_pdf(updated_resume_html)
-
-            # Store PDF path for download
-            st.session_state['streamlined_pdf_path'] = pdf_path
-            st.success(f"✅ PDF generated: {pdf_path.split('/')[-1]}")
-
-        # Display results
+        job_id = get_job_runner().submit(
+            job_description, owner=st.session_state['session_id'],
+            source_type="streamlined_workflow")
+    except Exception as e:
+        st.error(f"❌ Error in streamlined workflow: {e}")
+        return
+
+    st.session_state['pipeline_jobs'].insert(0, job_id)
+    st.info(f"🕒 Queued job {job_id[:8]}. You can keep using the page while it runs.")
+
+
+def _render_pipeline_jobs():
+    """Show this session's background jobs, polling while any are still active"""
+    job_ids = st.session_state['pipeline_jobs']
+    if not job_ids:
+        return
+
+    runner = get_job_runner()
+    jobs = [job for job in (runner.get(job_id) for job_id in job_ids) if job]
+    if any(job["status"] in ("queued", "running") for job in jobs):
+        _poll_pipeline_jobs()
+    else:
+        _render_job_list(jobs)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _poll_pipeline_jobs():
+    """Re-render the job list every few seconds without rerunning the whole page"""
+    runner = get_job_runner()
+    jobs = [job for job in (runner.get(job_id) for job_id in st.session_state['pipeline_jobs']) if job]
+    _render_job_list(jobs)
+    if not any(job["status"] in ("queued", "running") for job in jobs):
+        # Everything finished: rerun the page so the results feed the rest of the UI
+        st.rerun(scope="app")
+
+
+def _render_job_list(jobs):
+    st.subheader("🗂️ Optimization Jobs")
+    for job in jobs:
+        short_id = job["job_id"][:8]
+        if job["status"] == "queued":
+            st.info(f"🕒 Job {short_id}: waiting for a free worker...")
+        elif job["status"] == "running":
+            _render_running_job(job, short_id)
+        elif job["status"] == "failed":
+            st.error(f"❌ Job {short_id} failed: {job['error']}")
+            st.error(
+                "Please try using the individual steps if the streamlined process fails.")
+        else:
+            _apply_job_result(job)
+            with st.expander(f"✅ Job {short_id} complete", expanded=job is jobs[0]):
+                _render_streamlined_result(job["result"], key_suffix=short_id)
+
+
+def _render_running_job(job, short_id):
+    step, total = job["progress_step"], job["progress_total"]
+    st.progress(step / total if total else 0.0,
+                text=f"Job {short_id} - Step {step}/{total}: {job['progress_message'] or 'Starting...'}")
+    if job["partial_result"]:
+        # Show rewritten sections as they stream in
+        placeholders = create_section_placeholders()
+        for section, value in job["partial_result"].items():
+            render_streamed_section(placeholders, section, value)
+
+
+def _apply_job_result(job):
+    """Copy a finished job's results into the session once, like a foreground run did"""
+    applied = st.session_state['applied_pipeline_jobs']
+    if job["job_id"] in applied:
+        return
+    applied.add(job["job_id"])
+    result = job["result"]
+    st.session_state['analyzed_keywords'] = result["analysis_result"]
+    st.session_state['keywords_for_rewrite'] = result["keywords"]
+    st.session_state['last_optimization_result'] = result["optimization_result"]
+    # Store PDF path for download
+    st.session_state['streamlined_pdf_path'] = result["pdf_path"]
+
+
+def _render_streamlined_result(result, key_suffix):
+    """Render the outcome of a finished streamlined workflow run"""
+    analysis_result = result["analysis_result"]
+    keywords = result["keywords"]
+    optimization_result = result["optimization_result"]
+    pdf_path = result["pdf_path"]
+    # None when the analysis or optimization could not be saved (see warnings)
+    saved_analysis_path = result["saved_analysis_path"]
+    saved_optimization_path = result["saved_optimization_path"]
+
+    if result["analysis_reused"]:
+        message = "♻️ Reused the saved analysis of this job description"
+        st.info(f"{message}: {os.path.basename(saved_analysis_path)}"
+                if saved_analysis_path else message)
+    elif saved_analysis_path:
+        st.success(
+            f"✅ Job analysis saved to: {os.path.basename(saved_analysis_path)}")
+    st.info(f"📋 Extracted {len(keywords)} keywords from job description")
+    if saved_optimization_path:
         st.success(
-            "🎉 **Complete! Your resume has been optimized and PDF generated.**")
+            f"✅ Resume optimization saved to: {os.path.basename(saved_optimization_path)}")
+    for warning in result["warnings"]:
+        st.warning(warning)
+    st.success(f"✅ PDF generated: {os.path.basename(pdf_path)}")
 
-        # Show download button
-        try:
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_data = pdf_file.read()
-
-            st.download_button(
-                label="📥 Download Optimized Resume PDF",
-                data=pdf_data,
-                file_name=f"optimized_resume_streamlined.pdf",
-                mime="application/pdf",
-                key="download_streamlined_pdf"
-            )
-        except Exception as e:
-            st.error(f"Error preparing PDF download: {e}")
+    # Display results
+    st.success(
+        "🎉 **Complete! Your resume has been optimized and PDF generated.**")
 
-        # Show summary of what was done
-        with st.expander("📊 View Optimization Summary"):
-            st.subheader("Job Analysis Results")
-            st.json(analysis_result)
+    # Show download button
+    try:
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_data = pdf_file.read()
+
+        st.download_button(
+            label="📥 Download Optimized Resume PDF",
+            data=pdf_data,
+            file_name=f"optimized_resume_streamlined.pdf",
+            mime="application/pdf",
+            key=f"download_streamlined_pdf_{key_suffix}"
+        )
+    except Exception as e:
+        st.error(f"Error preparing PDF download: {e}")
 
-            st.subheader("Keywords Used for Optimization")
-            st.write(", ".join(keywords))
+    # Show summary of what was done
+    with st.popover("📊 View Optimization Summary"):
+        st.subheader("Job Analysis Results")
+        st.json(analysis_result)
 
-            st.subheader("Optimized Resume Content")
-            st.json(optimization_result)
+        st.subheader("Keywords Used for Optimization")
+        st.write(", ".join(keywords))
 
-    except Exception as e:
-        st.error(f"❌ Error in streamlined workflow: {e}")
-        st.error(
-            "Please try using the individual steps if the streamlined process fails.")
+        st.subheader("Optimized Resume Content")
+        st.json(optimization_result)
+
+    _render_timing_breakdown(result["trace"])
+
+
+def _render_timing_breakdown(spans):
+    """Show where the time of a streamlined run went, per stage"""
+    with st.popover("⏱️ Timing Breakdown"):
+        rows = [
+            {
+                "Stage": entry["name"],
+                "Calls": entry["count"],
+                "Total (ms)": round(entry["total_ms"], 1),
+                "Input tokens": entry["input_tokens"],
+                "Output tokens": entry["output_tokens"],
+            }
+            for entry in summarize_breakdown(spans)
+        ]
+        st.dataframe(rows, width="stretch", hide_index=True)
 
 
 def _analyze_job_description(job_description):
     """Analyze job description and save results"""
+    reuse = is_cache_enabled()
+    existing = find_job_analysis(job_description) if reuse else None
+    if existing:
+        st.info(
+            f"♻️ This job description was already analyzed: {existing['file_path'].split('/')[-1]}")
+        st.subheader("Analysis Result")
+        st.json(existing["analysis_result"])
+        st.session_state['analyzed_keywords'] = existing["analysis_result"]
+        return
+
     with st.spinner("Analyzing job description..."):
         chain = get_analyzer_chain()
         result = chain.invoke({"job_description": job_description})
@@ -145,7 +220,7 @@ def _analyze_job_description(job_description):
 
         # Save the analysis result
         try:
-            saved_file_path = save_job_analysis_result(job_description, result)
+            saved_file_path = save_job_analysis_result(job_description, result, dedupe=reuse)
             st.success(
                 f"✅ Analysis saved to: {saved_file_path.split('/')[-1]}")
         except Exception as e:
@@ -157,9 +232,8 @@ def _render_keywords_usage_section():
     if st.session_state['analyzed_keywords']:
         if st.button("Use These Keywords for Resume Rewrite"):
             # Flatten all keywords into a single list
-            keywords = []
-            for key in ['technical_skills', 'technologies_and_tools', 'soft_skills']:
-                keywords += st.session_state['analyzed_keywords'].get(key, [])
+            keywords = extract_rewrite_keywords(
+                st.session_state['analyzed_keywords'])
             st.session_state['keywords_for_rewrite'] = keywords
             st.success("Keywords loaded for resume rewrite!")
 
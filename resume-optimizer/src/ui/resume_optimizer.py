@@ -3,9 +3,10 @@ Resume optimization UI components
 """
 import streamlit as st
 from src.chains import get_rewriter_chain
-from src.file_manager import save_resume_optimization_result
+from src.file_manager import record_artifact_source, save_resume_optimization_result
 from src.parsers import JobDescriptionKeywords
 from src.resume_generator import ResumeGenerator
+from src.streaming import RESUME_SECTIONS, stream_rewriter_sections
 
 
 def render_resume_optimizer(keywords_for_rewrite):
@@ -33,6 +34,26 @@ def render_resume_optimizer(keywords_for_rewrite):
             st.error(f"Error preparing PDF download: {e}")
 
 
+def create_section_placeholders():
+    """Create one placeholder per resume section, in display order"""
+    return {section: st.empty() for section in RESUME_SECTIONS}
+
+
+def render_streamed_section(placeholders, section, value):
+    """Render a completed rewriter section into its placeholder"""
+    placeholder = placeholders.get(section)
+    if placeholder is None:
+        placeholder = placeholders[section] = st.empty()
+
+    with placeholder.container():
+        st.write(f"**{section.replace('_', ' ').title()}:**")
+        if isinstance(value, list):
+            for bullet in value:
+                st.write(f"• {bullet}")
+        else:
+            st.write(value)
+
+
 def render_example_section():
     """Render the example usage section"""
     st.header("🧑‍💻 Example: Resume Rewriter with Example Keywords")
@@ -69,15 +90,19 @@ def _process_resume_with_keywords(keywords_list, source_type):
             with open("resume-optimizer/src/docs/resume.md", "r", encoding="utf-8") as file:
                 resume_text = file.read()
 
-            result = rewriter_chain.invoke({
-                "keywords_to_integrate": keywords_list,
-                "original_resume_text": resume_text
-            })
-
             st.subheader("🎯 Keywords Used")
             st.write(", ".join(keywords_list))
             st.subheader("📝 Optimized Resume Content")
-            st.json(result)
+
+            # Stream the rewrite so each section shows up as soon as it is complete
+            placeholders = create_section_placeholders()
+            result = {}
+            for section, value in stream_rewriter_sections(rewriter_chain, {
+                "keywords_to_integrate": keywords_list,
+                "original_resume_text": resume_text
+            }):
+                result[section] = value
+                render_streamed_section(placeholders, section, value)
 
             # Store the result for resume generation
             st.session_state['last_optimization_result'] = result
@@ -96,6 +121,7 @@ def _process_resume_with_keywords(keywords_list, source_type):
                 saved_file_path = save_resume_optimization_result(
                     keywords_list, resume_text, result, source_type
                 )
+                record_artifact_source(pdf_path, saved_file_path)
                 st.success(
                     f"✅ Optimization and PDF saved! JSON: {saved_file_path.split('/')[-1]}")
                 st.success(f"✅ PDF saved to: {pdf_path.split('/')[-1]}")
@@ -160,6 +186,7 @@ def _run_example_optimization():
                 saved_file_path = save_resume_optimization_result(
                     all_keywords, resume_text, result, "example"
                 )
+                record_artifact_source(pdf_path, saved_file_path)
                 st.success(
                     f"✅ Example optimization and PDF saved! JSON: {saved_file_path.split('/')[-1]}")
                 st.success(f"✅ PDF saved to: {pdf_path.split('/')[-1]}")
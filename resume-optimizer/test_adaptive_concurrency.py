@@ -0,0 +1,171 @@
+# Test the AIMD adaptive concurrency limiter
+
+import asyncio
+import time
+
+import pytest
+
+from src import pipeline
+from src.adaptive_concurrency import AdaptiveConcurrencyLimiter, is_timeout_error
+
+
+class ResourceExhausted(Exception):
+    """Named like the Google API's 429 error"""
+
+
+def make_limiter(**kwargs):
+    kwargs.setdefault("initial_limit", 4)
+    return AdaptiveConcurrencyLimiter(name="test", **kwargs)
+
+
+def test_successes_raise_the_limit_by_about_one_per_round():
+    limiter = make_limiter()
+    for _ in range(4):
+        limiter._record("success", 1.0, time.monotonic())
+    assert limiter.limit == 4  # 4 + 4 * (1/limit) is just short of 5
+    limiter._record("success", 1.0, time.monotonic())
+    assert limiter.limit == 5
+    assert limiter.history[-1][1] == 5
+
+
+def test_throttling_cuts_the_limit_once_per_round():
+    limiter = make_limiter(initial_limit=16)
+    round_started = time.monotonic()
+    for _ in range(3):
+        limiter._record("throttled", 1.0, round_started)
+    assert limiter.limit == 8
+    # A call admitted after the cut counts as new congestion
+    limiter._record("timeout", 1.0, time.monotonic() + 1)
+    assert limiter.limit == 4
+    assert limiter.counts["throttled"] == 3 and limiter.counts["timeout"] == 1
+
+
+def test_limit_stays_within_bounds():
+    limiter = make_limiter(initial_limit=2, min_limit=2, max_limit=3)
+    for n in range(3):
+        limiter._record("throttled", 1.0, time.monotonic() + n)
+    assert limiter.limit == 2
+    for _ in range(20):
+        limiter._record("success", 1.0, time.monotonic())
+    assert limiter.limit == 3
+
+
+def test_slow_completions_and_errors_hold_the_limit():
+    limiter = make_limiter(latency_tolerance=2.0, max_error_rate=0.2, window=5)
+    limiter._record("success", 1.0, time.monotonic())
+    after_first = limiter._limit
+    limiter._record("success", 10.0, time.monotonic())
+    assert limiter._limit == after_first
+
+    for _ in range(2):
+        limiter._record("error", 1.0, time.monotonic())
+    limiter._record("success", 1.0, time.monotonic())
+    # 2 errors out of the last 4 outcomes is above max_error_rate
+    assert limiter._limit == after_first
+
+
+def test_run_never_exceeds_the_limit():
+    limiter = make_limiter(initial_limit=2, max_limit=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(*(limiter.run(call) for _ in range(8)))
+
+    assert asyncio.run(main()) == ["ok"] * 8
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.counts["success"] == 8
+
+
+def test_run_classifies_failures():
+    limiter = make_limiter(initial_limit=8)
+
+    async def throttled():
+        raise ResourceExhausted("429 quota exceeded")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def broken():
+        raise ValueError("bad output")
+
+    async def main():
+        with pytest.raises(ResourceExhausted):
+            await limiter.run(throttled)
+        with pytest.raises(asyncio.TimeoutError):
+            await limiter.run(slow, timeout=0.01)
+        with pytest.raises(ValueError):
+            await limiter.run(broken)
+
+    asyncio.run(main())
+    assert limiter.counts == {"success": 0, "throttled": 1, "timeout": 1, "error": 1}
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = make_limiter(initial_limit=1, max_limit=1)
+
+    async def main():
+        release = asyncio.Event()
+        holder = asyncio.create_task(limiter.run(release.wait))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(limiter.run(lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["waiting"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.snapshot()["waiting"] == 0
+        release.set()
+        await holder
+        # The freed slot is usable straight away
+        await asyncio.wait_for(limiter.run(lambda: asyncio.sleep(0)), 1)
+
+    asyncio.run(main())
+    assert limiter.in_flight == 0
+
+
+def test_is_timeout_error():
+    assert is_timeout_error(asyncio.TimeoutError())
+    assert is_timeout_error(Exception("504 Deadline Exceeded: DEADLINE_EXCEEDED"))
+    assert not is_timeout_error(ValueError("bad output"))
+
+
+def test_pipeline_batch_limits_only_the_model_calls(workdir, monkeypatch):
+    limiter = make_limiter(initial_limit=2)
+    in_flight_while_rendering = []
+
+    class StubChain:
+        def __init__(self, result):
+            self.result = result
+
+        async def ainvoke(self, inputs, config=None, **kwargs):
+            await asyncio.sleep(0.01)
+            return self.result
+
+    def slow_render(optimization_result, pdf_output_path, html_output_path):
+        in_flight_while_rendering.append(limiter.in_flight)
+        time.sleep(0.2)
+        return {"html": "<html></html>", "pdf_path": pdf_output_path}
+
+    monkeypatch.setattr(pipeline, "get_analyzer_chain",
+                        lambda: StubChain({"technical_skills": ["Python"]}))
+    monkeypatch.setattr(pipeline, "get_rewriter_chain", lambda: StubChain({"summary": "Engineer"}))
+    monkeypatch.setattr(pipeline, "_read_text", lambda path: "resume")
+    monkeypatch.setattr(pipeline, "_render_pdf", slow_render)
+
+    items = [{"id": "one", "job_description": "Python developer"}]
+    results = asyncio.run(pipeline.run_pipeline_batch(items, output_dir="out", limiter=limiter))
+
+    assert results[0]["status"] == "ok"
+    # The analyzer and rewriter calls; the PDF render holds no slot and adds no latency
+    assert limiter.counts["success"] == 2
+    assert in_flight_while_rendering == [0]
+    assert limiter._baseline_latency < 0.2
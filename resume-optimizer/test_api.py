@@ -0,0 +1,51 @@
+# Test the HTTP API
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+ANALYSIS = {"technical_skills": ["Python"], "technologies_and_tools": ["AWS"], "soft_skills": [],
+            "certifications": [], "other_requirements": []}
+
+
+class StubChain:
+    def __init__(self, result):
+        self.result = result
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        return self.result
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Without entering the client, the lifespan (chains, render pool) is not started
+    monkeypatch.setattr(api, "get_analyzer_chain", lambda: StubChain(ANALYSIS))
+    return TestClient(api.app)
+
+
+def test_save_failure_returns_result_with_warning(client, monkeypatch):
+    def failing_save(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(api, "save_job_analysis_result", failing_save)
+    response = client.post("/analyze", json={"job_description": "Python developer", "reuse": False})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["keywords"] == ["Python", "AWS"]
+    assert body["saved_path"] is None
+    assert "No space left on device" in body["warnings"][0]
+
+
+@pytest.mark.parametrize("filename, fallback, encoded", [
+    ("my resume.pdf", "my_resume.pdf", "my%20resume.pdf"),
+    ("../../etc/passwd", "passwd.pdf", "passwd.pdf"),
+    ('evil".pdf\r\nX-Injected: 1', "evil.pdfX-Injected__1.pdf", "evil.pdfX-Injected%3A%201.pdf"),
+    ("Résumé.pdf", "R_sum_.pdf", "R%C3%A9sum%C3%A9.pdf"),
+    ("..", "resume.pdf", "resume.pdf"),
+])
+def test_content_disposition_is_sanitized(filename, fallback, encoded):
+    header = api._content_disposition(filename)
+    assert header == f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{encoded}"
+    assert "\r" not in header and "\n" not in header
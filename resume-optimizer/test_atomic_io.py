@@ -0,0 +1,131 @@
+# Test crash-safe writes and group commits
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src import atomic_io
+from src.atomic_io import GroupCommit, atomic_write_json
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def temp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_atomic_write_json_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / "out" / "record.json")
+    atomic_write_json(path, {"a": 1})
+    atomic_write_json(path, {"a": 2})
+    assert read_json(path) == {"a": 2}
+    assert temp_files(tmp_path / "out") == []
+
+
+def test_staged_files_appear_on_commit(tmp_path):
+    committer = GroupCommit(max_pending=10, max_delay=None)
+    committed = []
+    path = str(tmp_path / "record.json")
+    committer.stage_json(path, {"a": 1}, on_commit=lambda: committed.append(path))
+    assert not os.path.exists(path)
+
+    assert committer.commit() == {"files": 1, "tracked": 0}
+    assert read_json(path) == {"a": 1}
+    assert committed == [path]
+    assert committer.commits == 1
+
+
+def test_failed_commit_requeues_and_raises(tmp_path, monkeypatch):
+    committer = GroupCommit(max_pending=10, max_delay=None)
+    paths = [str(tmp_path / f"record_{i}.json") for i in range(3)]
+    for i, path in enumerate(paths):
+        committer.stage_json(path, {"i": i})
+
+    real_replace = os.replace
+
+    def flaky_replace(src, dst):
+        if dst == paths[1]:
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(atomic_io.os, "replace", flaky_replace)
+    with pytest.raises(OSError, match="disk full"):
+        committer.commit()
+    assert os.path.exists(paths[0]) and os.path.exists(paths[2])
+    assert not os.path.exists(paths[1])
+
+    monkeypatch.setattr(atomic_io.os, "replace", real_replace)
+    assert committer.commit()["files"] == 1
+    assert read_json(paths[1]) == {"i": 1}
+    assert temp_files(tmp_path) == []
+
+
+def test_close_discards_uncommittable_writes(tmp_path, monkeypatch):
+    committer = GroupCommit(max_pending=10, max_delay=None)
+    committer.stage_json(str(tmp_path / "record.json"), {"a": 1})
+
+    def failing_replace(src, dst):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(atomic_io.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        committer.close()
+    assert temp_files(tmp_path) == []
+
+
+def test_missing_tracked_file_is_skipped(tmp_path):
+    committer = GroupCommit(max_delay=None)
+    segment = tmp_path / "segment.jsonl"
+    segment.write_text("{}\n")
+    committer.track(str(segment))
+    os.remove(segment)
+    assert committer.commit() == {"files": 0, "tracked": 1}
+
+
+def test_background_callback_error_is_raised_in_caller(tmp_path):
+    committer = GroupCommit(max_pending=10, max_delay=0.01)
+
+    def failing_callback():
+        raise RuntimeError("index unavailable")
+
+    path = str(tmp_path / "record.json")
+    committer.stage_json(path, {"a": 1}, on_commit=failing_callback)
+    deadline = time.time() + 5
+    while not os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.01)
+    assert os.path.exists(path)
+    with pytest.raises(RuntimeError, match="index unavailable"):
+        committer.close()
+
+
+def test_close_waits_for_a_running_background_commit(tmp_path, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+    fsync_path = atomic_io.fsync_path
+
+    def slow_fsync(path):
+        entered.set()
+        release.wait(5)
+        fsync_path(path)
+
+    monkeypatch.setattr(atomic_io, "fsync_path", slow_fsync)
+    committer = GroupCommit(max_pending=10, max_delay=0.01)
+    committed = []
+    path = str(tmp_path / "record.json")
+    committer.stage_json(path, {"a": 1}, on_commit=lambda: committed.append(path))
+    assert entered.wait(5)  # The timer's commit is now in progress
+
+    closed = threading.Event()
+    closer = threading.Thread(target=lambda: (committer.close(), closed.set()))
+    closer.start()
+    assert not closed.wait(0.1)
+    release.set()
+    closer.join(5)
+    assert closed.is_set()
+    assert read_json(path) == {"a": 1}
+    assert committed == [path]
@@ -0,0 +1,24 @@
+# Test chain construction helpers
+
+from src.chains import _is_valid_rewrite
+from src.parsers import SECTION_MODELS
+
+REWRITE = {
+    "updated_summary": "Backend developer.",
+    "liberty_mutual_group": ["Built services."],
+    "inovace_technologies": [],
+    "spider_digital_commerce": [],
+    "echo_project": [],
+}
+
+
+def test_rewrites_with_empty_sections_are_valid():
+    # Leaving a section unchanged (empty) is a legitimate answer, not a failed call
+    assert _is_valid_rewrite(REWRITE)
+    assert _is_valid_rewrite({"echo_project": []}, SECTION_MODELS["echo_project"])
+
+
+def test_rewrites_that_break_the_schema_are_invalid():
+    assert not _is_valid_rewrite({**REWRITE, "liberty_mutual_group": "not a list"})
+    assert not _is_valid_rewrite({"liberty_mutual_group": []})
+    assert not _is_valid_rewrite(None)
@@ -0,0 +1,45 @@
+# Test the shared event loop used by synchronous callers
+
+import asyncio
+import threading
+
+import pytest
+
+from src.event_loop import get_background_loop, run_sync
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_calls_from_any_thread_share_one_loop():
+    loops = []
+
+    def call():
+        loops.append(run_sync(_current_loop()))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    loops.append(run_sync(_current_loop()))
+
+    assert {id(loop) for loop in loops} == {id(get_background_loop())}
+    assert not get_background_loop().is_closed()
+
+
+def test_exceptions_reach_the_caller():
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run_sync(fail())
+
+
+def test_calling_from_the_shared_loop_is_rejected():
+    async def nested():
+        return run_sync(_current_loop())
+
+    with pytest.raises(RuntimeError, match="shared event loop"):
+        run_sync(nested())
@@ -0,0 +1,137 @@
+# Test saved outputs and job analysis deduplication
+
+import asyncio
+import os
+import sqlite3
+import threading
+
+from src import batch, file_manager, output_index
+from src.file_manager import (
+    find_job_analysis,
+    group_commit,
+    list_saved_files,
+    save_job_analysis_result,
+)
+
+JOB_DESCRIPTION = "Senior Python Engineer\nBuild APIs with FastAPI and PostgreSQL."
+ANALYSIS = {"technical_skills": ["Python"], "technologies_and_tools": ["FastAPI"], "soft_skills": []}
+ANALYZER = "fake:analyzer-model:v1"
+
+
+def saved_analyses():
+    return list_saved_files("job_analysis")["job_analysis"]
+
+
+def test_fresh_results_are_always_saved_without_dedupe(workdir):
+    first = save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, analyzer_version=ANALYZER)
+    second = save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, analyzer_version=ANALYZER)
+    assert first != second
+    assert len(saved_analyses()) == 2
+    # The older file stays the one that is reused
+    assert find_job_analysis(JOB_DESCRIPTION, ANALYZER)["file_path"] == first
+
+
+def test_dedupe_returns_existing_analysis(workdir):
+    first = save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, analyzer_version=ANALYZER)
+    reformatted = "  senior python engineer build APIs with fastapi   and postgresql. "
+    assert save_job_analysis_result(
+        reformatted, ANALYSIS, dedupe=True, analyzer_version=ANALYZER) == first
+    assert len(saved_analyses()) == 1
+
+
+def test_other_analyzer_versions_are_not_reused(workdir):
+    save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, analyzer_version=ANALYZER)
+    assert find_job_analysis(JOB_DESCRIPTION, "fake:analyzer-model:v2") is None
+    save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, dedupe=True,
+                             analyzer_version="fake:analyzer-model:v2")
+    assert len(saved_analyses()) == 2
+
+
+def test_concurrent_dedupe_saves_keep_one_file(workdir):
+    paths = []
+    barrier = threading.Barrier(8)
+
+    def save():
+        barrier.wait()
+        paths.append(save_job_analysis_result(
+            JOB_DESCRIPTION, ANALYSIS, dedupe=True, analyzer_version=ANALYZER))
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 1
+    assert len(saved_analyses()) == 1
+
+
+def test_duplicates_in_one_group_commit_are_detected(workdir):
+    with group_commit(max_delay=None):
+        first = save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, dedupe=True,
+                                         analyzer_version=ANALYZER)
+        second = save_job_analysis_result(JOB_DESCRIPTION.upper(), ANALYSIS, dedupe=True,
+                                          analyzer_version=ANALYZER)
+        assert not os.path.exists(first)
+    assert first == second
+    assert os.path.exists(first)
+    assert len(saved_analyses()) == 1
+
+
+def test_existing_duplicate_hashes_are_migrated(workdir):
+    os.makedirs("resume-optimizer/outputs", exist_ok=True)
+    with sqlite3.connect(file_manager.INDEX_PATH) as conn:
+        conn.execute(
+            "CREATE TABLE outputs (file_type TEXT NOT NULL, filename TEXT NOT NULL, unique_id TEXT, "
+            "timestamp TEXT, generated_at TEXT, file_path TEXT NOT NULL, keywords_count INTEGER, "
+            "keywords_source TEXT, preview TEXT, segment_offset INTEGER, segment_length INTEGER, "
+            "content_hash TEXT, PRIMARY KEY (file_type, filename))")
+        conn.execute("CREATE INDEX idx_outputs_type_hash ON outputs(file_type, content_hash)")
+        conn.executemany(
+            "INSERT INTO outputs (file_type, filename, timestamp, file_path, segment_offset, content_hash) "
+            "VALUES ('job_analysis', ?, ?, ?, 0, 'same')",
+            [("b.json", "2025-01-02", "seg"), ("a.json", "2025-01-01", "seg")])
+
+    row = file_manager.get_output_index().find_by_hash("job_analysis", "same")
+    assert row["filename"] == "a.json"
+
+
+def test_batch_stats_exclude_reused_analyses(workdir, monkeypatch):
+    class StubChain:
+        async def ainvoke(self, inputs, config=None, **kwargs):
+            await asyncio.sleep(0.05)
+            return ANALYSIS
+
+    monkeypatch.setattr(batch, "get_analyzer_chain", lambda: StubChain())
+    monkeypatch.setattr(file_manager, "get_analyzer_version", lambda: ANALYZER)
+    save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS)
+
+    items = [{"id": "seen", "job_description": JOB_DESCRIPTION},
+             {"id": "new", "job_description": "Data engineer with Spark"}]
+    summary = asyncio.run(batch.run_batch_analysis(items, reuse_analysis=True))
+
+    assert (summary["succeeded"], summary["analyzed"], summary["reused"]) == (2, 1, 1)
+    assert summary["latency_p50_seconds"] >= 0.05
+    assert summary["docs_per_minute"] <= 60 / 0.05
+
+
+def test_reindexing_keeps_claims_of_saves_in_progress(workdir, monkeypatch):
+    index = file_manager.get_output_index()
+    directory = "resume-optimizer/outputs/job_analysis"
+    content_hash = file_manager.job_description_hash(JOB_DESCRIPTION, ANALYZER)
+    record = {"file_type": "job_analysis", "filename": "claimed.json",
+              "file_path": f"{directory}/claimed.json", "content_hash": content_hash}
+    assert index.claim(record) is None
+
+    # The claimed file is not written yet, but the row survives a reindex
+    assert index.sync_directory("job_analysis", directory)["removed"] == 0
+    assert index.claim(dict(record, filename="other.json"))["filename"] == "claimed.json"
+
+    # A claim left behind by a crashed save expires
+    monkeypatch.setattr(output_index, "CLAIM_GRACE_SECONDS", 0)
+    assert index.sync_directory("job_analysis", directory)["removed"] == 1
+
+
+def test_saved_rows_are_no_longer_claimed(workdir):
+    path = save_job_analysis_result(JOB_DESCRIPTION, ANALYSIS, dedupe=True, analyzer_version=ANALYZER)
+    row = file_manager.get_output_index().get("job_analysis", os.path.basename(path))
+    assert row["claimed_at"] is None
@@ -0,0 +1,90 @@
+# Test hedged requests
+
+import asyncio
+import uuid
+
+from src.hedging import HedgedChain, LatencyHistogram, hedge_model_from_env
+
+
+class StubChain:
+    """Chain that returns result after delay seconds and counts its calls"""
+
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    def invoke(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        return self.result
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.result
+
+
+def make_hedged(primary, hedge, deadline=0.05, min_samples=20):
+    name = uuid.uuid4().hex
+    return HedgedChain(primary, hedge, name, f"{name}-hedge", validate=lambda r: r is not None,
+                       deadline=deadline, min_samples=min_samples)
+
+
+def test_hedging_is_opt_in(monkeypatch):
+    monkeypatch.delenv("RESUME_OPTIMIZER_HEDGE", raising=False)
+    assert hedge_model_from_env("gemini-2.5-pro") is None
+    monkeypatch.setenv("RESUME_OPTIMIZER_HEDGE", "same")
+    assert hedge_model_from_env("gemini-2.5-pro") == "gemini-2.5-pro"
+    monkeypatch.setenv("RESUME_OPTIMIZER_HEDGE", "gemini-2.5-flash")
+    assert hedge_model_from_env("gemini-2.5-pro") == "gemini-2.5-flash"
+
+
+def test_deadline_uses_default_until_enough_samples():
+    chain = make_hedged(StubChain("a"), StubChain("b"), deadline=7.0, min_samples=3)
+    assert chain.deadline() == 7.0
+    for _ in range(3):
+        chain.histogram.observe(0.5)
+    assert 0.5 <= chain.deadline() <= 0.5 * 1.2
+
+
+def test_histogram_quantile_is_bucket_upper_bound():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.95) is None
+    for seconds in [0.1] * 95 + [10.0] * 5:
+        histogram.observe(seconds)
+    assert 0.1 <= histogram.quantile(0.95) <= 0.12
+    assert 10.0 <= histogram.quantile(0.99) <= 12.0
+
+
+def test_fast_primary_is_not_hedged():
+    primary, hedge = StubChain("primary"), StubChain("hedge")
+    assert asyncio.run(make_hedged(primary, hedge).ainvoke({})) == "primary"
+    assert hedge.calls == 0
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    primary, hedge = StubChain("primary", delay=5.0), StubChain("hedge")
+    chain = make_hedged(primary, hedge)
+    assert asyncio.run(chain.ainvoke({})) == "hedge"
+    assert primary.cancelled == 1
+    # The cancelled primary still counts towards the latency histogram
+    assert chain.histogram.count == 1
+
+
+def test_invalid_hedge_result_falls_back_to_primary():
+    primary, hedge = StubChain("primary", delay=0.2), StubChain(None)
+    assert asyncio.run(make_hedged(primary, hedge).ainvoke({})) == "primary"
+    assert hedge.calls == 1
+
+
+def test_sync_invoke_delegates_without_hedging():
+    primary, hedge = StubChain("primary"), StubChain("hedge")
+    chain = make_hedged(primary, hedge, deadline=0.0)
+    assert chain.invoke({}) == "primary"
+    assert (primary.calls, hedge.calls) == (1, 0)
+    assert chain.histogram.count == 1
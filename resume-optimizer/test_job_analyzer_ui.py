@@ -0,0 +1,45 @@
+# Test rendering of finished streamlined workflow results
+
+from unittest.mock import MagicMock
+
+from src.ui import job_analyzer
+
+
+def make_result(**overrides):
+    result = {
+        "analysis_result": {"technical_skills": ["Python"]},
+        "analysis_reused": False,
+        "keywords": ["Python"],
+        "optimization_result": {"summary": "Python engineer"},
+        "pdf_path": "resume-optimizer/outputs/resumes/job_1.pdf",
+        "saved_analysis_path": "resume-optimizer/outputs/job_analysis/analysis.json",
+        "saved_optimization_path": "resume-optimizer/outputs/resume_optimization/optimization.json",
+        "warnings": [],
+        "trace": [],
+    }
+    result.update(overrides)
+    return result
+
+
+def messages(st):
+    return [call.args[0] for method in (st.info, st.success) for call in method.call_args_list]
+
+
+def test_result_shows_saved_file_names(monkeypatch):
+    st = MagicMock()
+    monkeypatch.setattr(job_analyzer, "st", st)
+    job_analyzer._render_streamlined_result(make_result(), "1")
+    assert "✅ Job analysis saved to: analysis.json" in messages(st)
+    assert "✅ PDF generated: job_1.pdf" in messages(st)
+
+
+def test_reused_analysis_without_saved_paths(monkeypatch):
+    st = MagicMock()
+    monkeypatch.setattr(job_analyzer, "st", st)
+    result = make_result(analysis_reused=True, saved_analysis_path=None,
+                         saved_optimization_path=None,
+                         warnings=["Optimization completed but couldn't save file: disk full"])
+    job_analyzer._render_streamlined_result(result, "1")
+    assert "♻️ Reused the saved analysis of this job description" in messages(st)
+    assert not any("saved to" in message for message in messages(st))
+    st.warning.assert_called_once_with(result["warnings"][0])
@@ -0,0 +1,110 @@
+# Test background jobs
+
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+
+from src.job_queue import JobRunner, JobStore, job_pdf_path
+
+
+def test_jobs_render_to_their_own_pdf(workdir, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_pipeline(job_description, **kwargs):
+        with lock:
+            calls.append(kwargs["pdf_output_path"])
+        return {"pdf_path": kwargs["pdf_output_path"]}
+
+    monkeypatch.setattr("src.pipeline.run_streamlined_pipeline_sync", fake_pipeline)
+    runner = JobRunner(JobStore("jobs.sqlite3"), max_workers=4)
+    job_ids = [runner.submit(f"Job description {i}") for i in range(8)]
+    runner.shutdown()
+
+    assert len(set(calls)) == len(job_ids)
+    for job_id in job_ids:
+        job = runner.get(job_id)
+        assert job["status"] == "succeeded"
+        assert job["pdf_path"] == job_pdf_path(job_id)
+        assert job["result"]["pdf_path"] == job["pdf_path"]
+        assert job["pdf_path"].endswith(f"job_{job_id}.pdf")
+
+
+def test_existing_jobs_table_gains_pdf_path(workdir):
+    with sqlite3.connect("jobs.sqlite3") as conn:
+        conn.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, owner TEXT, status TEXT NOT NULL, "
+            "payload TEXT NOT NULL, progress_step INTEGER DEFAULT 0, progress_total INTEGER, "
+            "progress_message TEXT, partial_result TEXT, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)")
+    store = JobStore("jobs.sqlite3")
+    job_id = store.create({"job_description": "jd"})
+    assert store.get(job_id)["pdf_path"] == job_pdf_path(job_id)
+
+
+def test_progress_is_written_off_the_callback_thread(workdir, monkeypatch):
+    writer_threads = []
+    update = JobStore.update
+
+    def recording_update(self, job_id, **fields):
+        if "progress_step" in fields or "partial_result" in fields:
+            writer_threads.append(threading.current_thread())
+        update(self, job_id, **fields)
+
+    def fake_pipeline(job_description, on_progress, on_section, **kwargs):
+        on_progress(1, 4, "Analyzing job description...")
+        on_section("summary", "Python engineer")
+        on_section("skills", ["Python"])
+        return {"pdf_path": kwargs["pdf_output_path"]}
+
+    monkeypatch.setattr(JobStore, "update", recording_update)
+    monkeypatch.setattr("src.pipeline.run_streamlined_pipeline_sync", fake_pipeline)
+    runner = JobRunner(JobStore("jobs.sqlite3"), max_workers=1)
+    job_id = runner.submit("Job description")
+    runner.shutdown()
+
+    job = runner.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["progress_step"] == 1
+    assert job["partial_result"] == {"summary": "Python engineer", "skills": ["Python"]}
+    assert len(writer_threads) == 3
+    assert all(thread.name.startswith("resume-job-progress") for thread in writer_threads)
+
+
+def _set_runner(store, job_id, status, host, pid, token):
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, runner_host = ?, runner_pid = ?, runner_token = ? "
+            "WHERE job_id = ?", (status, host, pid, token, job_id))
+
+
+def test_only_jobs_of_exited_processes_are_recovered(workdir):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    host = socket.gethostname()
+    store = JobStore("jobs.sqlite3")
+    jobs = {name: store.create({"job_description": name}) for name in (
+        "own_queued", "live_running", "other_host_running", "dead_running",
+        "dead_queued", "legacy_running", "previous_process_queued")}
+    _set_runner(store, jobs["live_running"], "running", host, os.getppid(), "token")
+    _set_runner(store, jobs["other_host_running"], "running", "another-host", 1, "token")
+    _set_runner(store, jobs["dead_running"], "running", host, exited.pid, "token")
+    _set_runner(store, jobs["dead_queued"], "queued", host, exited.pid, "token")
+    _set_runner(store, jobs["legacy_running"], "running", None, None, None)
+    # Same pid as this process, but an earlier run of it
+    _set_runner(store, jobs["previous_process_queued"], "queued", host, os.getpid(), "stale")
+
+    recovered = store.mark_interrupted()
+
+    assert sorted(recovered) == sorted([jobs["dead_queued"], jobs["previous_process_queued"]])
+    status = {name: store.get(job_id)["status"] for name, job_id in jobs.items()}
+    assert status == {
+        "own_queued": "queued", "live_running": "running", "other_host_running": "running",
+        "dead_running": "failed", "dead_queued": "queued", "legacy_running": "failed",
+        "previous_process_queued": "queued"}
+    # Recovered jobs now belong to this process, so a second pass leaves them alone
+    assert store.get(jobs["dead_queued"])["runner_pid"] == os.getpid()
+    assert store.mark_interrupted() == []
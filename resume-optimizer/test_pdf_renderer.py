@@ -0,0 +1,68 @@
+# Test that the shared PdfRenderer lays out PDFs like the original create_pdf
+
+import pytest
+
+from src import resume_generator
+from src.resume_generator import PDF_CSS, PdfRenderer, ResumeGenerator
+
+TEMPLATE_STYLE = "body { line-height: 1.2; } @media print { @page { margin: 0.2in; } }"
+SAMPLE_HTML = (f"<html><head><style>{TEMPLATE_STYLE}</style></head>"
+               "<body><p>Python engineer</p></body></html>")
+
+
+class RecordingHTML:
+    """Stands in for weasyprint.HTML and records what would be rendered"""
+    calls = []
+
+    def __init__(self, string=None, **kwargs):
+        self.string = string
+
+    def write_pdf(self, target=None, stylesheets=None, font_config=None, **kwargs):
+        RecordingHTML.calls.append({"html": self.string, "stylesheets": stylesheets})
+        return b"%PDF"
+
+
+def test_template_styles_stay_in_the_document(monkeypatch):
+    RecordingHTML.calls = []
+    monkeypatch.setattr(resume_generator, "HTML", RecordingHTML)
+    renderer = PdfRenderer()
+    renderer.render(SAMPLE_HTML, None)
+    renderer.render(SAMPLE_HTML, None)
+
+    first, second = RecordingHTML.calls
+    # Only the PDF overrides go in as (user-origin) stylesheets, parsed once
+    assert first["html"] == SAMPLE_HTML
+    assert first["stylesheets"] == [renderer.pdf_stylesheet]
+    assert second["stylesheets"][0] is first["stylesheets"][0]
+
+
+def _layout(document):
+    return [(page._page_box.margin_top, page._page_box.margin_left, page.width, page.height)
+            for page in document.pages]
+
+
+def test_pdf_layout_matches_the_original_render(monkeypatch):
+    weasyprint = pytest.importorskip("weasyprint")
+    if not hasattr(weasyprint.HTML, "render"):
+        pytest.skip("needs a working WeasyPrint")
+    resume_html = ResumeGenerator().generate_updated_resume({})
+
+    # Before: a fresh render with PDF_CSS as the only extra stylesheet
+    before = weasyprint.HTML(string=resume_html).render(
+        stylesheets=[weasyprint.CSS(string=PDF_CSS)])
+
+    rendered = []
+
+    class LayoutHTML(weasyprint.HTML):
+        def write_pdf(self, target=None, stylesheets=None, font_config=None, **kwargs):
+            rendered.append(self.render(stylesheets=stylesheets, font_config=font_config))
+            return b"%PDF"
+
+    monkeypatch.setattr(resume_generator, "HTML", LayoutHTML)
+    PdfRenderer().render(resume_html, None)
+    after = rendered[0]
+
+    assert len(after.pages) == len(before.pages)
+    assert _layout(after) == _layout(before)
+    # The template's @media print @page margin (0.2in) wins over PDF_CSS's 1in
+    assert after.pages[0]._page_box.margin_top == pytest.approx(0.2 * 96)
@@ -0,0 +1,118 @@
+# Test the shared quota manager
+
+import asyncio
+
+import pytest
+
+from src.rate_limiter import QuotaManager, RateLimitedChain, is_rate_limit_error
+
+MODEL = "test-model"
+CAPACITY = 100000
+
+
+def tokens_level(quota):
+    return quota.stats()["levels"][f"google_genai:{MODEL}:tokens"]
+
+
+def requests_level(quota):
+    return quota.stats()["levels"][f"google_genai:{MODEL}:requests"]
+
+
+@pytest.fixture
+def quota(workdir):
+    # Slow refill (10 tokens/s) into a large bucket, so the levels below only
+    # change through the chain's calls
+    return QuotaManager({MODEL: {"rpm": 6, "tpm": 600}}, db_path="rate_limits.sqlite3",
+                        burst_seconds=CAPACITY / 10)
+
+
+class StubChain:
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+
+    def invoke(self, inputs, config=None, **kwargs):
+        if self.error:
+            raise self.error
+        return {"ok": True}
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"ok": True}
+
+
+def limited(quota, chain, max_output_tokens=1000):
+    return RateLimitedChain(chain, quota, MODEL, prompt_chars=400, max_output_tokens=max_output_tokens)
+
+
+def test_successful_call_without_usage_keeps_estimate(quota):
+    chain = limited(quota, StubChain())
+    estimated = chain.estimate_tokens({})
+    chain.invoke({})
+    assert tokens_level(quota) == pytest.approx(CAPACITY - estimated, abs=5)
+
+
+def test_failed_call_refunds_output_reservation(quota):
+    chain = limited(quota, StubChain(error=ValueError("bad response")))
+    estimated = chain.estimate_tokens({})
+    with pytest.raises(ValueError):
+        chain.invoke({})
+    assert tokens_level(quota) == pytest.approx(CAPACITY - (estimated - 1000), abs=5)
+
+
+def test_cancelled_call_refunds_output_reservation(quota):
+    chain = limited(quota, StubChain(delay=5.0))
+    estimated = chain.estimate_tokens({})
+
+    async def cancel_midway():
+        task = asyncio.create_task(chain.ainvoke({}))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert tokens_level(quota) == pytest.approx(CAPACITY - (estimated - 1000), abs=5)
+
+
+def test_rate_limit_error_drains_request_bucket(quota):
+    error = type("ResourceExhausted", (Exception,), {})("quota exceeded")
+    chain = limited(quota, StubChain(error=error))
+    with pytest.raises(Exception):
+        chain.invoke({})
+    assert requests_level(quota) < 0
+
+
+def test_rate_limit_errors_are_recognized_by_status_not_message():
+    class ClientError(Exception):
+        code = 429
+
+    class WrappedError(Exception):
+        pass
+
+    try:
+        try:
+            raise ClientError("quota")
+        except ClientError as e:
+            raise WrappedError("Error calling model") from e
+    except WrappedError as wrapped:
+        assert is_rate_limit_error(wrapped)
+
+    assert is_rate_limit_error(type("TooManyRequests", (Exception,), {})())
+    assert not is_rate_limit_error(ValueError("resume mentions 429 customers"))
+
+
+def test_errors_raised_while_handling_a_rate_limit_are_not_rate_limits():
+    class ClientError(Exception):
+        code = 429
+
+    try:
+        try:
+            raise ClientError("quota")
+        except ClientError:
+            raise KeyError("bug in the handler")
+    except KeyError as error:
+        assert error.__context__ is not None
+        assert not is_rate_limit_error(error)
@@ -0,0 +1,124 @@
+# Test the content-addressed LLM response cache
+
+import sqlite3
+
+import pytest
+
+from src import response_cache
+from src.response_cache import CachedChain, ResponseCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(db_path=str(tmp_path / "responses.sqlite3"), **kwargs)
+
+
+class CountingChain:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        return {"keywords": ["Python"], "call": self.calls}
+
+
+def test_keys_ignore_whitespace_but_not_content():
+    key = make_cache_key("template", "model", 0.0, {"job_description": "Python  developer\n"})
+    assert key == make_cache_key("template", "model", 0.0, {"job_description": " Python developer"})
+    assert key != make_cache_key("template", "model", 0.0, {"job_description": "Go developer"})
+    assert key != make_cache_key("template", "other-model", 0.0, {"job_description": "Python developer"})
+    assert key != make_cache_key("template", "model", 0.7, {"job_description": "Python developer"})
+
+
+def test_round_trip_and_expiry(tmp_path, clock):
+    cache = make_cache(tmp_path, max_age_seconds=60)
+    cache.set("key", {"value": [1, 2]})
+    assert cache.get("key") == {"value": [1, 2]}
+    clock.now += 61
+    assert cache.get("key") is None
+    assert cache.stats() == {"entries": 0, "bytes": 0, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2, evict_interval=1)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_eviction_runs_every_interval_writes(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2, evict_interval=3)
+    for key in "abcd":
+        clock.now += 1
+        cache.set(key, key)
+    # The first and fourth writes evict; the second and third may overshoot
+    assert cache.stats()["entries"] == 2
+    assert (cache.get("c"), cache.get("d")) == ("c", "d")
+
+
+def test_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(response_cache.sqlite3, "connect", recording_connect)
+    cache = make_cache(tmp_path)
+    cache.set("key", 1)
+    cache.get("key")
+    cache.stats()
+    cache.clear()
+    assert opened
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_cached_chain_skips_the_model_on_a_hit(tmp_path):
+    chain = CountingChain()
+    cached = CachedChain(chain, "template", "model", 0.0, cache=make_cache(tmp_path), coalesce=False)
+    first = cached.invoke({"job_description": "Python developer"})
+    second = cached.invoke({"job_description": "Python   developer"})
+    assert first == second == {"keywords": ["Python"], "call": 1}
+    assert chain.calls == 1
+
+
+def test_disabled_cache_always_calls_the_model(tmp_path):
+    chain = CountingChain()
+    cached = CachedChain(chain, "template", "model", 0.0, cache=make_cache(tmp_path),
+                         enabled=False, coalesce=False)
+    cached.invoke({"job_description": "Python developer"})
+    cached.invoke({"job_description": "Python developer"})
+    assert chain.calls == 2
+
+
+def test_results_failing_validation_are_not_cached(tmp_path):
+    chain = CountingChain()
+    cached = CachedChain(chain, "template", "model", 0.0, cache=make_cache(tmp_path), coalesce=False,
+                         validate=lambda result: result["call"] > 1)
+    assert cached.invoke({"job_description": "Python developer"})["call"] == 1
+    assert cached.invoke({"job_description": "Python developer"})["call"] == 2
+    assert cached.invoke({"job_description": "Python developer"})["call"] == 2
+    assert chain.calls == 2
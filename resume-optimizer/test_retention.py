@@ -0,0 +1,169 @@
+# Test retention policies and which generated files count as regenerable
+
+import logging
+import os
+import time
+
+import pytest
+
+from src import retention
+from src.file_manager import (
+    artifact_sources,
+    list_saved_files,
+    record_artifact_source,
+    save_resume_optimization_result,
+)
+from src.retention import RetentionPolicy, parse_policies, plan_pruning, prune_outputs
+
+OUTPUTS = os.path.join("resume-optimizer", "outputs")
+RESUMES = os.path.join(OUTPUTS, "resumes")
+OPTIMIZATION = {"summary": "Python engineer", "skills": ["Python"]}
+
+
+def make_file(path, size=10, age=0.0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def save_optimization():
+    return save_resume_optimization_result(["Python"], "resume", OPTIMIZATION)
+
+
+def classified(path):
+    """Retention type _artifact_entries assigns to the file at path"""
+    for file_type, entries in retention._artifact_entries().items():
+        if any(os.path.normpath(e["path"]) == os.path.normpath(path) for e in entries):
+            return file_type
+    return None
+
+
+def test_policy_expires_by_age_count_and_size():
+    now = 1000.0
+    entries = [{"mtime": now - age, "bytes": 10, "name": age} for age in (1, 2, 3, 50)]
+    by_age = RetentionPolicy(max_age_seconds=10).expired(entries, now)
+    assert [e["name"] for e in by_age] == [50]
+    by_count = RetentionPolicy(max_count=2).expired(entries, now)
+    assert [e["name"] for e in by_count] == [3, 50]
+    by_size = RetentionPolicy(max_bytes=25).expired(entries, now)
+    assert [e["name"] for e in by_size] == [3, 50]
+
+
+def test_parse_policies():
+    policies = parse_policies("regenerable_pdf:max_age=1d; pdf:max_count=200,max_size=1MB")
+    assert policies["regenerable_pdf"].max_age_seconds == 86400
+    assert policies["pdf"].max_count == 200
+    assert policies["pdf"].max_bytes == 1024 ** 2
+    with pytest.raises(ValueError):
+        parse_policies("pdfs:max_age=1d")
+    with pytest.raises(ValueError):
+        parse_policies("pdf:max_files=3")
+
+
+@pytest.mark.parametrize("name", [
+    "optimized_resume_backend.pdf",
+    "resume_pdf_20240101_120000.pdf",
+    "job_0123456789abcdef.pdf",
+])
+def test_recorded_pdfs_are_regenerable_whatever_their_name(workdir, name):
+    saved_path = save_optimization()
+    directory = OUTPUTS if name.startswith("resume_pdf_") else RESUMES
+    pdf_path = make_file(os.path.join(directory, name))
+    assert classified(pdf_path) == "pdf"
+
+    record_artifact_source(pdf_path, saved_path)
+    assert classified(pdf_path) == "regenerable_pdf"
+
+
+def test_render_pdfs_names_are_regenerable_without_a_record(workdir):
+    saved_path = save_optimization()
+    stem = os.path.splitext(os.path.basename(saved_path))[0]
+    pdf_path = make_file(os.path.join(OUTPUTS, f"resume_from_{stem}.pdf"))
+    orphan = make_file(os.path.join(OUTPUTS, "resume_from_deleted_file.pdf"))
+    assert classified(pdf_path) == "regenerable_pdf"
+    assert classified(orphan) == "pdf"
+
+
+def test_pdf_is_no_longer_regenerable_once_its_source_is_deleted(workdir):
+    saved_path = save_optimization()
+    pdf_path = make_file(os.path.join(RESUMES, "optimized_resume_backend.pdf"))
+    record_artifact_source(pdf_path, saved_path)
+
+    prune_outputs({"resume_optimization": RetentionPolicy(max_count=0)})
+    assert list_saved_files("resume_optimization")["resume_optimization"] == []
+    assert classified(pdf_path) == "pdf"
+
+
+def test_artifacts_are_collected_from_every_output_directory(workdir):
+    nested = make_file(os.path.join(OUTPUTS, "exports", "2024", "resume.html"))
+    markdown = make_file(os.path.join(RESUMES, "updated_resume_20240101.md"))
+    # Caches, segments and saved JSON outputs are not artifacts
+    make_file(os.path.join(OUTPUTS, "cache", "report.html"))
+    make_file(os.path.join(OUTPUTS, "segments", "resume_optimization", "notes.md"))
+
+    grouped = retention._artifact_entries()
+    paths = {os.path.normpath(e["path"]) for entries in grouped.values() for e in entries}
+    assert paths == {os.path.normpath(p) for p in (nested, markdown)}
+
+
+def test_files_outside_outputs_are_never_pruned(workdir, tmp_path):
+    custom = make_file(str(tmp_path / "elsewhere" / "custom.pdf"), age=7200)
+    record_artifact_source(custom, save_optimization())
+    assert classified(custom) is None
+
+    prune_outputs({"regenerable_pdf": RetentionPolicy(max_count=0),
+                   "pdf": RetentionPolicy(max_count=0)})
+    assert os.path.exists(custom)
+
+
+def test_stale_temp_files_are_found_in_any_directory(workdir):
+    now = time.time()
+    stale = make_file(os.path.join(RESUMES, ".job_1.pdf.abcd1234.tmp"),
+                      age=retention.TEMP_FILE_GRACE_SECONDS + 60)
+    make_file(os.path.join(OUTPUTS, "job_analysis", ".fresh.json.abcd1234.tmp"))
+    plan = plan_pruning({}, now=now)
+    assert [os.path.normpath(e["path"]) for e in plan["temp"]] == [os.path.normpath(stale)]
+
+
+def test_prune_removes_only_the_configured_type_and_forgets_sources(workdir):
+    saved_path = save_optimization()
+    old_pdf = make_file(os.path.join(RESUMES, "job_old.pdf"), age=7200)
+    new_pdf = make_file(os.path.join(RESUMES, "job_new.pdf"))
+    kept_pdf = make_file(os.path.join(OUTPUTS, "resume_pdf_20240101_120000.pdf"), age=7200)
+    for pdf_path in (old_pdf, new_pdf):
+        record_artifact_source(pdf_path, saved_path)
+
+    summary = prune_outputs({"regenerable_pdf": RetentionPolicy(max_age_seconds=3600)})
+    assert summary["regenerable_pdf"]["removed"] == 1
+    assert not os.path.exists(old_pdf)
+    assert os.path.exists(new_pdf) and os.path.exists(kept_pdf)
+    assert set(artifact_sources()) == {os.path.normpath(new_pdf)}
+
+
+def test_dry_run_removes_nothing(workdir):
+    pdf_path = make_file(os.path.join(OUTPUTS, "resume_pdf_20240101_120000.pdf"))
+    summary = prune_outputs({"pdf": RetentionPolicy(max_count=0)}, dry_run=True)
+    assert summary["pdf"]["removed"] == 1
+    assert os.path.exists(pdf_path)
+
+
+def test_background_failures_are_logged(monkeypatch, caplog):
+    calls = []
+
+    def failing_prune():
+        calls.append(1)
+        if len(calls) > 1:
+            raise SystemExit  # Stop the loop after the second run
+        raise OSError("disk full")
+
+    monkeypatch.setattr(retention, "prune_outputs", failing_prune)
+    monkeypatch.setattr(retention.time, "sleep", lambda seconds: None)
+    with caplog.at_level(logging.ERROR, logger="src.retention"):
+        with pytest.raises(SystemExit):
+            retention._prune_periodically(1)
+    assert len(calls) == 2
+    assert "Retention pruning failed" in caplog.text
+    assert "disk full" in caplog.text
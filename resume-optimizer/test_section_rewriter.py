@@ -0,0 +1,96 @@
+# Test section-parallel rewriting
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.section_rewriter import SectionParallelRewriter
+
+SECTIONS = ("updated_summary", "liberty_mutual_group", "echo_project")
+
+
+class SectionChain:
+    """Returns {section: value} after delay seconds, or raises error"""
+
+    def __init__(self, section, delay=0.0, error=None, result=None):
+        self.section = section
+        self.delay = delay
+        self.error = error
+        self.result = result if result is not None else {section: f"{section} rewritten"}
+        self.finished = threading.Event()
+
+    def invoke(self, inputs, config=None, **kwargs):
+        time.sleep(self.delay)
+        self.finished.set()
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def rewriter(**overrides):
+    return SectionParallelRewriter({
+        section: overrides.get(section, SectionChain(section)) for section in SECTIONS
+    })
+
+
+def test_merge_orders_sections_by_schema():
+    merged = rewriter()._merge({
+        "echo_project": {"echo_project": ["c"]},
+        "updated_summary": {"updated_summary": "a"},
+        "liberty_mutual_group": {"liberty_mutual_group": ["b"]},
+    })
+    assert list(merged) == list(SECTIONS)
+
+
+def test_merge_raises_on_missing_section():
+    with pytest.raises(ValueError, match="liberty_mutual_group"):
+        rewriter()._merge({"updated_summary": {"updated_summary": "a"},
+                           "echo_project": {"echo_project": ["c"]}})
+
+
+def test_merge_raises_when_result_lacks_its_section():
+    with pytest.raises(ValueError, match="echo_project"):
+        rewriter()._merge({section: {section: "x"} for section in SECTIONS[:2]}
+                          | {"echo_project": {"something_else": []}})
+
+
+def test_merge_allows_missing_sections_while_partial():
+    assert rewriter()._merge({"echo_project": {"echo_project": ["c"]}}, partial=True) == {
+        "echo_project": ["c"]}
+
+
+def test_invoke_and_ainvoke_merge_every_section():
+    expected = {section: f"{section} rewritten" for section in SECTIONS}
+    assert rewriter().invoke({}) == expected
+    assert asyncio.run(rewriter().ainvoke({})) == expected
+
+
+def test_stream_yields_growing_complete_sections():
+    chunks = list(rewriter(echo_project=SectionChain("echo_project", delay=0.05)).stream({}))
+    assert [len(chunk) for chunk in chunks] == [1, 2, 3]
+    assert list(chunks[-1]) == list(SECTIONS)
+
+
+def test_failed_section_does_not_wait_for_running_calls():
+    slow = SectionChain("echo_project", delay=1.0)
+    failing = SectionChain("updated_summary", error=RuntimeError("model failed"))
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match="model failed"):
+        rewriter(echo_project=slow, updated_summary=failing).invoke({})
+    assert time.perf_counter() - started < 0.5
+    assert not slow.finished.is_set()
+
+
+def test_ainvoke_cancels_remaining_sections_on_failure():
+    failing = SectionChain("updated_summary", error=RuntimeError("model failed"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(rewriter(updated_summary=failing,
+                             echo_project=SectionChain("echo_project", delay=5.0)).ainvoke({}))
@@ -0,0 +1,108 @@
+# Test append-only segment storage and compaction
+
+import os
+
+import pytest
+
+from src import segment_store
+from src.file_manager import (
+    delete_saved_files,
+    list_saved_files,
+    load_saved_file,
+    query_saved_files,
+    save_resume_optimization_result,
+)
+from src.segment_store import SegmentStore
+
+
+def record(n):
+    return {"n": n, "text": f"record {n} " * 20}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentStore(root=str(tmp_path / "segments"), codec="gzip")
+
+
+def test_append_returns_readable_locations(store):
+    locations = [store.append("job_analysis", f"file_{n}.json", record(n)) for n in range(3)]
+    assert locations[0]["offset"] == 0
+    assert locations[1]["offset"] == locations[0]["length"]
+    for n, location in enumerate(locations):
+        assert SegmentStore.read(**location) == record(n)
+    assert [(name, data) for name, _, data in store.iter_records("job_analysis")] == \
+        [(f"file_{n}.json", record(n)) for n in range(3)]
+
+
+def test_full_segments_roll_over(tmp_path):
+    store = SegmentStore(root=str(tmp_path / "segments"), codec="gzip", max_segment_bytes=1)
+    paths = {store.append("job_analysis", f"file_{n}.json", record(n))["segment_path"]
+             for n in range(3)}
+    assert len(paths) == 3
+    assert [os.path.basename(p) for p in store.segment_paths("job_analysis")] == [
+        "segment_000001.jsonl.gz", "segment_000002.jsonl.gz", "segment_000003.jsonl.gz"]
+
+
+def test_truncated_record_is_skipped(store):
+    first = store.append("job_analysis", "first.json", record(1))
+    second = store.append("job_analysis", "second.json", record(2))
+    with open(second["segment_path"], "r+b") as segment:
+        segment.truncate(second["offset"] + second["length"] // 2)
+    assert [name for name, _, _ in store.iter_records("job_analysis")] == ["first.json"]
+    assert SegmentStore.read(**first) == record(1)
+
+
+def test_compact_keeps_the_remaining_records(store):
+    for n in range(4):
+        store.append("job_analysis", f"file_{n}.json", record(n))
+    old_path = store.segment_paths("job_analysis")[0]
+    relocated = {}
+
+    new_path = store.compact(old_path, {"file_1.json", "file_3.json"}, relocated.update)
+
+    assert store.segment_paths("job_analysis") == [new_path]
+    assert not os.path.exists(old_path) and not os.path.exists(old_path + ".idx")
+    assert os.path.basename(new_path) == "segment_000002.jsonl.gz"
+    assert sorted(relocated) == ["file_0.json", "file_2.json"]
+    for name, location in relocated.items():
+        assert SegmentStore.read(**location) == record(int(name[5]))
+    assert [name for name, _, _ in store.iter_records("job_analysis")] == ["file_0.json", "file_2.json"]
+
+
+def test_compacting_every_record_away_removes_the_segment(store):
+    location = store.append("job_analysis", "only.json", record(0))
+    relocated = {}
+    assert store.compact(location["segment_path"], {"only.json"}, relocated.update) is None
+    assert relocated == {}
+    assert store.segment_paths("job_analysis") == []
+
+
+def test_appends_after_compaction_go_to_a_newer_segment(store):
+    for n in range(2):
+        store.append("job_analysis", f"file_{n}.json", record(n))
+    new_path = store.compact(store.segment_paths("job_analysis")[0], {"file_0.json"},
+                             lambda locations: None)
+    location = store.append("job_analysis", "file_2.json", record(2))
+    # Appends continue in the compacted segment, after the kept record
+    assert location["segment_path"] == new_path
+    assert [name for name, _, _ in store.iter_records("job_analysis")] == ["file_1.json", "file_2.json"]
+
+
+def test_saved_outputs_round_trip_through_segments(workdir, monkeypatch):
+    monkeypatch.setenv(segment_store.STORAGE_ENV_VAR, "segments")
+    saved = [save_resume_optimization_result(["Python"], "resume", {"summary": f"v{n}"})
+             for n in range(3)]
+    filenames = [os.path.basename(path) for path in saved]
+    assert sorted(list_saved_files("resume_optimization")["resume_optimization"]) == sorted(filenames)
+    assert not os.path.exists(os.path.join("resume-optimizer", "outputs", "resume_optimization"))
+    for n, filename in enumerate(filenames):
+        data = load_saved_file("resume_optimization", filename)
+        assert data["output"]["optimization_result"] == {"summary": f"v{n}"}
+
+    result = delete_saved_files("resume_optimization", [filenames[1]])
+    assert result["removed"] == 1 and result["segments_compacted"] == 1
+    remaining = {row["filename"]: row for row in query_saved_files("resume_optimization")}
+    assert sorted(remaining) == sorted([filenames[0], filenames[2]])
+    # The index points at the records' new locations
+    assert load_saved_file("resume_optimization", filenames[2])[
+        "output"]["optimization_result"] == {"summary": "v2"}
@@ -0,0 +1,220 @@
+# Test single-flight coalescing of identical in-flight calls
+
+import asyncio
+import fcntl
+import threading
+import time
+import uuid
+
+import pytest
+
+from src.response_cache import CachedChain, ResponseCache
+from src.single_flight import InFlightAbandoned, SingleFlight
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_claim_resolve_and_abandon(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    future, is_leader = flight.claim(key)
+    joined, follower_is_leader = flight.claim(key)
+    assert is_leader and not follower_is_leader
+    assert joined is future
+    assert flight.stats() == {"leaders": 1, "coalesced": 1, "in_flight": 1}
+
+    flight.resolve(key, future, "result")
+    assert future.result() == "result"
+    assert flight.in_flight() == 0
+
+    # The next call for the key starts a new flight, which can be abandoned
+    second, is_leader = flight.claim(key)
+    assert is_leader and second is not future
+    flight.abandon(key, second)
+    with pytest.raises(InFlightAbandoned):
+        second.result()
+    assert flight.in_flight() == 0
+
+
+def test_do_runs_fn_once_for_concurrent_callers(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do(key, fn)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: flight.stats()["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result == {"value": 1} for result, _ in results)
+
+
+def test_leader_errors_reach_followers(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    future, _ = flight.claim(key)
+    errors = []
+
+    def follow():
+        try:
+            flight.do(key, lambda: "unused")
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    flight.resolve(key, future, error=ValueError("model failed"))
+    thread.join(5)
+    assert [str(e) for e in errors] == ["model failed"]
+
+
+def test_follower_takes_over_an_abandoned_call(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    future, _ = flight.claim(key)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(flight.do(key, lambda: "retried")))
+    thread.start()
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    flight.abandon(key, future)
+    thread.join(5)
+    assert results == [("retried", False)]
+
+
+def test_cancelled_async_leader_hands_over_to_follower(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return "second"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado(key, fn))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.ado(key, fn))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ("second", False)
+    assert len(calls) == 2
+
+
+def test_cancelled_ahost_lock_releases_the_lock_once_acquired(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    key = new_key()
+    lock_path = flight._lock_path(key)
+
+    async def main():
+        with open(lock_path, "a") as holder:
+            fcntl.flock(holder, fcntl.LOCK_EX)
+
+            async def waiter():
+                async with flight.ahost_lock(key):
+                    pass
+
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0.05)  # The worker thread is now blocked in flock
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            fcntl.flock(holder, fcntl.LOCK_UN)
+
+        # The worker thread gets the lock next, then releases it and closes the file
+        with open(lock_path, "a") as probe:
+            deadline = time.monotonic() + 5
+            while True:
+                try:
+                    fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    assert time.monotonic() < deadline, "lock was never released"
+                    await asyncio.sleep(0.01)
+            fcntl.flock(probe, fcntl.LOCK_UN)
+
+    asyncio.run(main())
+
+
+class SlowChain:
+    """Chain that returns the same dict object from every call"""
+
+    def __init__(self):
+        self.result = {"skills": ["Python"]}
+        self.calls = 0
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return self.result
+
+    async def astream(self, inputs, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        yield self.result
+
+
+def make_cached(tmp_path, chain):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite3"))
+    return CachedChain(chain, "template", new_key(), 0.0, cache=cache,
+                       enabled=False, coalesce=True)
+
+
+def test_coalesced_callers_get_their_own_copies(tmp_path):
+    chain = SlowChain()
+    cached = make_cached(tmp_path, chain)
+
+    async def main():
+        return await asyncio.gather(*(cached.ainvoke({"keywords": ["Python"]}) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert chain.calls == 1
+    results[0]["skills"].append("Go")
+    assert results[1] == results[2] == {"skills": ["Python"]}
+    assert results[1] is not results[2]
+    assert chain.result == {"skills": ["Python"]}
+
+
+def test_coalesced_stream_followers_get_their_own_copies(tmp_path):
+    chain = SlowChain()
+    cached = make_cached(tmp_path, chain)
+
+    async def collect():
+        return [chunk async for chunk in cached.astream({"keywords": ["Python"]})]
+
+    async def main():
+        return await asyncio.gather(collect(), collect(), collect())
+
+    leader, *followers = asyncio.run(main())
+    assert chain.calls == 1
+    leader[-1]["skills"].append("Go")
+    assert followers[0] == followers[1] == [{"skills": ["Python"]}]
+    assert followers[0][0] is not followers[1][0]